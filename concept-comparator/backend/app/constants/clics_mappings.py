@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 CLICS_LANGUAGE_MAPPINGS = {
     # Existing mappings
@@ -106,4 +106,15 @@ CLICS_LANGUAGE_MAPPINGS = {
 
 def get_clics_codes(lang_code: str) -> List[str]:
     """Get all possible CLICS codes for a language"""
-    return CLICS_LANGUAGE_MAPPINGS.get(lang_code, [])
\ No newline at end of file
+    return CLICS_LANGUAGE_MAPPINGS.get(lang_code, [])
+
+# CLICS language ID → ISO 639-3
+_ISO_BY_CLICS_CODE = {
+    clics_code: lang_code
+    for lang_code, clics_codes in CLICS_LANGUAGE_MAPPINGS.items()
+    for clics_code in clics_codes
+}
+
+def get_iso_code(clics_code: str) -> Optional[str]:
+    """Get the ISO 639-3 code of a CLICS language, if it is one we map"""
+    return _ISO_BY_CLICS_CODE.get(clics_code)
@@ -1,7 +1,8 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from typing import List, Dict, Optional, AsyncGenerator
+from fastapi.responses import JSONResponse, Response
+from contextlib import asynccontextmanager
+from typing import List, Dict, Literal, NamedTuple, Optional, AsyncGenerator, Tuple
 from app.services.disambiguation import DisambiguationService
 from app.services.translation import TranslationService
 from app.services.embedding import EmbeddingService
@@ -10,6 +11,7 @@ from app.models.schemas import (
     ComparisonRequest,
     ComparisonResult,
     ConceptAnchor,
+    Translation,
     StudyRequest,
     SemanticMapResponse,
 )
@@ -17,36 +19,82 @@ from app.services.clics import ClicsService
 from app.services.concept_registry import ConceptRegistryService
 from app.services.colexification import ColexificationService
 from app.services.study_pipeline import StudyPipelineService
+from app.services.loader import ServiceLoader
+from app.services.executor import IO, MODEL, ExecutionLayer
+from app.services.disconnect import CancelledWorkLog, ClientDisconnected, DisconnectWatch
+from app.services.admission import AdmissionController, AdmittedStreamingResponse, Overloaded, Ticket
+from app.services.result_cache import ResultCache, family_key, language_key
+from app.services.response_encoding import (
+    CompressionMiddleware,
+    FastJSONResponse,
+    compact_comparison,
+    compact_result,
+    dumps,
+)
 from dotenv import load_dotenv
 import logging
 import json
 import asyncio
+import os
+import time
+import numpy as np
 
 # Load environment variables
 load_dotenv()
 
-clics_service = ClicsService()
-
-app = FastAPI(title="Concept Atlas API")
-
-# Initialize services
-disambiguation_service = DisambiguationService()
-translation_service = TranslationService()
-embedding_service = EmbeddingService()
-
-# Atlas services (new)
-try:
-    registry_service = ConceptRegistryService()
-    colex_service = ColexificationService(clics_service)
-    study_pipeline = StudyPipelineService(colex_service, registry_service, translation_service)
-    _atlas_available = True
-    print("Atlas services initialised successfully")
-except Exception as e:
-    registry_service = None  # type: ignore
-    colex_service = None  # type: ignore
-    study_pipeline = None  # type: ignore
-    _atlas_available = False
-    print(f"Atlas services unavailable (run scripts/run_ingestion.py first): {e}")
+# Services load in parallel background threads at startup; each endpoint
+# awaits only the services it uses
+ATLAS_HINT = "Run backend/scripts/run_ingestion.py first."
+
+# Languages one streamed comparison works on at once; override with COMPARISON_LANGUAGE_CONCURRENCY
+LANGUAGE_CONCURRENCY = int(os.getenv("COMPARISON_LANGUAGE_CONCURRENCY", 16))
+
+# Blocking and CPU-bound work is dispatched through the execution layer
+executor = ExecutionLayer()
+
+# Streams whose client went away before they finished; see CANCELLED_WORK_LOG
+cancelled_work = CancelledWorkLog()
+
+# Comparison results per language (and shared family patterns); see RESULT_CACHE_*
+result_cache = ResultCache()
+
+# Expensive endpoints are admitted per class (concurrency, queue); see ADMISSION_*
+admission = {
+    "compare": AdmissionController.from_env("compare", concurrency=4, max_queue=32),
+    "study": AdmissionController.from_env("study", concurrency=2, max_queue=16),
+    "chains": AdmissionController.from_env("chains", concurrency=8, max_queue=32),
+}
+
+services = ServiceLoader()
+services.add("clics", ClicsService)
+# Worker processes for graph jobs; each loads the CLICS snapshot itself
+services.add("graph_workers", executor.start_graph_workers, deps=("clics",))
+services.add("disambiguation", DisambiguationService)
+# Its cache's SQLite reads and writes run on the executor's I/O threads
+services.add("translation", lambda: TranslationService(executor=executor))
+services.add("embedding", EmbeddingService)
+# Atlas services (optional: they need atlas.sqlite from the ingestion scripts)
+services.add("registry", ConceptRegistryService, optional=True, hint=ATLAS_HINT)
+services.add("colexification", ColexificationService,
+             deps=("clics",), optional=True, hint=ATLAS_HINT)
+services.add("study_pipeline",
+             lambda colex, registry, translation, executor: StudyPipelineService(
+                 colex, registry, translation, executor=executor),
+             deps=("colexification", "registry", "translation", "graph_workers"),
+             optional=True, hint=ATLAS_HINT)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    services.start()
+    yield
+    services.shutdown()
+    executor.shutdown()
+    cancelled_work.close()
+
+
+# orjson-rendered JSON by default; large complete responses are gzip/brotli-compressed
+app = FastAPI(title="Concept Atlas API", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -55,12 +103,36 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
+app.add_middleware(CompressionMiddleware)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    """Admission refused: 429 (client's queue share used) or 503 (queue full)."""
+    return JSONResponse(
+        {"detail": exc.detail, "retry_after": exc.retry_after},
+        status_code=exc.status_code,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(ClientDisconnected)
+async def disconnected_handler(request: Request, exc: ClientDisconnected):
+    """The client left while its request waited for an admission slot."""
+    cancelled_work.record(request.url.path, "disconnected", queued=True)
+    return Response(status_code=499)
+
+
+def client_id(request: Request) -> str:
+    """Who a request is queued as for fair admission"""
+    return request.client.host if request.client else "unknown"
+
 SUPPORTED_LANGUAGES = {
     # Indo-European - Germanic
     'eng': {'name': 'English', 'family': 'Indo-European', 'subfamily': 'Germanic'},
@@ -193,12 +265,42 @@ SUPPORTED_LANGUAGES = {
     'eus': {'name': 'Basque', 'family': 'Language Isolate', 'subfamily': 'None'},
 }
 
+@app.get("/healthz")
+async def healthz():
+    """Liveness plus per-service load state and timings."""
+    return services.status()
+
+
+@app.get("/metrics")
+async def metrics():
+    """Cache counters of the loaded services and execution-layer queue depths."""
+    counters = {
+        "executor": executor.stats(),
+        "admission": {name: controller.stats() for name, controller in admission.items()},
+        "cancelled_streams": cancelled_work.stats(),
+        "result_cache": result_cache.stats(),
+    }
+    if services.loaded("translation"):
+        counters["translation_cache"] = services.instance("translation").cache.stats()
+    if services.loaded("embedding"):
+        counters["embedding_cache"] = services.instance("embedding").cache.stats()
+    return counters
+
+
+@app.get("/readyz")
+async def readyz():
+    """200 once every required service is loaded (optional ones may have failed), else 503."""
+    status = services.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
 @app.get("/word-senses/{word}", response_model=List[WordSense])
 async def get_word_senses(word: str):
     """Get possible word senses for disambiguation"""
+    disambiguation_service = await services.get("disambiguation")
     logger.info(f"Received request for word senses: {word}")
     try:
-        senses = disambiguation_service.get_word_senses(word)
+        senses = await executor.run(IO, disambiguation_service.get_word_senses, word)
         if not senses:
             logger.warning(f"No word senses found for: {word}")
             raise HTTPException(status_code=404, detail="No word senses found")
@@ -208,83 +310,152 @@ async def get_word_senses(word: str):
         logger.error(f"Error processing word senses for {word}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
     
-async def process_language(
+class LanguageInputs(NamedTuple):
+    """Everything a language's comparison needs before embedding."""
+    lang: str
+    lang_name: str
+    family: Optional[str]
+    trans1: Translation
+    trans2: Translation
+    concept1_colexs: list
+    concept2_colexs: list
+
+
+async def prepare_language(
     request: ComparisonRequest,
     lang: str,
     lang_name: str,
     family: str | None
-) -> ComparisonResult:
-    """Process a single language comparison"""
-    # Get language-specific colexifications
-    concept1_colexs = clics_service.get_language_colexifications(
-        request.concept1, 
-        lang
-    )
-    
-    concept2_colexs = clics_service.get_language_colexifications(
-        request.concept2,
-        lang
-    ) 
-
-    # Get translations
-    trans1 = translation_service.get_translation(
-        request.concept1, 
-        request.sense_id1, 
-        lang_name
+) -> LanguageInputs:
+    """Fetch colexifications and translations for one language"""
+    clics_service = await services.get("clics")
+    translation_service = await services.get("translation")
+
+    def language_colexifications():
+        return (
+            clics_service.get_language_colexifications(request.concept1, lang),
+            clics_service.get_language_colexifications(request.concept2, lang),
+        )
+
+    # Language-specific colexifications (snapshot lookups, off the event loop) and
+    # both translations, concurrently (translations bounded by the service's semaphore)
+    (concept1_colexs, concept2_colexs), trans1, trans2 = await asyncio.gather(
+        executor.run(IO, language_colexifications),
+        translation_service.translate(request.concept1, request.sense_id1, lang_name),
+        translation_service.translate(request.concept2, request.sense_id2, lang_name),
     )
-    
-    trans2 = translation_service.get_translation(
-        request.concept2,
-        request.sense_id2,
-        lang_name
+
+    return LanguageInputs(lang, lang_name, family, trans1, trans2, concept1_colexs, concept2_colexs)
+
+
+async def prefetch_translations(request: ComparisonRequest, languages: Optional[List[str]] = None) -> list:
+    """
+    Start batched translations of both concepts into `languages` (default: all
+    requested); a no-op unless batch mode is on. Returns the translation keys
+    started, for TranslationService.abandon().
+    """
+    translation_service = services.instance("translation")
+    languages = request.languages if languages is None else languages
+    lang_names = [SUPPORTED_LANGUAGES[lang]['name'] for lang in languages
+                  if lang in SUPPORTED_LANGUAGES]
+    started = await translation_service.prefetch(request.concept1, request.sense_id1, lang_names)
+    try:
+        return started + await translation_service.prefetch(request.concept2, request.sense_id2, lang_names)
+    except asyncio.CancelledError:
+        translation_service.abandon(started)
+        raise
+
+
+async def comparison_fingerprint() -> dict:
+    """What a comparison's result depends on besides the request (part of result-cache keys)"""
+    dataset_versions = {}
+    if services.loaded("registry"):
+        dataset_versions = await executor.run(IO, services.instance("registry").get_dataset_versions)
+    snapshot = getattr(services.instance("clics"), "snapshot", None)
+    return {
+        "translation_model": services.instance("translation").model,
+        "embedding_model": services.instance("embedding").backend.cache_id,
+        "clics": snapshot.meta.get("source_sha256") if snapshot is not None else None,
+        "dataset_versions": dataset_versions,
+    }
+
+
+async def cached_family_colexifications(request: ComparisonRequest, families: set, fingerprint: dict) -> dict:
+    """Family colexification patterns for both concepts, from the result cache when possible"""
+    key = family_key(request, families, fingerprint)
+    family_colexifications = await executor.run(IO, result_cache.get_families, key)
+    if family_colexifications is None:
+        family_colexifications = await executor.graph(
+            "family_colexifications", request.concept1, request.concept2, list(families)
+        )
+        await executor.run(IO, result_cache.put_families, key, family_colexifications)
+    return family_colexifications
+
+
+def embedding_texts(request: ComparisonRequest, inputs: LanguageInputs) -> List[tuple]:
+    """Every (text, lang_name, meaning) a language's comparison will embed"""
+    texts = [(inputs.trans1.main_translation, inputs.lang_name, request.concept1),
+             (inputs.trans2.main_translation, inputs.lang_name, request.concept2)]
+    texts += [(v.word, inputs.lang_name, request.concept1) for v in inputs.trans1.variations]
+    texts += [(v.word, inputs.lang_name, request.concept2) for v in inputs.trans2.variations]
+    return texts
+
+
+def embed_languages(request: ComparisonRequest, all_inputs: List[LanguageInputs]) -> Dict[tuple, np.ndarray]:
+    """Embed the texts of all languages in one batched pass, keyed by (text, lang_name, meaning)"""
+    texts = [t for inputs in all_inputs for t in embedding_texts(request, inputs)]
+    return dict(zip(texts, services.instance("embedding").get_embeddings(texts)))
+
+
+def build_language_result(
+    request: ComparisonRequest,
+    inputs: LanguageInputs,
+    vectors: Dict[tuple, np.ndarray]
+) -> ComparisonResult:
+    """Compute similarities for one language from pre-computed embeddings"""
+    trans1, trans2, lang_name = inputs.trans1, inputs.trans2, inputs.lang_name
+    embedding_service = services.instance("embedding")
+
+    def embedding(text: str, meaning: str) -> np.ndarray:
+        return vectors[(text, lang_name, meaning)]
+
+    # Row 0 / column 0 are the main translations, then each side's variations
+    words1 = [trans1.main_translation] + [v.word for v in trans1.variations]
+    words2 = [trans2.main_translation] + [v.word for v in trans2.variations]
+    emb1 = embedding(trans1.main_translation, request.concept1)
+    emb2 = embedding(trans2.main_translation, request.concept2)
+    grid = embedding_service.similarity_matrix(
+        np.stack([embedding(w, request.concept1) for w in words1]),
+        np.stack([embedding(w, request.concept2) for w in words2]),
     )
     
-    # Get embeddings
-    emb1 = embedding_service.get_embedding(trans1.main_translation, lang_name, request.concept1)
-    emb2 = embedding_service.get_embedding(trans2.main_translation, lang_name, request.concept2)
-    
     # Calculate similarity
-    main_similarity = embedding_service.compute_similarity(emb1, emb2)
+    main_similarity = grid[0, 0]
     
     # Process variations
     variation_similarities = []
     
     # Compare variations from trans1 with main translation and variations of trans2
-    if trans1.variations:
-        # Compare trans1 variations with trans2 main translation
-        for var1 in trans1.variations:
-            var_emb1 = embedding_service.get_embedding(var1.word, lang_name, request.concept1)
-            emb2 = embedding_service.get_embedding(trans2.main_translation, lang_name, request.concept2)
-            sim = embedding_service.compute_similarity(var_emb1, emb2)
+    for i, var1 in enumerate(trans1.variations, start=1):
+        variation_similarities.append({
+            "similarity": float(grid[i, 0]),
+            "context": f"{var1.context} (Variation) - Main translation",
+            "words": (var1.word, trans2.main_translation)
+        })
+        for j, var2 in enumerate(trans2.variations, start=1):
             variation_similarities.append({
-                "similarity": float(sim),
-                "context": f"{var1.context} (Variation) - Main translation",
-                "words": (var1.word, trans2.main_translation)
+                "similarity": float(grid[i, j]),
+                "context": f"{var1.context} - {var2.context}",
+                "words": (var1.word, var2.word)
             })
-            
-            # If trans2 has variations, compare with those too
-            if trans2.variations:
-                for var2 in trans2.variations:
-                    var_emb2 = embedding_service.get_embedding(var2.word, lang_name, request.concept2)
-                    sim = embedding_service.compute_similarity(var_emb1, var_emb2)
-                    variation_similarities.append({
-                        "similarity": float(sim),
-                        "context": f"{var1.context} - {var2.context}",
-                        "words": (var1.word, var2.word)
-                    })
     
     # Compare variations from trans2 with main translation of trans1
-    if trans2.variations:
-        # Compare trans2 variations with trans1 main translation
-        for var2 in trans2.variations:
-            var_emb2 = embedding_service.get_embedding(var2.word, lang_name, request.concept2)
-            emb1 = embedding_service.get_embedding(trans1.main_translation, lang_name, request.concept1)
-            sim = embedding_service.compute_similarity(emb1, var_emb2)
-            variation_similarities.append({
-                "similarity": float(sim),
-                "context": f"Main translation - {var2.context} (Variation)",
-                "words": (trans1.main_translation, var2.word)
-            })
+    for j, var2 in enumerate(trans2.variations, start=1):
+        variation_similarities.append({
+            "similarity": float(grid[0, j]),
+            "context": f"Main translation - {var2.context} (Variation)",
+            "words": (trans1.main_translation, var2.word)
+        })
     
     # Sort variations by similarity score
     variation_similarities.sort(key=lambda x: x["similarity"], reverse=True)
@@ -299,17 +470,54 @@ async def process_language(
             "concept2": trans2.usage_notes
         },
         language_colexifications={
-            request.concept1: concept1_colexs,
-            request.concept2: concept2_colexs
+            request.concept1: inputs.concept1_colexs,
+            request.concept2: inputs.concept2_colexs
         },
         family_colexifications={}  # We'll add this later when we have all results
     )
 
+
 @app.post("/compare-concepts", response_model=Dict[str, ComparisonResult])
-async def compare_concepts(request: ComparisonRequest):
-    """Compare concepts with both embedding similarities and colexification patterns"""
+async def compare_concepts(
+    request: ComparisonRequest,
+    http_request: Request,
+    response_format: Literal["full", "compact"] = Query("full", alias="format"),
+    embeddings: Literal["none", "f16", "float"] = Query("none"),
+):
+    """
+    Compare concepts with both embedding similarities and colexification patterns.
+    format=compact sends family colexifications once and embeddings only as
+    requested (see response_encoding); the default is one full ComparisonResult per language.
+    """
+    await asyncio.gather(
+        services.get("graph_workers"), services.get("translation"), services.get("embedding")
+    )
+    async with admission["compare"].slot(client_id(http_request), DisconnectWatch(http_request)):
+        results, family_colexifications = await run_comparison(request)
+
+    has_family = {lang: bool(get_language_family(lang)) for lang in results}
+    if response_format == "compact":
+        # Returned as-is: response_model describes the full format
+        return FastJSONResponse(
+            compact_comparison(results, family_colexifications, has_family, embeddings)
+        )
+    # Add family colexifications (to copies: cached results are shared)
+    return {
+        lang: result.model_copy(update={"family_colexifications": family_colexifications})
+        if has_family[lang] else result
+        for lang, result in results.items()
+    }
+
+
+async def run_comparison(request: ComparisonRequest) -> Tuple[Dict[str, ComparisonResult], dict]:
+    """
+    Every requested language's ComparisonResult (without family colexifications),
+    plus the family colexification patterns they share. Languages in the
+    result cache are reused; the rest are computed in one pass and cached.
+    """
     try:
         results = {}
+        fingerprint = await comparison_fingerprint()
         
         # Get language families for the requested languages
         families = set()
@@ -321,36 +529,46 @@ async def compare_concepts(request: ComparisonRequest):
         print(f"Requested families: {families}") 
 
         # Get detailed family colexification patterns
-        family_colexifications = clics_service.get_family_colexifications(
-            request.concept1,
-            request.concept2,
-            families=list(families)
-        ) 
+        family_colexifications = await cached_family_colexifications(request, families, fingerprint)
+
+        keys = {lang: language_key(request, lang, fingerprint) for lang in request.languages}
+        cached = await executor.run(IO, result_cache.get_results, keys)
+        missing = [lang for lang in request.languages if lang not in cached]
+        if cached:
+            print(f"Result cache: {len(cached)} of {len(keys)} languages cached")
         
-        for lang in request.languages:
-            lang_name = SUPPORTED_LANGUAGES[lang]['name']
-            print(f"Processing language: {lang_name}")
-            family = get_language_family(lang)
-            
-            try:
-                # Use the shared process_language function
-                result = await process_language(request, lang, lang_name, family)
-                
-                # Add family colexifications
-                if family:
-                    result.family_colexifications = family_colexifications
-                
-                results[lang] = result
-                
-            except Exception as e:
-                print(f"Error processing language {lang}: {str(e)}")
+        # Translate every missing language concurrently; failures come back as exceptions
+        await prefetch_translations(request, missing)
+        prepared = await asyncio.gather(
+            *(prepare_language(request, lang, SUPPORTED_LANGUAGES[lang]['name'], get_language_family(lang))
+              for lang in missing),
+            return_exceptions=True,
+        )
+        all_inputs = []
+        for lang, inputs in zip(missing, prepared):
+            if isinstance(inputs, Exception):
+                print(f"Error processing language {lang}: {str(inputs)}")
                 # Skip this language and continue with others
                 continue
+            all_inputs.append(inputs)
+
+        # One batched embedding pass across every missing language
+        computed = {}
+        if all_inputs:
+            vectors = await executor.run(MODEL, embed_languages, request, all_inputs)
+            for inputs in all_inputs:
+                computed[inputs.lang] = build_language_result(request, inputs, vectors)
+            await executor.run(IO, result_cache.put_results, {keys[lang]: result for lang, result in computed.items()})
+
+        for lang in request.languages:
+            result = cached.get(lang) or computed.get(lang)
+            if result is not None:
+                results[lang] = result
         
         if not results:
             raise HTTPException(status_code=500, detail="Failed to process any languages")
             
-        return results
+        return results, family_colexifications
         
     except Exception as e:
         print(f"Error in comparison: {str(e)}")
@@ -367,11 +585,40 @@ def get_language_family(lang_code: str) -> Optional[str]:
         return SUPPORTED_LANGUAGES[lang_code]['family']
     return None
 
-async def stream_comparison_results(request: ComparisonRequest) -> AsyncGenerator[str, None]:
-    """Stream comparison results with progress updates"""
+async def stream_comparison_results(
+    request: ComparisonRequest,
+    http_request: Optional[Request] = None,
+    ticket: Optional[Ticket] = None,
+    embeddings: Optional[str] = None,
+) -> AsyncGenerator[str, None]:
+    """
+    Stream comparison results as server-sent events.
+
+    The first event carries family_colexifications (shared by every language).
+    Each language then gets its own event with its result as soon as it is
+    ready (or `failed`), and the last event carries only a summary. Languages
+    are translated concurrently (at most LANGUAGE_CONCURRENCY at once);
+    whichever have finished are embedded together in a worker thread while
+    the rest keep translating, so nothing is held back for the slowest.
+
+    With an admission ticket, the stream first waits for its slot, sending
+    `queued` events with its queue position, and frees the slot at the end.
+    Languages in the result cache are sent first, without any new work.
+    With `embeddings` set (compact format), results are sent as
+    compact_result(result, embeddings) instead of full ComparisonResults.
+
+    If the client disconnects (or the response is cancelled), unfinished
+    languages and their translation calls are cancelled and the stream is
+    recorded in cancelled_work.
+    """
     try:
-        results = {}
+        started = time.perf_counter()
+        watch = DisconnectWatch(http_request)
         total_languages = len(request.languages)
+
+        if ticket is not None:
+            async for position in ticket.positions(watch):
+                yield f"data: {json.dumps({'progress': 0, 'processed': 0, 'total': total_languages, 'queued': True, 'queue_position': position})}\n\n"
         
         # Get language families for the requested languages
         families = set()
@@ -380,56 +627,151 @@ async def stream_comparison_results(request: ComparisonRequest) -> AsyncGenerato
             if family:
                 families.add(family)
 
-        # Get detailed family colexification patterns
-        family_colexifications = clics_service.get_family_colexifications(
-            request.concept1,
-            request.concept2,
-            families=list(families)
-        )
-        
-        for idx, lang in enumerate(request.languages):
-            lang_name = SUPPORTED_LANGUAGES[lang]['name']
-            family = get_language_family(lang)
-            
-            try:
-                # Process the language
-                result = await process_language(request, lang, lang_name, family)
-                
-                # Add family colexifications
-                if family:
-                    result.family_colexifications = family_colexifications
-                
-                results[lang] = result.model_dump()
-                
-                # Send progress update
-                progress = {
-                    "progress": round((idx + 1) * 100 / total_languages),
-                    "current_language": lang_name,
-                    "processed": idx + 1,
-                    "total": total_languages
-                }
-                
-                # Include full results only in final update
-                if idx + 1 == total_languages:
-                    progress["results"] = results
-                    
-                yield f"data: {json.dumps(progress)}\n\n"
-                await asyncio.sleep(0.1)  # Small delay to prevent overwhelming
-                
-            except Exception as e:
-                logger.error(f"Error processing language {lang}: {str(e)}")
-                # Skip this language and continue with others
-                continue
+        # Get detailed family colexification patterns, sent once up front
+        fingerprint = await comparison_fingerprint()
+        family_colexifications = await cached_family_colexifications(request, families, fingerprint)
+        yield "data: " + dumps({'progress': 0, 'processed': 0, 'total': total_languages, 'family_colexifications': family_colexifications}).decode() + "\n\n"
+
+        limit = asyncio.Semaphore(LANGUAGE_CONCURRENCY)
+
+        async def prepare(lang: str):
+            async with limit:
+                try:
+                    return lang, await prepare_language(
+                        request, lang, SUPPORTED_LANGUAGES[lang]['name'], get_language_family(lang)
+                    )
+                except Exception as e:
+                    logger.error(f"Error processing language {lang}: {str(e)}")
+                    return lang, None
+
+        keys = {lang: language_key(request, lang, fingerprint) for lang in request.languages}
+        cached = await executor.run(IO, result_cache.get_results, keys)
+        missing = [lang for lang in request.languages if lang not in cached]
+
+        # Translations start now; prefetch first so batch mode can group them
+        translation_service = services.instance("translation")
+        prefetched = await prefetch_translations(request, missing)
+        pending = {asyncio.ensure_future(prepare(lang)) for lang in missing}
+        processed = 0
+        failed = []
+        reported = set()
+
+        def serialise(result: ComparisonResult) -> dict:
+            return result.model_dump() if embeddings is None else compact_result(result, embeddings)
+
+        def event(lang: str, **fields) -> str:
+            return "data: " + dumps({
+                "progress": round(processed * 100 / total_languages),
+                "current_language": SUPPORTED_LANGUAGES.get(lang, {}).get('name', lang),
+                "language": lang,
+                "processed": processed,
+                "total": total_languages,
+                **fields,
+            }).decode() + "\n\n"
+
+        cancelled = None  # why the stream stopped early, if it did
+        try:
+            for lang in keys:
+                if lang not in cached:
+                    continue
+                processed += 1
+                reported.add(lang)
+                yield event(lang, has_family=bool(get_language_family(lang)), result=serialise(cached[lang]))
+
+            while pending:
+                done, pending = await watch.wait(pending)
+                ready = []
+                for task in done:
+                    lang, inputs = task.result()
+                    if inputs is None:
+                        processed += 1
+                        reported.add(lang)
+                        failed.append(lang)
+                        yield event(lang, failed=True)
+                    else:
+                        ready.append(inputs)
+                if not ready:
+                    continue
+
+                # Embed everything that is ready in one batch, off the event loop
+                vectors = await executor.run(MODEL, embed_languages, request, ready)
+                computed = {inputs.lang: build_language_result(request, inputs, vectors) for inputs in ready}
+                await executor.run(
+                    IO, result_cache.put_results, {keys[lang]: result for lang, result in computed.items()}
+                )
+                for inputs in ready:
+                    processed += 1
+                    reported.add(inputs.lang)
+                    result = computed[inputs.lang]
+                    yield event(
+                        inputs.lang,
+                        has_family=bool(inputs.family),
+                        result=serialise(result),
+                    )
+        except ClientDisconnected:
+            cancelled = "disconnected"
+            return
+        except (asyncio.CancelledError, GeneratorExit):
+            cancelled = "closed"
+            raise
+        finally:
+            # Nothing below awaits: the response may already be cancelled
+            for task in pending:
+                task.cancel()
+            abandoned = translation_service.abandon(prefetched)
+            if cancelled:
+                cancelled_work.record(
+                    "compare", cancelled,
+                    concepts=[request.concept1, request.concept2],
+                    processed=processed,
+                    total=total_languages,
+                    prefetches_cancelled=abandoned,
+                    elapsed_seconds=round(time.perf_counter() - started, 3),
+                    unfinished_languages=[
+                        lang for lang in request.languages if lang not in reported
+                    ],
+                )
+
+        summary = {
+            "completed": total_languages - len(failed),
+            "failed": failed,
+            "cached": len(cached),
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+        }
+        yield f"data: {json.dumps({'progress': 100, 'processed': processed, 'total': total_languages, 'summary': summary})}\n\n"
                 
+    except ClientDisconnected:
+        pass  # left while queued; nothing was started
     except Exception as e:
         error_data = {"error": str(e)}
         yield f"data: {json.dumps(error_data)}\n\n"
+    finally:
+        if ticket is not None:
+            ticket.release()
 
 @app.post("/compare-concepts-progress")
-async def compare_concepts_with_progress(request: ComparisonRequest):
-    """Compare concepts with progress updates via server-sent events"""
-    return StreamingResponse(
-        stream_comparison_results(request),
+async def compare_concepts_with_progress(
+    request: ComparisonRequest,
+    http_request: Request,
+    response_format: Literal["full", "compact"] = Query("full", alias="format"),
+    embeddings: Literal["none", "f16", "float"] = Query("none"),
+):
+    """
+    Compare concepts with progress updates via server-sent events.
+    format=compact sends each language's result without embeddings, or
+    with them encoded as `embeddings` asks (see response_encoding).
+    """
+    await asyncio.gather(
+        services.get("graph_workers"), services.get("translation"), services.get("embedding")
+    )
+    # Rejected here (429/503) rather than mid-stream if the queue is full
+    ticket = admission["compare"].enqueue(client_id(http_request))
+    return AdmittedStreamingResponse(
+        stream_comparison_results(
+            request, http_request, ticket,
+            embeddings=embeddings if response_format == "compact" else None,
+        ),
+        ticket,
         media_type="text/event-stream"
     )
 
@@ -438,38 +780,45 @@ async def get_semantic_chains(
     concept1: str,
     concept2: str,
     family: str,
-    max_depth: int = 4
+    http_request: Request,
+    max_depth: int = Query(4, ge=1, le=6),
+    top_k: int = Query(20, ge=1, le=100)
 ):
-    """Get semantic chains between two concepts within a language family."""
-    try:
-        chains = clics_service.find_chains(
-            concept1.upper(),  # CLICS uses uppercase
-            concept2.upper(),
-            family,
-            max_depth
-        )
-        
-        return {
-            "chains": chains,
-            "family": family,
-            "concepts": [concept1, concept2]
-        }
-        
-    except Exception as e:
-        logger.error(f"Error finding semantic chains: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error finding semantic chains: {str(e)}"
-        )
+    """Get the best-scoring semantic chains between two concepts within a language family."""
+    await services.get("graph_workers")
+    async with admission["chains"].slot(client_id(http_request), DisconnectWatch(http_request)):
+        try:
+            chains = await executor.graph(
+                "find_chains",
+                concept1.upper(),  # CLICS uses uppercase
+                concept2.upper(),
+                family,
+                max_depth,
+                top_k
+            )
+
+            return {
+                "chains": chains,
+                "family": family,
+                "concepts": [concept1, concept2]
+            }
+
+        except Exception as e:
+            logger.error(f"Error finding semantic chains: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error finding semantic chains: {str(e)}"
+            )
     
 @app.get("/search-clics-concepts/{query}")
-async def search_clics_concepts(query: str):
+async def search_clics_concepts(query: str, limit: Optional[int] = Query(None, ge=1, le=1000)):
     """Search CLICS concepts matching query string"""
+    clics_service = await services.get("clics")
     try:
-        matches = clics_service.search_concepts(query)
+        matches, total = await executor.run(IO, clics_service.search_concepts_page, query, limit)
         return {
             "matches": matches,
-            "total": len(matches)
+            "total": total
         }
     except Exception as e:
         logger.error(f"Error searching CLICS concepts: {str(e)}")
@@ -479,14 +828,31 @@ async def search_clics_concepts(query: str):
         )
 
 @app.get("/clics-concepts")
-async def get_clics_concepts():
-    """Get all concepts in CLICS vocabulary"""
+async def get_clics_concepts(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=5000)
+):
+    """
+    Get all concepts in CLICS vocabulary, most frequent first.
+
+    Without `limit` the whole vocabulary is returned. With `limit`, pass the
+    returned `next_cursor` back as `cursor` to fetch the following page.
+    """
+    clics_service = await services.get("clics")
+    start = 0
+    if cursor:
+        try:
+            start = int(cursor)
+        except ValueError:
+            start = -1
+        if not 0 <= start <= len(clics_service.concept_table):
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
     try:
-        concepts = clics_service.get_all_concepts()
-        return {
-            "concepts": concepts,
-            "total": len(concepts)
-        }
+        # Body is pre-serialised at load time; skip re-encoding on every call
+        return Response(
+            content=clics_service.concept_table.page_payload(start, limit),
+            media_type="application/json"
+        )
     except Exception as e:
         logger.error(f"Error getting CLICS concepts: {str(e)}")
         raise HTTPException(
@@ -499,14 +865,6 @@ async def get_clics_concepts():
 # Atlas API endpoints (multi-concept, Concepticon-anchored)
 # ---------------------------------------------------------------------------
 
-def _require_atlas():
-    if not _atlas_available:
-        raise HTTPException(
-            status_code=503,
-            detail="Atlas services not available. Run backend/scripts/run_ingestion.py first.",
-        )
-
-
 @app.get("/concepts", response_model=List[ConceptAnchor])
 async def search_concepts(
     q: str = Query(..., min_length=1, description="Search query"),
@@ -516,8 +874,8 @@ async def search_concepts(
     Search the Concepticon registry by concept label.
     Returns ConceptAnchor objects with CLICS linkage info.
     """
-    _require_atlas()
-    return registry_service.search(q, limit=limit)
+    registry_service = await services.get("registry")
+    return await executor.run(IO, registry_service.search, q, limit=limit)
 
 
 @app.get("/concepts/{concepticon_id}/neighbors")
@@ -525,20 +883,34 @@ async def get_concept_neighbors(
     concepticon_id: str,
     limit: int = Query(10, ge=1, le=30),
 ):
-    """Return concepts in the same semantic field (quick neighbor approximation)."""
-    _require_atlas()
-    anchor = registry_service.get_by_id(concepticon_id)
+    """Return nearest colexification neighbours (semantic-field approximation if no embedding)."""
+    registry_service = await services.get("registry")
+    anchor = await executor.run(IO, registry_service.get_by_id, concepticon_id)
     if not anchor:
         raise HTTPException(status_code=404, detail="Concept not found")
-    neighbors = registry_service.get_neighbors(concepticon_id, limit=limit)
+    neighbors = await executor.run(IO, registry_service.get_neighbors, concepticon_id, limit=limit)
     return {"anchor": anchor, "neighbors": neighbors}
 
 
+@app.get("/concepts/{concepticon_id}/similar")
+async def get_similar_concepts(
+    concepticon_id: str,
+    limit: int = Query(10, ge=1, le=100),
+):
+    """Return the nearest concepts in colexification-embedding space, with cosine scores."""
+    registry_service = await services.get("registry")
+    anchor = await executor.run(IO, registry_service.get_by_id, concepticon_id)
+    if not anchor:
+        raise HTTPException(status_code=404, detail="Concept not found")
+    similar = await executor.run(IO, registry_service.get_similar, concepticon_id, limit=limit)
+    return {"anchor": anchor, "similar": similar}
+
+
 @app.get("/dataset-versions")
 async def get_dataset_versions():
     """Return versions of all ingested data sources."""
-    _require_atlas()
-    return registry_service.get_dataset_versions()
+    registry_service = await services.get("registry")
+    return await executor.run(IO, registry_service.get_dataset_versions)
 
 
 @app.get("/semantic-map", response_model=SemanticMapResponse)
@@ -551,62 +923,98 @@ async def get_semantic_map(
     Return the CLICS colexification neighborhood graph for the selected concepts.
     When family is given, counts and neighbors are filtered to that family only.
     """
-    _require_atlas()
+    registry_service, _, _ = await asyncio.gather(
+        services.get("registry"), services.get("colexification"), services.get("graph_workers")
+    )
     raw_ids = [c.strip() for c in concepts.split(",") if c.strip()]
     if not raw_ids or len(raw_ids) > 6:
         raise HTTPException(status_code=400, detail="Provide 1–6 concept IDs or labels")
 
-    anchors: list[ConceptAnchor] = []
-    for raw in raw_ids:
-        anchor = registry_service.get_by_id(raw) or registry_service.get_by_label(raw.upper())
-        if not anchor:
-            raise HTTPException(status_code=404, detail=f"Concept not found: {raw!r}")
-        anchors.append(anchor)
+    resolved = await executor.run(IO, registry_service.get_many, raw_ids)
+    missing = [raw for raw in raw_ids if raw not in resolved]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Concept not found: {missing[0]!r}")
+    anchors = [resolved[raw] for raw in raw_ids]
 
-    return colex_service.get_semantic_map(
-        anchors, max_neighbors=max_neighbors, family_filter=family or None
-    )
+    return await executor.graph("semantic_map", anchors, max_neighbors, family or None)
 
 
-async def _stream_study(request: StudyRequest):
-    """Generator for SSE-streamed study results."""
+async def _stream_study(
+    request: StudyRequest,
+    http_request: Optional[Request] = None,
+    ticket: Optional[Ticket] = None,
+):
+    """
+    Generator for SSE-streamed study results. If the client disconnects, the
+    pipeline step in progress (e.g. its translations) is cancelled and the
+    stream is recorded in cancelled_work. With an admission ticket, queue
+    positions are streamed until the study gets its slot.
+    """
+    started = time.perf_counter()
+    last = {"progress": 0, "step": "Starting"}
+
+    def record(reason: str) -> None:
+        cancelled_work.record(
+            "study", reason,
+            concepts=[anchor.label for anchor in request.concepts],
+            progress=last.get("progress"),
+            step=last.get("step"),
+            elapsed_seconds=round(time.perf_counter() - started, 3),
+        )
+
     try:
-        async for update in study_pipeline.stream(request):
+        watch = DisconnectWatch(http_request)
+        if ticket is not None:
+            async for position in ticket.positions(watch):
+                yield f"data: {json.dumps({'progress': 0, 'step': f'Waiting in queue (position {position})', 'queue_position': position})}\n\n"
+        async for update in watch.iterate(services.instance("study_pipeline").stream(request)):
+            last = update
             # Serialize Pydantic models before JSON encoding
             if "result" in update and hasattr(update["result"], "model_dump"):
                 update = {**update, "result": update["result"].model_dump()}
             yield f"data: {json.dumps(update, default=str)}\n\n"
             await asyncio.sleep(0)
+    except ClientDisconnected:
+        record("disconnected")
+    except (asyncio.CancelledError, GeneratorExit):
+        if "result" not in last:
+            record("closed")
+        raise
     except Exception as e:
         logger.error(f"Study pipeline error: {e}", exc_info=True)
         yield f"data: {json.dumps({'error': str(e)})}\n\n"
+    finally:
+        if ticket is not None:
+            ticket.release()
 
 
 @app.get("/families")
 async def get_families():
     """Return all language family names present in the CLICS graph, sorted by language count."""
-    _require_atlas()
+    clics_service = await services.get("clics")
     family_map = clics_service.family_language_map
     families = [
-        {"name": family, "language_count": len(langs)}
-        for family, langs in family_map.items()
+        {"name": family, "language_count": family_map.size(family)}
+        for family in family_map
     ]
     families.sort(key=lambda x: -x["language_count"])
     return families
 
 
 @app.post("/study-progress")
-async def run_study_with_progress(request: StudyRequest):
+async def run_study_with_progress(request: StudyRequest, http_request: Request):
     """
     Run a multi-concept cross-linguistic study with SSE streaming progress.
     Accepts 2–6 ConceptAnchor objects and an optional list of family names.
     """
-    _require_atlas()
+    await services.get("study_pipeline")
     if not (2 <= len(request.concepts) <= 6):
         raise HTTPException(status_code=400, detail="Provide 2–6 concepts")
 
-    return StreamingResponse(
-        _stream_study(request),
+    ticket = admission["study"].enqueue(client_id(http_request))
+    return AdmittedStreamingResponse(
+        _stream_study(request, http_request, ticket),
+        ticket,
         media_type="text/event-stream",
     )
 
@@ -614,6 +1022,7 @@ async def run_study_with_progress(request: StudyRequest):
 @app.get("/test-clics/{concept}")
 async def test_clics(concept: str):
     """Test endpoint for CLICS integration"""
+    clics_service = await services.get("clics")
     try:
         results = clics_service.get_colexifications(concept)
         return {
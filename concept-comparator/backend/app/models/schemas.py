@@ -17,6 +17,7 @@ class Translation(BaseModel):
     main_translation: str
     variations: List[TranslationVariant]
     usage_notes: str
+    source: str = "llm"               # tier that produced it: "omw" | "llm"
 
 class ComparisonRequest(BaseModel):
     concept1: str
@@ -117,7 +118,7 @@ class StudyRequest(BaseModel):
     """Request to run a multi-concept study."""
     concepts: List[ConceptAnchor]      # 2–6 concepts
     families: List[str] = []           # family names to drill into (optional)
-    show_translations: bool = False    # triggers TranslateGemma calls
+    show_translations: bool = False    # OMW lemmas, else TranslateGemma calls
 
 
 class StudyResult(BaseModel):
@@ -133,6 +134,8 @@ class StudyResult(BaseModel):
     colexification_embeddings: Dict[str, List[float]]
     # Optional surface translations (keyed by lang_code, then concept index)
     translations: Optional[Dict[str, List[str]]] = None
+    # Tier behind each translation ("omw" | "llm"), same keys and order as translations
+    translation_sources: Optional[Dict[str, List[Optional[str]]]] = None
     dataset_versions: Dict[str, str] = {}
 
 
@@ -146,6 +149,11 @@ class SemanticMapNode(BaseModel):
     language_frequency: int = 0
 
 
+class SimilarConcept(ConceptAnchor):
+    """Concept ranked by colexification-embedding similarity to a query concept."""
+    score: float               # cosine similarity of Node2Vec embeddings
+
+
 class SemanticMapEdge(BaseModel):
     """Colexification edge between two concepts."""
     source: str
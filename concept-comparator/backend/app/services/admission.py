@@ -0,0 +1,276 @@
+"""
+Admission control for the expensive endpoints.
+
+Each endpoint class (compare, study, chains) has its own controller: at
+most `concurrency` requests run at once, and up to `max_queue` more wait
+for a slot. Waiting requests are admitted round-robin across clients (one
+per client in turn), so one client's burst cannot starve everyone else,
+and a single client may hold at most `client_queue` of the queued places.
+
+A request that cannot be queued is rejected straight away with Overloaded:
+503 when the queue is full, 429 when that client already has its share
+queued. Both carry a Retry-After estimated from recent run times.
+
+Settings per class, e.g. for compare:
+  ADMISSION_COMPARE_CONCURRENCY, ADMISSION_COMPARE_QUEUE, ADMISSION_COMPARE_CLIENT_QUEUE
+
+Clients are identified by their address (request.client.host).
+
+Streaming endpoints take their ticket in the handler (so a refusal is an
+HTTP error, not a stream event) and hand it to AdmittedStreamingResponse,
+which releases it when the response ends however it ends, including when
+the client is gone before the body starts.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.services.disconnect import DisconnectWatch
+from app.services.executor import env_int
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+
+# Until a class has finished a request, assume this many seconds per request
+INITIAL_RUN_SECONDS = 10.0
+MAX_RETRY_AFTER = 300
+
+
+class Overloaded(Exception):
+    """A request was refused admission; maps to an HTTP 429/503 with Retry-After."""
+
+    def __init__(self, endpoint_class: str, status_code: int, retry_after: int, detail: str) -> None:
+        super().__init__(detail)
+        self.endpoint_class = endpoint_class
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+class Ticket:
+    """One request's place in a controller: queued, then running, then done."""
+
+    def __init__(self, controller: "AdmissionController", client: str) -> None:
+        self.controller = controller
+        self.client = client
+        self.state = QUEUED
+        self.enqueued_at = time.perf_counter()
+        self.started_at: Optional[float] = None
+        self._admitted = asyncio.get_running_loop().create_future()
+
+    @property
+    def admitted(self) -> bool:
+        return self.state != QUEUED
+
+    def position(self) -> int:
+        """1-based place in the admission order; 0 once admitted."""
+        return self.controller._position(self) if self.state == QUEUED else 0
+
+    def release(self) -> None:
+        self.controller.release(self)
+
+    async def positions(self, watch: Optional[DisconnectWatch] = None) -> AsyncIterator[int]:
+        """
+        Wait until admitted, yielding the queue position whenever it changes
+        (nothing if admitted straight away). Raises ClientDisconnected via
+        `watch` if the client leaves while queued.
+        """
+        interval = watch.interval if watch is not None else 0.5
+        last = None
+        while self.state == QUEUED:
+            position = self.position()
+            if position != last:
+                last = position
+                yield position
+            await asyncio.wait({self._admitted}, timeout=interval)
+            if watch is not None:
+                await watch.check()
+
+    def _admit(self) -> None:
+        self.state = RUNNING
+        self.started_at = time.perf_counter()
+        if not self._admitted.done():
+            self._admitted.set_result(None)
+
+
+class AdmissionController:
+    def __init__(self, name: str, concurrency: int, max_queue: int, client_queue: Optional[int] = None) -> None:
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.max_queue = max(0, max_queue)
+        self.client_queue = max(1, client_queue if client_queue is not None else max(1, max_queue // 4))
+        self.running = 0
+        self._queues: Dict[str, Deque[Ticket]] = {}
+        self._rotation: Deque[str] = deque()  # clients with queued tickets, next to admit first
+        self.mean_run_seconds = INITIAL_RUN_SECONDS
+        self.admitted = 0
+        self.completed = 0
+        self.rejected = {429: 0, 503: 0}
+        self.abandoned = 0
+        self.max_queued = 0
+        self.wait_seconds = 0.0
+
+    @classmethod
+    def from_env(cls, name: str, concurrency: int, max_queue: int) -> "AdmissionController":
+        prefix = f"ADMISSION_{name.upper()}_"
+        max_queue = env_int(prefix + "QUEUE", max_queue)
+        client_queue = (os.getenv(prefix + "CLIENT_QUEUE") or "").strip()
+        return cls(
+            name,
+            env_int(prefix + "CONCURRENCY", concurrency),
+            max_queue,
+            int(client_queue) if client_queue else None,
+        )
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def enqueue(self, client: str) -> Ticket:
+        """
+        Take a slot if one is free, else a place in the queue. Raises
+        Overloaded if neither is available. Must be called on the event loop.
+        """
+        ticket = Ticket(self, client)
+        if self.running < self.concurrency and not self._rotation:
+            self._start(ticket)
+            return ticket
+
+        queued = self.queued
+        if queued >= self.max_queue:
+            self._reject(503, queued, f"{self.name} queue is full ({self.max_queue} waiting)")
+        client_queued = len(self._queues.get(client, ()))
+        if client_queued >= self.client_queue:
+            self._reject(429, client_queued,
+                         f"too many queued {self.name} requests from this client ({client_queued})")
+
+        if client not in self._queues:
+            self._queues[client] = deque()
+            self._rotation.append(client)
+        self._queues[client].append(ticket)
+        self.max_queued = max(self.max_queued, queued + 1)
+        return ticket
+
+    def release(self, ticket: Ticket) -> None:
+        """Free the ticket's slot or queue place. Safe to call more than once."""
+        if ticket.state == QUEUED:
+            queue = self._queues.get(ticket.client)
+            if queue is not None and ticket in queue:
+                queue.remove(ticket)
+                if not queue:
+                    del self._queues[ticket.client]
+                    self._rotation.remove(ticket.client)
+            self.abandoned += 1
+        elif ticket.state == RUNNING:
+            self.running -= 1
+            elapsed = time.perf_counter() - ticket.started_at
+            if self.completed:
+                self.mean_run_seconds = 0.8 * self.mean_run_seconds + 0.2 * elapsed
+            else:
+                self.mean_run_seconds = elapsed
+            self.completed += 1
+        ticket.state = DONE
+        self._admit_next()
+
+    @asynccontextmanager
+    async def slot(self, client: str, watch: Optional[DisconnectWatch] = None):
+        """Hold a slot for the body of the `async with` (non-streaming endpoints)."""
+        ticket = self.enqueue(client)
+        try:
+            async for _ in ticket.positions(watch):
+                pass
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def _start(self, ticket: Ticket) -> None:
+        self.running += 1
+        self.admitted += 1
+        self.wait_seconds += time.perf_counter() - ticket.enqueued_at
+        ticket._admit()
+
+    def _admit_next(self) -> None:
+        # Round-robin: take the head of the next client's queue, then move it to the back
+        while self.running < self.concurrency and self._rotation:
+            client = self._rotation.popleft()
+            queue = self._queues[client]
+            ticket = queue.popleft()
+            if queue:
+                self._rotation.append(client)
+            else:
+                del self._queues[client]
+            self._start(ticket)
+
+    def _position(self, ticket: Ticket) -> int:
+        # Ahead: `depth` full rounds (one ticket from every client that still
+        # has one), then the clients before this one in the rotation
+        depth = self._queues[ticket.client].index(ticket)
+        ahead = 0
+        before = True
+        for client in self._rotation:
+            if client == ticket.client:
+                before = False
+            size = len(self._queues[client])
+            ahead += min(size, depth)
+            if before and size > depth:
+                ahead += 1
+        return ahead + 1
+
+    def _reject(self, status_code: int, ahead: int, detail: str) -> None:
+        self.rejected[status_code] += 1
+        # Time for the requests ahead to drain through the slots
+        estimate = self.mean_run_seconds * (ahead + 1) / self.concurrency
+        retry_after = min(MAX_RETRY_AFTER, max(1, math.ceil(estimate)))
+        raise Overloaded(self.name, status_code, retry_after, detail)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "client_queue": self.client_queue,
+            "running": self.running,
+            "queued": self.queued,
+            "clients_queued": len(self._queues),
+            "max_queued": self.max_queued,
+            "admitted": self.admitted,
+            "completed": self.completed,
+            "rejected": {str(code): n for code, n in self.rejected.items()},
+            "abandoned": self.abandoned,
+            "mean_wait_ms": round(self.wait_seconds * 1000 / self.admitted, 2) if self.admitted else 0.0,
+            "mean_run_seconds": round(self.mean_run_seconds, 3),
+        }
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """
+    A StreamingResponse that owns an admission ticket. The body generator
+    only runs its own cleanup once iteration has started, so a client that
+    disconnects before the first chunk would otherwise keep the slot (or
+    queue place) forever; the ticket is released here instead.
+    """
+
+    def __init__(self, content: Any, ticket: Ticket, **kwargs: Any) -> None:
+        super().__init__(content, **kwargs)
+        self.ticket = ticket
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.ticket.release()
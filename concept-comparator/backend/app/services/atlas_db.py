@@ -0,0 +1,135 @@
+"""
+Connection handling for atlas.sqlite.
+
+Request-time services read through AtlasConnectionPool, which hands every
+thread its own read-only connection (URI mode=ro, PRAGMA query_only) with a
+memory-mapped, enlarged page cache. Connections are never shared across
+threads, so concurrent requests in FastAPI's threadpool read in parallel
+instead of queueing on one `check_same_thread=False` handle.
+
+Ingestion scripts write through atlas_writer(), a read-write connection that
+commits on success, rolls back on error and always closes.
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+DB_CANDIDATES = [
+    Path(__file__).resolve().parents[3] / "data" / "atlas.sqlite",
+    Path(__file__).resolve().parents[2] / "data" / "atlas.sqlite",
+]
+
+# Per-connection tuning; override with ATLAS_SQLITE_MMAP_MB / ATLAS_SQLITE_CACHE_MB
+DEFAULT_MMAP_MB = 256
+DEFAULT_CACHE_MB = 32
+BUSY_TIMEOUT_MS = 5000
+
+
+def find_atlas_db() -> Path:
+    for p in DB_CANDIDATES:
+        if p.exists():
+            return p
+    raise FileNotFoundError(
+        "atlas.sqlite not found. Run backend/scripts/run_ingestion.py first.\n"
+        "Checked: " + ", ".join(str(p) for p in DB_CANDIDATES)
+    )
+
+
+def _env_mb(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+class AtlasConnectionPool:
+    """One read-only connection per thread, opened lazily on first use."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        mmap_mb: Optional[int] = None,
+        cache_mb: Optional[int] = None,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.mmap_bytes = (mmap_mb if mmap_mb is not None
+                           else _env_mb("ATLAS_SQLITE_MMAP_MB", DEFAULT_MMAP_MB)) << 20
+        self.cache_kib = (cache_mb if cache_mb is not None
+                          else _env_mb("ATLAS_SQLITE_CACHE_MB", DEFAULT_CACHE_MB)) << 10
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+
+    def connection(self) -> sqlite3.Connection:
+        """The calling thread's read-only connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            f"{self.db_path.resolve().as_uri()}?mode=ro",
+            uri=True,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute(f"PRAGMA mmap_size = {self.mmap_bytes}")
+        # Negative cache_size is in KiB rather than pages
+        conn.execute(f"PRAGMA cache_size = -{self.cache_kib}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    def close_all(self) -> None:
+        """Close every connection handed out (threads reopen on next use)."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        self._local = threading.local()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # Owned by another thread; it is dropped with that thread
+                pass
+
+
+_pools: Dict[Path, AtlasConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: Optional[Path] = None) -> AtlasConnectionPool:
+    """Process-wide pool for `db_path` (default: the discovered atlas.sqlite)."""
+    path = Path(db_path or find_atlas_db()).resolve()
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            pool = _pools[path] = AtlasConnectionPool(path)
+        return pool
+
+
+@contextmanager
+def atlas_writer(db_path: Path) -> Iterator[sqlite3.Connection]:
+    """
+    Read-write connection for ingestion. Creates the database if needed,
+    commits when the block succeeds, rolls back if it raises, always closes.
+    """
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path), timeout=BUSY_TIMEOUT_MS / 1000)
+    try:
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = -{DEFAULT_CACHE_MB << 10}")
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
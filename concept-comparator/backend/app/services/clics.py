@@ -1,14 +1,27 @@
-import networkx as nx
 from pathlib import Path
-from typing import Dict, List, Set, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any, Tuple
+import heapq
+import itertools
 import os
+import time
 import numpy as np
 from app.models.schemas import LanguageColexification
 from app.constants.clics_mappings import get_clics_codes
+from app.services.clics_index import ConceptTable
+from app.services.clics_snapshot import load_or_compile_snapshot
+
+# Default limits for find_chains so dense hubs return in bounded time
+CHAIN_TOP_K = 20
+CHAIN_MAX_EXPANSIONS = 20000
+CHAIN_TIME_BUDGET_S = 2.0
 
 class ClicsService:
-    def __init__(self):
-        """Initialize by loading the pre-computed network and building family-language mappings."""
+    def __init__(self, search_index: bool = True):
+        """
+        Initialize by loading the pre-computed network and building family-language mappings.
+        search_index=False skips the concept listing/search table (graph worker processes
+        only run graph jobs, which need nothing beyond the memory-mapped snapshot arrays).
+        """
         print("Starting CLICS service initialization...")
         configured_path = (os.getenv("CLICS_NETWORK_PATH") or "").strip()
         network_path, checked_paths = self._resolve_network_path(configured_path)
@@ -24,33 +37,32 @@ class ClicsService:
         print(f"Loading network from {network_path}...")
         
         try:
-            with open(network_path, 'r', encoding='utf-8') as f:
-                gml_data = f.read()
-                
-            # Clean the data to ensure ASCII compatibility
-            gml_data = gml_data.encode('ascii', 'ignore').decode('ascii')
+            # Compiled once per GML version; later starts just load the arrays
+            self.snapshot = load_or_compile_snapshot(network_path)
+            self.wofam_index = self.snapshot.wofam
+            self.language_bits = self.snapshot.language_bits
+            self._iso_masks: Dict[str, np.ndarray] = {}
+            self._edge_score_cache: Dict[str, np.ndarray] = {}
             
-            # Create temporary file with cleaned data
-            temp_path = Path(f"{network_path}.temp")
-            with open(temp_path, 'w') as f:
-                f.write(gml_data)
-                
-            # Load the network from cleaned file
-            self.graph = nx.read_gml(temp_path)
-            
-            # Clean up temp file
-            temp_path.unlink()
-            
-            node_count = len(self.graph.nodes)
-            edge_count = len(self.graph.edges)
-            print(f"Loaded CLICS network with {node_count} nodes and {edge_count} edges")
+            print(f"Loaded CLICS network with {self.snapshot.node_count} nodes "
+                  f"and {self.snapshot.edge_count} edges")
+            print(f"Indexed {len(self.wofam_index)} edges "
+                  f"({len(self.wofam_index.languages)} languages)")
+            self.glosses = self.snapshot.glosses
+            self.family_language_map = self.snapshot.family_languages
+            if not search_index:
+                self.concept_table = None
+                return
+            self.concept_table = ConceptTable.build(
+                self.snapshot.node_attrs, self._edge_frequencies()
+            )
+            print(f"Indexed {len(self.concept_table)} concepts for search")
             
             # Build family-language mapping
             print("Building family-language mapping...")
-            self.family_language_map = self._build_family_language_map()
             print(f"Found {len(self.family_language_map)} language families")
-            for family, langs in self.family_language_map.items():
-                print(f"{family}: {len(langs)} languages")
+            for family in self.family_language_map:
+                print(f"{family}: {self.family_language_map.size(family)} languages")
             print("CLICS service initialization complete")
             
         except Exception as e:
@@ -93,40 +105,45 @@ class ClicsService:
 
         return None, checked_paths
 
-    def _build_family_language_map(self) -> Dict[str, Set[str]]:
-        """Build a mapping from family names to the set of unique languages in each family."""
-        family_language_map = {}
-        
-        # Process each edge in the graph
-        for edge in self.graph.edges(data=True):
-            edge_data = edge[2]  # Get edge attributes
-            
-            # Get languages and families from the edge data
-            if 'wofam' in edge_data:
-                entries = edge_data['wofam'].split(';')
-                for entry in entries:
-                    if not entry:
-                        continue
-                    parts = entry.split('/')
-                    if len(parts) >= 5:
-                        family = parts[4].strip()  # The family is the 5th element
-                        language = parts[3].strip()  # The language code is the 4th element
-                        
-                        if family and language:
-                            if family not in family_language_map:
-                                family_language_map[family] = set()
-                            family_language_map[family].add(language)
-        
-        return family_language_map
+    # Graph accessors over the snapshot's CSR adjacency. Nodes are integer
+    # indices into snapshot.node_ids.
+
+    def adjacency(self, node: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(neighbor indices, wofam edge IDs) for a node; edge ID is -1 when the edge has no wofam."""
+        start, end = self.snapshot.indptr[node], self.snapshot.indptr[node + 1]
+        edges = self.snapshot.adj_edges[start:end]
+        return self.snapshot.indices[start:end], self.snapshot.edge_wofam_ids[edges]
+
+    def neighbors(self, node: int) -> np.ndarray:
+        start, end = self.snapshot.indptr[node], self.snapshot.indptr[node + 1]
+        return self.snapshot.indices[start:end]
+
+    def node_data(self, node: int) -> Dict[str, Any]:
+        return self.snapshot.node_attrs[node]
+
+    def gloss(self, node: int) -> str:
+        """A node's Gloss ("" if it has none), without loading node attributes."""
+        return self.glosses.gloss(node)
+
+    def get_edge_id(self, source: int, target: int) -> Optional[int]:
+        """Return the wofam index ID of the edge between two nodes, if it has one."""
+        neighbors, edge_ids = self.adjacency(source)
+        hits = np.flatnonzero(neighbors == target)
+        if not len(hits) or edge_ids[hits[0]] < 0:
+            return None
+        return int(edge_ids[hits[0]])
         
-    def _get_node_by_gloss(self, concept: str) -> Optional[str]:
-        """Find node ID for a concept by its Gloss"""
-        # Try both original case and uppercase
-        for node, data in self.graph.nodes(data=True):
-            if (data.get('Gloss') == concept or 
-                data.get('Gloss') == concept.upper()):
-                return node
-        return None
+    def _get_node_by_gloss(self, concept: str) -> Optional[int]:
+        """Find node ID for a concept by its Gloss (exact match first, then case-insensitive)"""
+        return self.glosses.node(concept)
+
+    def resolve_glosses(self, concepts: Iterable[Optional[str]]) -> Dict[str, Optional[int]]:
+        """Batch version of _get_node_by_gloss: gloss → node ID (None when absent)."""
+        return {
+            concept: self._get_node_by_gloss(concept)
+            for concept in concepts
+            if concept
+        }
 
     def get_language_colexifications(
         self,
@@ -135,33 +152,54 @@ class ClicsService:
     ) -> List[LanguageColexification]:
         """Get colexifications specific to a language"""
         node_id = self._get_node_by_gloss(concept)
-        if not node_id:
+        if node_id is None:
             return []
             
         colexifications = []
 
-        clics_codes = get_clics_codes(language_code)
+        neighbors, edge_ids = self.adjacency(node_id)
+        keep = edge_ids >= 0
+        neighbors, edge_ids = neighbors[keep], edge_ids[keep]
+
+        # Check which of these colexifications this language has, all edges at once
+        present = self.language_bits.any(edge_ids, self.iso_language_mask(language_code))
         
-        for neighbor in self.graph.neighbors(node_id):
-            neighbor_data = self.graph.nodes[neighbor]
-            edge = self.graph.get_edge_data(node_id, neighbor)
-            
-            if neighbor_data and edge and 'wofam' in edge:
-                # Check if this language has this colexification
-                languages = set()
-                for entry in edge['wofam'].split(';'):
-                    if entry:
-                        parts = entry.split('/')
-                        if len(parts) >= 4:
-                            lang = parts[3].strip()
-                            languages.add(lang)
-                
+        for neighbor, is_present in zip(neighbors.tolist(), present.tolist()):
+            neighbor_concept = self.gloss(neighbor)
+            if neighbor_concept:
                 colexifications.append(LanguageColexification(
-                    concept=neighbor_data['Gloss'],
-                    present=any(code in languages for code in clics_codes)
+                    concept=neighbor_concept,
+                    present=is_present
                 ))
         
         return colexifications
+
+    def iso_language_mask(self, language_code: str) -> np.ndarray:
+        """Packed column mask of the CLICS languages mapped to an ISO 639-3 code (cached)."""
+        mask = self._iso_masks.get(language_code)
+        if mask is None:
+            language_ids = self.wofam_index.language_ids
+            mask = self.language_bits.language_mask(
+                language_ids[code]
+                for code in get_clics_codes(language_code)
+                if code in language_ids
+            )
+            self._iso_masks[language_code] = mask
+        return mask
+
+    def _neighbor_edges(self, node_id: int, exclude: Optional[int] = None) -> Tuple[List[str], np.ndarray]:
+        """(neighbor glosses, edge IDs) for every wofam-bearing edge of a node."""
+        glosses = []
+        kept = []
+        for neighbor, edge_id in zip(*self.adjacency(node_id)):
+            if neighbor == exclude or edge_id < 0:
+                continue
+            neighbor_concept = self.gloss(neighbor)
+            if not neighbor_concept:
+                continue
+            glosses.append(neighbor_concept)
+            kept.append(edge_id)
+        return glosses, np.asarray(kept, dtype=np.int64)
     
     def get_family_colexifications(
         self,
@@ -176,17 +214,27 @@ class ClicsService:
         node1 = self._get_node_by_gloss(concept1)
         node2 = self._get_node_by_gloss(concept2)
         
-        if not node1 and not node2:
+        if node1 is None and node2 is None:
             return {}  # No data for either concept
+
+        no_edges = ([], np.zeros(0, dtype=np.int64))
+        concept1_edges = self._neighbor_edges(node1, exclude=node2) if node1 is not None else no_edges
+        concept2_edges = self._neighbor_edges(node2, exclude=node1) if node2 is not None else no_edges
+        direct_edge = (
+            self.get_edge_id(node1, node2)
+            if node1 is not None and node2 is not None else None
+        )
+        bits = self.language_bits
             
         family_results = {}
         
         # Process requested families
         for family in (families or self.family_language_map.keys()):
-            # Get all languages in this family from CLICS
-            family_langs = self.family_language_map.get(family, set())
-            if not family_langs:
+            # Count all languages in this family from CLICS
+            family_size = self.family_language_map.size(family)
+            if not family_size:
                 continue
+            family_mask = bits.family_mask(family)
                 
             # Initialize family data
             family_results[family] = {
@@ -196,236 +244,168 @@ class ClicsService:
                     'frequency': 0,
                     'languages': []
                 },
-                'total_languages': len(family_langs)
+                'total_languages': family_size
             }
             
-            # Process colexifications for concept1 if it exists
-            if node1:
-                for neighbor in self.graph.neighbors(node1):
-                    if node2 and neighbor == node2:
-                        continue
-                        
-                    edge = self.graph.get_edge_data(node1, neighbor)
-                    if not edge or 'wofam' not in edge:
-                        continue
-                        
-                    neighbor_concept = self.graph.nodes[neighbor].get('Gloss')
-                    if not neighbor_concept:
-                        continue
-                        
-                    # Track languages in this family that show this colexification
-                    family_langs_with_colex = set()
-                    
-                    for entry in edge['wofam'].split(';'):
-                        if not entry:
-                            continue
-                        parts = entry.split('/')
-                        if len(parts) >= 5:
-                            lang_family = parts[4].strip()
-                            language = parts[3].strip()
-                            
-                            if lang_family == family and language in family_langs:
-                                family_langs_with_colex.add(language)
-                    
-                    if family_langs_with_colex:
-                        family_results[family]['concept1_colexifications'][neighbor_concept] = {
-                            'frequency': len(family_langs_with_colex),
-                            'languages': list(family_langs_with_colex)
-                        }
-
-            # Process colexifications for concept2 if it exists
-            if node2:
-                for neighbor in self.graph.neighbors(node2):
-                    if node1 and neighbor == node1:
-                        continue
-                        
-                    edge = self.graph.get_edge_data(node2, neighbor)
-                    if not edge or 'wofam' not in edge:
-                        continue
-                        
-                    neighbor_concept = self.graph.nodes[neighbor].get('Gloss')
-                    if not neighbor_concept:
-                        continue
-                        
-                    family_langs_with_colex = set()
-                    
-                    for entry in edge['wofam'].split(';'):
-                        if not entry:
-                            continue
-                        parts = entry.split('/')
-                        if len(parts) >= 5:
-                            lang_family = parts[4].strip()
-                            language = parts[3].strip()
-                            
-                            if lang_family == family and language in family_langs:
-                                family_langs_with_colex.add(language)
-                    
-                    if family_langs_with_colex:
-                        family_results[family]['concept2_colexifications'][neighbor_concept] = {
-                            'frequency': len(family_langs_with_colex),
-                            'languages': list(family_langs_with_colex)
-                        }
+            # Count languages in this family showing each colexification (one popcount per edge)
+            for key, (glosses, edge_ids) in (('concept1_colexifications', concept1_edges),
+                                             ('concept2_colexifications', concept2_edges)):
+                counts = bits.counts(edge_ids, family_mask)
+                for idx in np.flatnonzero(counts).tolist():
+                    family_results[family][key][glosses[idx]] = {
+                        'frequency': int(counts[idx]),
+                        'languages': bits.members(edge_ids[idx], family_mask)
+                    }
 
             # Check direct colexification only if both concepts exist
-            if node1 and node2:
-                edge_data = self.graph.get_edge_data(node1, node2)
-                if edge_data and 'wofam' in edge_data:
-                    direct_langs = set()
-                    for entry in edge_data['wofam'].split(';'):
-                        if not entry:
-                            continue
-                        parts = entry.split('/')
-                        if len(parts) >= 5:
-                            lang_family = parts[4].strip()
-                            language = parts[3].strip()
-                            
-                            if lang_family == family and language in family_langs:
-                                direct_langs.add(language)
-                    
-                    if direct_langs:
-                        family_results[family]['direct_colexification'] = {
-                            'frequency': len(direct_langs),
-                            'languages': list(direct_langs)
-                        }
+            if direct_edge is not None:
+                direct_langs = bits.members(direct_edge, family_mask)
+                if direct_langs:
+                    family_results[family]['direct_colexification'] = {
+                        'frequency': len(direct_langs),
+                        'languages': direct_langs
+                    }
         
         return family_results
     
-    def find_chains(self, concept1: str, concept2: str, family: str, max_depth: int = 4) -> List[Dict]:
-        """Find semantic chains between two concepts within a language family."""
-        print("\n=== Starting Chain Search ===")
-        print(f"Looking for chains between '{concept1}' and '{concept2}' in {family} family")
-        print(f"Graph is directed: {self.graph.is_directed()}")
+    def find_chains(
+        self,
+        concept1: str,
+        concept2: str,
+        family: str,
+        max_depth: int = 4,
+        top_k: int = CHAIN_TOP_K,
+        max_expansions: int = CHAIN_MAX_EXPANSIONS,
+        time_budget: float = CHAIN_TIME_BUDGET_S,
+    ) -> List[Dict]:
+        """
+        Find the best semantic chains between two concepts within a language family.
+
+        Best-first search that only walks edges attested in `family`. Each edge
+        scores (attesting family languages / family size) and a chain scores the
+        geometric mean of its edges. The frontier is ordered by an upper bound
+        on the score any extension can still reach, so chains come out best-first
+        and the search stops after `top_k` chains, `max_expansions` node
+        expansions or `time_budget` seconds, whichever comes first.
+        """
+        print(f"\n=== Chain search: '{concept1}' -> '{concept2}' in {family} "
+              f"(max_depth={max_depth}, top_k={top_k}) ===")
         node1 = self._get_node_by_gloss(concept1)
         node2 = self._get_node_by_gloss(concept2)
         
-        if not node1 or not node2:
+        if node1 is None or node2 is None:
             print(f"Could not find nodes for {concept1} and/or {concept2}")
             return []
-            
-        print(f"Finding paths between {concept1} ({node1}) and {concept2} ({node2})")
-        
-        try:
-            print("\nSearching for paths...")
-            # Find all simple paths up to max_depth
-            paths = list(nx.all_simple_paths(
-                self.graph, 
-                node1, 
-                node2, 
-                cutoff=max_depth
-            ))
-            print(f"Found {len(paths)} directed paths")
-            
-            chains = []
-            for path in paths:
-                scores = []
-                valid_chain = True
-                
-                for i in range(len(path)-1):
-                    edge_data = self.graph.get_edge_data(path[i], path[i+1])
-                    if not edge_data or 'wofam' not in edge_data:
-                        # No data or missing family info means we can’t validate
-                        valid_chain = False
-                        break
-                    
-                    edge_languages = self._get_family_languages(edge_data, family)
-                    
-                    if not edge_languages:
-                        # If this edge isn't attested in any language of the family, this chain fails
-                        valid_chain = False
-                        break
-                    
-                    # Calculate frequency score 
-                    family_langs = self.family_language_map.get(family, set())
-                    freq = len(edge_languages) / len(family_langs) if family_langs else 0
-                    scores.append(freq)
-                
-                if valid_chain and scores:
-                    # Construct the chain data 
-                    chain_glosses = [self.graph.nodes[n]["Gloss"] for n in path]
-                    print(f"\nValid chain found: {' -> '.join(chain_glosses)}")
-                    print(f"Scores: {[f'{s:.2f}' for s in scores]}")
-
-                    chains.append({
-                        "path": chain_glosses,
-                        "scores": scores,
-                        "total_score": np.exp(np.mean(np.log(scores))) if all(s > 0 for s in scores) else 0,
-                    })
-
-                else:
-                    print("Chain invalid or no scores")
-
-            return chains
-            
-        except Exception as e:
-            print(f"Error finding chains: {str(e)}")
+
+        edge_scores = self._family_edge_scores(family)
+        if edge_scores is None or node1 == node2 or max_depth < 1 or top_k < 1:
+            return []
+        attested = edge_scores[edge_scores > 0]
+        if not len(attested):
             return []
+        # Best log-score any single further edge can contribute
+        best_log = float(np.log(attested.max()))
 
-    def _get_family_languages(self, edge_data: Dict, family: str) -> Set[str]:
-        """Extract languages from a specific family that show this connection."""
-        languages = set()
-        
-        if 'wofam' not in edge_data:
-            return languages
-            
-        for entry in edge_data['wofam'].split(';'):
-            if not entry:
+        def bound(log_sum: float, depth: int) -> float:
+            """Upper bound on the mean log-score of any completion of a partial path."""
+            remaining = max_depth - depth
+            if depth == 0:
+                return best_log
+            return max((log_sum + best_log) / (depth + 1),
+                       (log_sum + remaining * best_log) / (depth + remaining))
+
+        deadline = time.monotonic() + time_budget
+        counter = itertools.count()
+        # (-priority, tiebreak, is_complete, path, edge scores, log-sum)
+        frontier: List[tuple] = [(-bound(0.0, 0), next(counter), False, (node1,), (), 0.0)]
+        chains: List[Dict] = []
+        expansions = 0
+        stop_reason = "exhausted"
+
+        while frontier:
+            neg_priority, _, complete, path, scores, log_sum = heapq.heappop(frontier)
+
+            if complete:
+                chains.append({
+                    "path": [self.gloss(n) for n in path],
+                    "scores": list(scores),
+                    "total_score": float(np.exp(-neg_priority)),
+                })
+                if len(chains) >= top_k:
+                    stop_reason = "top_k"
+                    break
                 continue
-            parts = entry.split('/')
-            if len(parts) >= 5:
-                edge_family = parts[4].strip()
-                language = parts[3].strip()
-                
-                if edge_family == family:
-                    languages.add(language)
-                    
-        return languages
+
+            if expansions >= max_expansions:
+                stop_reason = "node budget"
+                break
+            if time.monotonic() > deadline:
+                stop_reason = "time budget"
+                break
+            expansions += 1
+
+            depth = len(path) - 1
+            neighbors, edge_ids = self.adjacency(path[-1])
+            keep = edge_ids >= 0
+            neighbors = neighbors[keep]
+            neighbor_scores = edge_scores[edge_ids[keep]]
+
+            for neighbor, score in zip(neighbors.tolist(), neighbor_scores.tolist()):
+                # Only expand edges attested in this family
+                if score <= 0 or neighbor in path:
+                    continue
+                next_log = log_sum + np.log(score)
+                next_path = path + (neighbor,)
+                next_scores = scores + (score,)
+                if neighbor == node2:
+                    heapq.heappush(frontier, (
+                        -next_log / (depth + 1), next(counter), True,
+                        next_path, next_scores, next_log,
+                    ))
+                elif depth + 1 < max_depth:
+                    heapq.heappush(frontier, (
+                        -bound(next_log, depth + 1), next(counter), False,
+                        next_path, next_scores, next_log,
+                    ))
+
+        print(f"Found {len(chains)} chains after {expansions} expansions (stopped: {stop_reason})")
+        return chains
+
+    def _family_edge_scores(self, family: str) -> Optional[np.ndarray]:
+        """Per-wofam-edge score (attesting languages / family size) for a family, cached."""
+        scores = self._edge_score_cache.get(family)
+        if scores is None:
+            family_size = self.family_language_map.size(family)
+            if not family_size:
+                return None
+            all_edges = np.arange(len(self.wofam_index))
+            counts = self.language_bits.counts(all_edges, self.language_bits.family_mask(family))
+            scores = counts / family_size
+            self._edge_score_cache[family] = scores
+        return scores
     
     def get_all_concepts(self) -> List[Dict[str, Any]]:
-        """Get all concepts in CLICS with their metadata"""
-        concepts = []
-        for node, data in self.graph.nodes(data=True):
-            gloss = data.get('Gloss')
-            if gloss:
-                # Extract all available metadata
-                concept_data = {
-                    'concept': gloss,
-                    'semantic_field': data.get('Semanticfield', ''),
-                    'category': data.get('Category', ''),
-                    'family_frequency': data.get('FamilyFrequency', 0),
-                    'language_frequency': data.get('LanguageFrequency', 0),
-                    'word_frequency': data.get('WordFrequency', 0),
-                    'frequency': sum(1 for edge in self.graph.edges(node, data=True)
-                                  if edge[2].get('wofam'))
-                }
-
-                concepts.append(concept_data)
-        
-        # Sort by frequency descending
-        concepts.sort(key=lambda x: x['frequency'], reverse=True)
-        return concepts
-    
-    def search_concepts(self, query: str) -> List[Dict[str, str]]:
-        """Search CLICS concepts matching a query string"""
-        query = query.upper()  # CLICS uses uppercase
-        matches = []
-        
-        for node, data in self.graph.nodes(data=True):
-            gloss = data.get('Gloss', '')
-            if not gloss:
-                continue
-                
-            if query in gloss.upper():
-                matches.append({
-                    'concept': gloss,
-                    'semantic_field': data.get('Semanticfield', ''),
-                    'category': data.get('Category', ''),
-                    'family_frequency': data.get('FamilyFrequency', 0),
-                    'language_frequency': data.get('LanguageFrequency', 0),
-                    'word_frequency': data.get('WordFrequency', 0),
-                    'frequency': sum(1 for edge in self.graph.edges(node, data=True)
-                                  if edge[2].get('wofam'))
-                })
-        
-        # Sort by frequency descending
-        matches.sort(key=lambda x: x['frequency'], reverse=True)
-        return matches
+        """Get all concepts in CLICS with their metadata, most frequent first"""
+        return self.concept_table.rows
+
+    def _edge_frequencies(self) -> np.ndarray:
+        """Number of wofam-bearing edges incident to each node."""
+        snapshot = self.snapshot
+        rows = np.repeat(np.arange(snapshot.node_count), np.diff(snapshot.indptr))
+        has_wofam = snapshot.edge_wofam_ids[snapshot.adj_edges] >= 0
+        return np.bincount(rows[has_wofam], minlength=snapshot.node_count)
+
+    def search_concepts(self, query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Search CLICS concepts whose gloss contains the query string, most frequent first"""
+        return self.search_concepts_page(query, limit)[0]
+
+    def search_concepts_page(
+        self, query: str, limit: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Return (first `limit` matches, total number of matches) for a query."""
+        ranks = self.concept_table.match(query)
+        total = len(ranks)
+        if limit is not None:
+            ranks = ranks[:limit]
+        rows = self.concept_table.rows
+        return [rows[r] for r in ranks.tolist()], total
@@ -0,0 +1,469 @@
+"""
+Compiled, integer-coded views over the CLICS colexification graph.
+
+Every CLICS edge carries a `wofam` attribute of the form
+"dataset/number/glottocode/langcode/family;..." that can run to several
+kilobytes. WofamIndex parses all of them once at load time into interned
+language/family IDs held in flat NumPy arrays (CSR layout: one contiguous
+slice of entries per edge), so request-time code never touches the raw
+strings again.
+
+The arrays are plain NumPy buffers, so a WofamIndex can sit directly on top
+of read-only memory maps from a compiled snapshot (see clics_snapshot.py).
+
+GlossIndex resolves glosses to nodes with binary search over sorted arrays.
+
+ConceptTable holds the per-concept listing rows (metadata plus edge
+frequency) computed once at load, pre-sorted and pre-serialised, with an
+n-gram index for substring search.
+"""
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+import numpy as np
+
+# Family IDs for wofam entries that carry a language but no family: an empty
+# family field ("d/n/g/lang/"), or no family field at all ("d/n/g/lang").
+# Real family IDs are >= 0.
+NO_FAMILY = -1
+FAMILY_FIELD_MISSING = -2
+
+
+class WofamIndex:
+    def __init__(
+        self,
+        languages: List[str],
+        families: List[str],
+        offsets: np.ndarray,
+        entry_languages: np.ndarray,
+        entry_families: np.ndarray,
+    ) -> None:
+        self.languages = languages
+        self.families = families
+        self.language_ids: Dict[str, int] = {l: i for i, l in enumerate(languages)}
+        self.family_ids: Dict[str, int] = {f: i for i, f in enumerate(families)}
+        self.offsets = offsets
+        self.entry_languages = entry_languages
+        self.entry_families = entry_families
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, wofams: Iterable[Optional[str]]) -> "WofamIndex":
+        """
+        Parse one wofam string per edge (None for edges without one).
+        Duplicate (language, family) entries within an edge are collapsed;
+        first-seen order is preserved.
+        """
+        languages: List[str] = []
+        families: List[str] = []
+        language_ids: Dict[str, int] = {}
+        family_ids: Dict[str, int] = {}
+
+        offsets = [0]
+        entry_languages: List[int] = []
+        entry_families: List[int] = []
+
+        for wofam in wofams:
+            seen: Set[Tuple[int, int]] = set()
+            for entry in (wofam or "").split(";"):
+                parts = entry.strip().split("/")
+                if len(parts) < 4:
+                    continue
+                language = parts[3].strip()
+                if not language:
+                    continue
+                family = parts[4].strip() if len(parts) >= 5 else ""
+
+                lang_id = language_ids.get(language)
+                if lang_id is None:
+                    lang_id = language_ids[language] = len(languages)
+                    languages.append(language)
+
+                fam_id = NO_FAMILY if len(parts) >= 5 else FAMILY_FIELD_MISSING
+                if family:
+                    fam_id = family_ids.get(family)
+                    if fam_id is None:
+                        fam_id = family_ids[family] = len(families)
+                        families.append(family)
+
+                if (lang_id, fam_id) in seen:
+                    continue
+                seen.add((lang_id, fam_id))
+                entry_languages.append(lang_id)
+                entry_families.append(fam_id)
+            offsets.append(len(entry_languages))
+
+        return cls(
+            languages,
+            families,
+            np.asarray(offsets, dtype=np.int64),
+            np.asarray(entry_languages, dtype=np.int32),
+            np.asarray(entry_families, dtype=np.int32),
+        )
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def entries(self, edge_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the (language_ids, family_ids) arrays for one edge."""
+        start, end = self.offsets[edge_id], self.offsets[edge_id + 1]
+        return self.entry_languages[start:end], self.entry_families[start:end]
+
+    def language_ids_for(self, edge_id: int, family: Optional[str] = None) -> np.ndarray:
+        """
+        Unique language IDs attesting an edge, optionally restricted to
+        entries recorded under `family`.
+        """
+        langs, fams = self.entries(edge_id)
+        if family is not None:
+            fam_id = self.family_ids.get(family)
+            if fam_id is None:
+                return langs[:0]
+            langs = langs[fams == fam_id]
+        return np.unique(langs)
+
+    def languages_for(self, edge_id: int, family: Optional[str] = None) -> Set[str]:
+        """Language codes attesting an edge (optionally within one family)."""
+        return {self.languages[i] for i in self.language_ids_for(edge_id, family)}
+
+    def family_languages(self, edge_id: int) -> Dict[str, List[str]]:
+        """Family → attesting language codes for one edge, in wofam order."""
+        langs, fams = self.entries(edge_id)
+        result: Dict[str, List[str]] = {}
+        for lang_id, fam_id in zip(langs.tolist(), fams.tolist()):
+            if fam_id < 0:
+                continue
+            fam_langs = result.setdefault(self.families[fam_id], [])
+            language = self.languages[lang_id]
+            if language not in fam_langs:
+                fam_langs.append(language)
+        return result
+
+    def family_membership(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        CSR arrays (offsets, language_ids) listing, per family ID, every
+        language recorded under that family on any edge.
+        """
+        mask = self.entry_families >= 0
+        pairs = np.unique(
+            np.stack([self.entry_families[mask], self.entry_languages[mask]], axis=1),
+            axis=0,
+        ) if mask.any() else np.empty((0, 2), dtype=np.int32)
+        counts = np.bincount(pairs[:, 0], minlength=len(self.families))
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return offsets, pairs[:, 1].astype(np.int32)
+
+
+class FamilyLanguageMap(Mapping):
+    """
+    Read-only `family → set of CLICS language codes` view over the CSR
+    membership arrays. Sets are materialised on access; use size() when
+    only the count is needed.
+    """
+
+    def __init__(
+        self,
+        languages: List[str],
+        families: List[str],
+        offsets: np.ndarray,
+        members: np.ndarray,
+    ) -> None:
+        self._languages = languages
+        self._families = families
+        self._family_ids = {f: i for i, f in enumerate(families)}
+        self._offsets = offsets
+        self._members = members
+
+    def language_ids(self, family: str) -> np.ndarray:
+        fam_id = self._family_ids.get(family)
+        if fam_id is None:
+            return self._members[:0]
+        return self._members[self._offsets[fam_id]:self._offsets[fam_id + 1]]
+
+    def size(self, family: str) -> int:
+        fam_id = self._family_ids.get(family)
+        if fam_id is None:
+            return 0
+        return int(self._offsets[fam_id + 1] - self._offsets[fam_id])
+
+    def __getitem__(self, family: str) -> Set[str]:
+        if family not in self._family_ids:
+            raise KeyError(family)
+        return {self._languages[i] for i in self.language_ids(family).tolist()}
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._families)
+
+    def __len__(self) -> int:
+        return len(self._families)
+
+    def __contains__(self, family: object) -> bool:
+        return family in self._family_ids
+
+
+# Number of set bits in every byte value; numpy < 2.0 has no bitwise_count.
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class LanguageBitsets:
+    """
+    Packed edge × language incidence matrix: bit j of row e is set when
+    CLICS language j attests wofam edge e. Column masks select a family's
+    languages (stored per family) or the CLICS codes of one ISO language
+    (built on demand), so per-edge counts become AND + popcount over
+    uint8 rows instead of Python set construction.
+
+    A row records which languages attest an edge, not under which family,
+    so family counts rely on CLICS giving each language the same family
+    field on every edge (it comes from the language's metadata).
+    """
+
+    def __init__(
+        self,
+        languages: List[str],
+        families: List[str],
+        edge_bits: np.ndarray,
+        family_bits: np.ndarray,
+    ) -> None:
+        self._languages = languages
+        self._family_ids = {f: i for i, f in enumerate(families)}
+        self.edge_bits = edge_bits
+        self.family_bits = family_bits
+        self.empty_mask = np.zeros(edge_bits.shape[1], dtype=np.uint8)
+
+    @staticmethod
+    def pack(language_ids: np.ndarray, n_languages: int) -> np.ndarray:
+        """Packed column mask with the given language IDs set."""
+        mask = np.zeros((n_languages + 7) // 8, dtype=np.uint8)
+        ids = np.asarray(language_ids, dtype=np.int64)
+        np.bitwise_or.at(mask, ids >> 3, (0x80 >> (ids & 7)).astype(np.uint8))
+        return mask
+
+    @classmethod
+    def build(
+        cls,
+        wofam: "WofamIndex",
+        family_offsets: np.ndarray,
+        family_members: np.ndarray,
+    ) -> "LanguageBitsets":
+        n_languages = len(wofam.languages)
+        n_bytes = (n_languages + 7) // 8
+
+        rows = np.repeat(np.arange(len(wofam), dtype=np.int64), np.diff(wofam.offsets))
+        cols = wofam.entry_languages.astype(np.int64)
+        edge_bits = np.zeros((len(wofam), n_bytes), dtype=np.uint8)
+        np.bitwise_or.at(edge_bits, (rows, cols >> 3), (0x80 >> (cols & 7)).astype(np.uint8))
+
+        family_bits = np.zeros((len(wofam.families), n_bytes), dtype=np.uint8)
+        for fam_id in range(len(wofam.families)):
+            members = family_members[family_offsets[fam_id]:family_offsets[fam_id + 1]]
+            family_bits[fam_id] = cls.pack(members, n_languages)
+
+        return cls(wofam.languages, wofam.families, edge_bits, family_bits)
+
+    # ------------------------------------------------------------------
+    # Masks
+    # ------------------------------------------------------------------
+
+    def family_mask(self, family: Optional[str]) -> np.ndarray:
+        """Column mask for a family (all languages when family is None)."""
+        if family is None:
+            return np.full_like(self.empty_mask, 0xFF)
+        fam_id = self._family_ids.get(family)
+        if fam_id is None:
+            return self.empty_mask
+        return self.family_bits[fam_id]
+
+    def language_mask(self, language_ids: Iterable[int]) -> np.ndarray:
+        return self.pack(np.fromiter(language_ids, dtype=np.int64), len(self._languages))
+
+    # ------------------------------------------------------------------
+    # Vectorised queries over many edges at once
+    # ------------------------------------------------------------------
+
+    def counts(self, edge_ids: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Number of masked languages attesting each edge."""
+        if not len(edge_ids):
+            return np.zeros(0, dtype=np.int64)
+        return _POPCOUNT[self.edge_bits[edge_ids] & mask].sum(axis=1, dtype=np.int64)
+
+    def any(self, edge_ids: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Whether any masked language attests each edge."""
+        if not len(edge_ids):
+            return np.zeros(0, dtype=bool)
+        return (self.edge_bits[edge_ids] & mask).any(axis=1)
+
+    def members(self, edge_id: int, mask: np.ndarray) -> List[str]:
+        """Codes of the masked languages attesting one edge."""
+        row = np.unpackbits(self.edge_bits[edge_id] & mask, count=len(self._languages))
+        return [self._languages[i] for i in np.flatnonzero(row).tolist()]
+
+
+class GlossIndex:
+    """
+    O(1) gloss → node lookups (exact match first, then case-insensitive).
+    The snapshot stores the keys as sorted arrays, which are memory-mapped
+    and shared; each process builds its hash maps from them on its first
+    lookup, so processes that never resolve a gloss never pay for them.
+    When several nodes share a gloss, the first node wins.
+    """
+
+    def __init__(
+        self,
+        glosses: np.ndarray,
+        exact_keys: np.ndarray,
+        exact_nodes: np.ndarray,
+        upper_keys: np.ndarray,
+        upper_nodes: np.ndarray,
+    ) -> None:
+        self.glosses = glosses  # per node; "" where a node has no gloss
+        self._arrays = ((exact_keys, exact_nodes), (upper_keys, upper_nodes))
+        self._maps: Optional[Tuple[Dict[str, int], Dict[str, int]]] = None
+
+    @staticmethod
+    def build(glosses: List[str]) -> Dict[str, np.ndarray]:
+        """The arrays behind a GlossIndex, keyed by their snapshot names."""
+        names = np.asarray(glosses, dtype=str)
+        upper = np.asarray([g.upper() for g in glosses], dtype=str)
+        nodes = np.flatnonzero(names != "")
+        # Stable sorts keep equal keys in node order, so the first node comes first
+        exact_order = nodes[np.argsort(names[nodes], kind="stable")]
+        upper_order = nodes[np.argsort(upper[nodes], kind="stable")]
+        return {
+            "node_glosses": names,
+            "gloss_exact_keys": names[exact_order],
+            "gloss_exact_nodes": exact_order.astype(np.int32),
+            "gloss_upper_keys": upper[upper_order],
+            "gloss_upper_nodes": upper_order.astype(np.int32),
+        }
+
+    def gloss(self, node: int) -> str:
+        return str(self.glosses[node])
+
+    def node(self, concept: Optional[str]) -> Optional[int]:
+        """Node ID for a gloss, or None."""
+        if not concept:
+            return None
+        exact, upper = self._lookup_maps()
+        node = exact.get(concept)
+        if node is None:
+            node = upper.get(concept.upper())
+        return node
+
+    def _lookup_maps(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        # Threads racing here build equal maps; either may be kept
+        if self._maps is None:
+            self._maps = tuple(self._first_nodes(*arrays) for arrays in self._arrays)
+        return self._maps
+
+    @staticmethod
+    def _first_nodes(keys: np.ndarray, nodes: np.ndarray) -> Dict[str, int]:
+        first: Dict[str, int] = {}
+        for key, node in zip(keys.tolist(), nodes.tolist()):
+            first.setdefault(key, node)
+        return first
+
+
+class ConceptTable:
+    """
+    CLICS concepts sorted by edge frequency (descending, ties in node order),
+    with an inverted index from every 1-, 2- and 3-gram of the upper-cased
+    gloss to the sorted ranks of the concepts containing it.
+
+    Queries of up to three characters are answered straight from one posting
+    list; longer queries intersect the posting lists of their trigrams and
+    verify the few surviving candidates, so typeahead cost depends on the
+    size of the posting lists, not on the vocabulary.
+    """
+
+    MAX_GRAM = 3
+
+    def __init__(self, rows: List[Dict[str, Any]]) -> None:
+        self.rows = rows
+        self._upper = [row["concept"].upper() for row in rows]
+        self._all = np.arange(len(rows), dtype=np.int32)
+
+        postings: Dict[str, List[int]] = {}
+        for rank, gloss in enumerate(self._upper):
+            grams = {
+                gloss[i:i + n]
+                for n in range(1, self.MAX_GRAM + 1)
+                for i in range(len(gloss) - n + 1)
+            }
+            for gram in grams:
+                postings.setdefault(gram, []).append(rank)
+        self._postings = {
+            gram: np.asarray(ranks, dtype=np.int32) for gram, ranks in postings.items()
+        }
+
+        # Serialised once; the listing endpoint only slices and joins
+        self.row_json = [_dumps(row) for row in rows]
+        self.full_payload = _page_payload(self.row_json, len(rows), None).encode("utf-8")
+
+    @classmethod
+    def build(cls, node_attrs: List[Dict[str, Any]], frequencies: np.ndarray) -> "ConceptTable":
+        rows = []
+        for node, data in enumerate(node_attrs):
+            gloss = data.get("Gloss")
+            if not gloss:
+                continue
+            rows.append({
+                "concept": gloss,
+                "semantic_field": data.get("Semanticfield", ""),
+                "category": data.get("Category", ""),
+                "family_frequency": data.get("FamilyFrequency", 0),
+                "language_frequency": data.get("LanguageFrequency", 0),
+                "word_frequency": data.get("WordFrequency", 0),
+                "frequency": int(frequencies[node]),
+            })
+        rows.sort(key=lambda row: row["frequency"], reverse=True)
+        return cls(rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def match(self, query: str) -> np.ndarray:
+        """Ranks (ascending, i.e. by descending frequency) of glosses containing `query`."""
+        query = query.upper()
+        if not query:
+            return self._all
+        if len(query) <= self.MAX_GRAM:
+            return self._postings.get(query, self._all[:0])
+
+        grams = {query[i:i + self.MAX_GRAM] for i in range(len(query) - self.MAX_GRAM + 1)}
+        lists = sorted((self._postings.get(g, self._all[:0]) for g in grams), key=len)
+        candidates = lists[0]
+        for ranks in lists[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, ranks, assume_unique=True)
+        return np.asarray(
+            [r for r in candidates.tolist() if query in self._upper[r]], dtype=np.int32
+        )
+
+    def page_payload(self, start: int, limit: Optional[int]) -> bytes:
+        """JSON body for one page of the listing: concepts, total and next_cursor."""
+        if start == 0 and (limit is None or limit >= len(self.rows)):
+            return self.full_payload
+        stop = len(self.rows) if limit is None else min(start + limit, len(self.rows))
+        next_cursor = str(stop) if stop < len(self.rows) else None
+        return _page_payload(self.row_json[start:stop], len(self.rows), next_cursor).encode("utf-8")
+
+
+def _dumps(value: Any) -> str:
+    # Same compact encoding FastAPI's JSONResponse produces
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _page_payload(row_json: List[str], total: int, next_cursor: Optional[str]) -> str:
+    return (
+        '{"concepts":[' + ",".join(row_json) + ']'
+        f',"total":{total},"next_cursor":{_dumps(next_cursor)}}}'
+    )
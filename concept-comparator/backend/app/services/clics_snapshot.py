@@ -0,0 +1,346 @@
+"""
+Compiled binary snapshot of the CLICS colexification network.
+
+Parsing network-3-families.gml with networkx takes seconds and used to
+require writing an ASCII-cleaned copy next to the data. The snapshot is
+compiled from the GML once and stored as a directory of .npy arrays plus a
+small meta.json:
+
+  - node IDs (meta.json); node attributes (nodes.json, read on first use)
+  - node glosses and a sorted gloss → node index
+  - CSR adjacency: indptr / indices / adj_edges (edge index per slot)
+  - the parsed WofamIndex and family → language membership (see clics_index.py)
+  - packed edge × language bitsets with per-family column masks
+
+Arrays are opened with mmap_mode="r", so every uvicorn worker on a host
+shares one page-cache copy of the graph instead of building its own
+networkx graph and wofam dictionaries.
+
+Snapshots are keyed by the SHA-256 of the source GML, so editing the GML
+triggers a rebuild on next load. They live in a cache directory
+(CLICS_SNAPSHOT_DIR, default ~/.cache/concept-comparator/clics) so the data
+directory can stay read-only.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.services.clics_index import FamilyLanguageMap, GlossIndex, LanguageBitsets, WofamIndex
+
+SNAPSHOT_VERSION = 5
+
+_ARRAYS = (
+    "indptr",
+    "indices",
+    "adj_edges",
+    "edge_sources",
+    "edge_targets",
+    "edge_wofam_ids",
+    "wofam_offsets",
+    "wofam_languages",
+    "wofam_families",
+    "family_offsets",
+    "family_members",
+    "edge_language_bits",
+    "family_language_bits",
+    "node_glosses",
+    "gloss_exact_keys",
+    "gloss_exact_nodes",
+    "gloss_upper_keys",
+    "gloss_upper_nodes",
+)
+
+
+def default_snapshot_root() -> Path:
+    configured = (os.getenv("CLICS_SNAPSHOT_DIR") or "").strip()
+    if configured:
+        return Path(configured).expanduser()
+    cache_home = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home) / "concept-comparator" / "clics"
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ClicsSnapshot:
+    def __init__(
+        self,
+        meta: Dict[str, Any],
+        arrays: Dict[str, np.ndarray],
+        node_attrs: Optional[List[Dict[str, Any]]] = None,
+        directory: Optional[Path] = None,
+    ) -> None:
+        self.meta = meta
+        self.arrays = arrays
+        self.directory = directory
+        self._node_attrs = node_attrs
+        self.directed: bool = meta["directed"]
+        self.node_ids: List[str] = meta["node_ids"]
+        self.edge_attr_names: List[str] = meta["edge_attributes"]
+
+        self.indptr = arrays["indptr"]
+        self.indices = arrays["indices"]
+        self.adj_edges = arrays["adj_edges"]
+        self.edge_sources = arrays["edge_sources"]
+        self.edge_targets = arrays["edge_targets"]
+        self.edge_wofam_ids = arrays["edge_wofam_ids"]
+        self.edge_attrs = {
+            name: arrays[f"edge_attr.{name}"] for name in self.edge_attr_names
+        }
+        self.wofam = WofamIndex(
+            meta["languages"],
+            meta["families"],
+            arrays["wofam_offsets"],
+            arrays["wofam_languages"],
+            arrays["wofam_families"],
+        )
+        self.family_languages = FamilyLanguageMap(
+            meta["languages"],
+            meta["families"],
+            arrays["family_offsets"],
+            arrays["family_members"],
+        )
+        self.language_bits = LanguageBitsets(
+            meta["languages"],
+            meta["families"],
+            arrays["edge_language_bits"],
+            arrays["family_language_bits"],
+        )
+        self.glosses = GlossIndex(
+            arrays["node_glosses"],
+            arrays["gloss_exact_keys"],
+            arrays["gloss_exact_nodes"],
+            arrays["gloss_upper_keys"],
+            arrays["gloss_upper_nodes"],
+        )
+
+    @property
+    def node_attrs(self) -> List[Dict[str, Any]]:
+        """Per-node GML attributes. Read from nodes.json on first use: graph jobs need only the arrays."""
+        if self._node_attrs is None:
+            with open(self.directory / "nodes.json", encoding="utf-8") as f:
+                self._node_attrs = json.load(f)
+        return self._node_attrs
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.edge_sources)
+
+    # ------------------------------------------------------------------
+    # Compilation from GML
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def compile(cls, gml_path: Path, source_hash: str) -> "ClicsSnapshot":
+        import networkx as nx
+
+        print(f"Compiling CLICS snapshot from {gml_path} …")
+        raw = Path(gml_path).read_text(encoding="utf-8")
+        # Clean the data to ensure ASCII compatibility (networkx's GML parser requires it)
+        cleaned = raw.encode("ascii", "ignore").decode("ascii")
+        g = nx.parse_gml(cleaned)
+
+        node_ids = [str(n) for n in g.nodes]
+        node_index = {n: i for i, n in enumerate(g.nodes)}
+        node_attrs = [dict(data) for _, data in g.nodes(data=True)]
+
+        # Edge table in networkx order; wofam-bearing edges get a WofamIndex ID
+        edge_index: Dict[tuple, int] = {}
+        edge_sources: List[int] = []
+        edge_targets: List[int] = []
+        edge_wofam_ids: List[int] = []
+        wofams: List[str] = []
+        numeric_attrs: Dict[str, List[float]] = {}
+        edge_list = list(g.edges(data=True))
+
+        for key in {k for _, _, d in edge_list for k in d if k != "wofam"}:
+            values = [d.get(key) for _, _, d in edge_list]
+            if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+                numeric_attrs[key] = values
+
+        for source, target, data in edge_list:
+            idx = len(edge_sources)
+            edge_index[(source, target)] = idx
+            if not g.is_directed():
+                edge_index[(target, source)] = idx
+            edge_sources.append(node_index[source])
+            edge_targets.append(node_index[target])
+            if "wofam" in data:
+                edge_wofam_ids.append(len(wofams))
+                wofams.append(data["wofam"])
+            else:
+                edge_wofam_ids.append(-1)
+
+        # CSR adjacency, keeping networkx's neighbor order per row
+        indptr = [0]
+        indices: List[int] = []
+        adj_edges: List[int] = []
+        for node in g.nodes:
+            for neighbor in g.adj[node]:
+                indices.append(node_index[neighbor])
+                adj_edges.append(edge_index[(node, neighbor)])
+            indptr.append(len(indices))
+
+        wofam = WofamIndex.build(wofams)
+        family_offsets, family_members = wofam.family_membership()
+        bitsets = LanguageBitsets.build(wofam, family_offsets, family_members)
+
+        meta = {
+            "version": SNAPSHOT_VERSION,
+            "source": str(gml_path),
+            "source_sha256": source_hash,
+            "directed": g.is_directed(),
+            "node_ids": node_ids,
+            "edge_attributes": sorted(numeric_attrs),
+            "languages": wofam.languages,
+            "families": wofam.families,
+        }
+        arrays = {
+            "indptr": np.asarray(indptr, dtype=np.int64),
+            "indices": np.asarray(indices, dtype=np.int32),
+            "adj_edges": np.asarray(adj_edges, dtype=np.int32),
+            "edge_sources": np.asarray(edge_sources, dtype=np.int32),
+            "edge_targets": np.asarray(edge_targets, dtype=np.int32),
+            "edge_wofam_ids": np.asarray(edge_wofam_ids, dtype=np.int32),
+            "wofam_offsets": wofam.offsets,
+            "wofam_languages": wofam.entry_languages,
+            "wofam_families": wofam.entry_families,
+            "family_offsets": family_offsets,
+            "family_members": family_members,
+            "edge_language_bits": bitsets.edge_bits,
+            "family_language_bits": bitsets.family_bits,
+        }
+        arrays.update(GlossIndex.build([str(data.get("Gloss") or "") for data in node_attrs]))
+        for name, values in numeric_attrs.items():
+            dtype = np.int64 if all(isinstance(v, int) for v in values) else np.float64
+            arrays[f"edge_attr.{name}"] = np.asarray(values, dtype=dtype)
+
+        return cls(meta, arrays, node_attrs=node_attrs)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, directory: Path) -> None:
+        """Write the snapshot atomically (build in a temp dir, then rename)."""
+        directory.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=directory.name + ".", dir=directory.parent))
+        try:
+            for name, array in self.arrays.items():
+                np.save(tmp / f"{name}.npy", array, allow_pickle=False)
+            with open(tmp / "nodes.json", "w", encoding="utf-8") as f:
+                json.dump(self.node_attrs, f)
+            with open(tmp / "meta.json", "w", encoding="utf-8") as f:
+                json.dump(self.meta, f)
+            try:
+                os.replace(tmp, directory)
+            except OSError:
+                # Another process won the race; its snapshot is equivalent
+                if not (directory / "meta.json").exists():
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "ClicsSnapshot":
+        """Open a saved snapshot; arrays are read-only memory maps unless mmap=False."""
+        with open(directory / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        if not (directory / "nodes.json").is_file():
+            raise FileNotFoundError(directory / "nodes.json")
+        names = list(_ARRAYS) + [f"edge_attr.{n}" for n in meta["edge_attributes"]]
+        arrays = {
+            name: np.load(
+                directory / f"{name}.npy",
+                mmap_mode="r" if mmap else None,
+                allow_pickle=False,
+            )
+            for name in names
+        }
+        return cls(meta, arrays, directory=directory)
+
+    # ------------------------------------------------------------------
+    # Interop
+    # ------------------------------------------------------------------
+
+    def to_networkx(self):
+        """Rebuild a networkx graph (nodes, attributes, numeric edge attributes; no wofam)."""
+        import networkx as nx
+
+        g = nx.DiGraph() if self.directed else nx.Graph()
+        for node_id, attrs in zip(self.node_ids, self.node_attrs):
+            g.add_node(node_id, **attrs)
+        for k in range(self.edge_count):
+            attrs = {name: values[k].item() for name, values in self.edge_attrs.items()}
+            g.add_edge(
+                self.node_ids[self.edge_sources[k]],
+                self.node_ids[self.edge_targets[k]],
+                **attrs,
+            )
+        return g
+
+
+def snapshot_path(source_hash: str, root: Optional[Path] = None) -> Path:
+    root = root or default_snapshot_root()
+    return root / f"clics-{source_hash[:16]}-v{SNAPSHOT_VERSION}"
+
+
+def load_or_compile_snapshot(gml_path: Path, root: Optional[Path] = None) -> ClicsSnapshot:
+    """
+    Load the compiled snapshot for `gml_path`, compiling (and caching) it
+    first if the GML has changed or no snapshot exists yet.
+    """
+    source_hash = file_sha256(gml_path)
+    directory = snapshot_path(source_hash, root)
+
+    if (directory / "meta.json").exists():
+        try:
+            snapshot = ClicsSnapshot.load(directory)
+            print(f"Loaded CLICS snapshot from {directory}")
+            return snapshot
+        except Exception as e:
+            print(f"Discarding unreadable CLICS snapshot at {directory}: {e}")
+    if directory.exists():
+        # Corrupt or partial: move it aside so the recompiled snapshot can take its place
+        _discard(directory)
+
+    snapshot = ClicsSnapshot.compile(gml_path, source_hash)
+    try:
+        snapshot.save(directory)
+        print(f"Saved CLICS snapshot to {directory}")
+    except OSError as e:
+        print(f"Could not save CLICS snapshot to {directory} ({e}); using it in memory only")
+        return snapshot
+    # Re-open from disk so this process maps the same pages as every other worker
+    try:
+        return ClicsSnapshot.load(directory)
+    except Exception as e:
+        print(f"Could not re-open CLICS snapshot at {directory} ({e}); using it in memory only")
+        return snapshot
+
+
+def _discard(directory: Path) -> None:
+    """Rename a snapshot directory out of the way, then delete it. Never raises."""
+    try:
+        doomed = Path(tempfile.mkdtemp(prefix=directory.name + ".discard.", dir=directory.parent))
+        os.replace(directory, doomed / directory.name)
+    except OSError as e:
+        # Another process may have replaced it already
+        print(f"Could not move aside CLICS snapshot at {directory} ({e})")
+        return
+    shutil.rmtree(doomed, ignore_errors=True)
@@ -0,0 +1,74 @@
+"""
+In-memory index over the Node2Vec colexification-space embeddings.
+
+colex_embeddings stores one float32 BLOB per concept. ColexEmbeddingIndex
+reads them once into a contiguous (n, dim) float32 matrix with a
+concepticon_id → row map, plus a row-normalised copy so cosine
+nearest-neighbour queries are a single matrix-vector product.
+"""
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+class ColexEmbeddingIndex:
+    def __init__(self, ids: List[str], matrix: np.ndarray) -> None:
+        self.ids = ids
+        self.rows: Dict[str, int] = {cid: i for i, cid in enumerate(ids)}
+        self.matrix = matrix
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.normalized = np.ascontiguousarray(matrix / norms, dtype=np.float32)
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection) -> "ColexEmbeddingIndex":
+        """Read every stored embedding; rows whose size differs from the first are skipped."""
+        try:
+            records = conn.execute(
+                "SELECT concepticon_id, embedding FROM colex_embeddings "
+                "WHERE embedding IS NOT NULL ORDER BY concepticon_id"
+            ).fetchall()
+        except sqlite3.OperationalError:
+            records = []
+        records = [(cid, blob) for cid, blob in records if blob]
+        if not records:
+            return cls([], np.zeros((0, 0), dtype=np.float32))
+
+        dim = len(records[0][1]) // 4
+        records = [(cid, blob) for cid, blob in records if len(blob) == dim * 4]
+        matrix = np.frombuffer(b"".join(blob for _, blob in records), dtype=np.float32)
+        return cls([cid for cid, _ in records], matrix.reshape(len(records), dim).copy())
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, concepticon_id: object) -> bool:
+        return concepticon_id in self.rows
+
+    @property
+    def dim(self) -> int:
+        return self.matrix.shape[1]
+
+    def vector(self, concepticon_id: str) -> Optional[np.ndarray]:
+        row = self.rows.get(concepticon_id)
+        return None if row is None else self.matrix[row]
+
+    def vectors(self, concepticon_ids: Iterable[str]) -> Dict[str, np.ndarray]:
+        return {
+            cid: self.matrix[self.rows[cid]]
+            for cid in concepticon_ids
+            if cid in self.rows
+        }
+
+    def nearest(self, concepticon_id: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Top-k (concepticon_id, cosine similarity) neighbours, excluding the query itself."""
+        row = self.rows.get(concepticon_id)
+        if row is None or k < 1 or len(self.ids) < 2:
+            return []
+        scores = self.normalized @ self.normalized[row]
+        scores[row] = -np.inf
+        k = min(k, len(self.ids) - 1)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.ids[i], float(scores[i])) for i in top.tolist()]
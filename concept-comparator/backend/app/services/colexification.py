@@ -8,6 +8,8 @@ import sqlite3
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
+
 from app.models.schemas import (
     ColexificationEvidence,
     ColexResult,
@@ -18,11 +20,8 @@ from app.models.schemas import (
     ConceptAnchor,
 )
 from app.services.clics import ClicsService
-
-_DB_CANDIDATES = [
-    Path(__file__).resolve().parents[3] / "data" / "atlas.sqlite",
-    Path(__file__).resolve().parents[2] / "data" / "atlas.sqlite",
-]
+from app.services.atlas_db import get_pool
+from app.services.clics_index import FAMILY_FIELD_MISSING, NO_FAMILY
 
 # ISO 639-3 → human-readable name (mirrors SUPPORTED_LANGUAGES in main.py)
 # We import it lazily to avoid circular imports.
@@ -31,21 +30,17 @@ def _get_supported_languages() -> dict:
     return SUPPORTED_LANGUAGES
 
 
-def _find_db() -> Path:
-    for p in _DB_CANDIDATES:
-        if p.exists():
-            return p
-    raise FileNotFoundError("atlas.sqlite not found")
-
-
 class ColexificationService:
     def __init__(self, clics: ClicsService) -> None:
         self._clics = clics
-        db_path = _find_db()
-        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
-        self._conn.row_factory = sqlite3.Row
+        self._pool = get_pool()
         print("ColexificationService initialised")
 
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's read-only connection to atlas.sqlite."""
+        return self._pool.connection()
+
     # ------------------------------------------------------------------
     # Direct colexification (from existing CLICS graph)
     # ------------------------------------------------------------------
@@ -75,11 +70,11 @@ class ColexificationService:
             node_a = self._clics._get_node_by_gloss(gloss_a)
             node_b = self._clics._get_node_by_gloss(gloss_b)
 
-            if node_a and node_b:
-                edge = self._clics.graph.get_edge_data(node_a, node_b)
-                if edge and "wofam" in edge:
+            if node_a is not None and node_b is not None:
+                edge_id = self._clics.get_edge_id(node_a, node_b)
+                if edge_id is not None:
                     direct_langs, direct_families = self._parse_wofam_languages(
-                        edge["wofam"], language_codes
+                        edge_id, language_codes
                     )
 
         partial = self.get_partial_evidence(anchor_a, anchor_b, language_codes)
@@ -104,12 +99,13 @@ class ColexificationService:
         anchor_b: ConceptAnchor,
         family: str,
         max_depth: int = 4,
+        top_k: int = 20,
     ) -> list[list[str]]:
-        """Return CLICS semantic chain paths between two concepts in a family."""
+        """Return the best CLICS semantic chain paths between two concepts in a family."""
         if not anchor_a.clics_gloss or not anchor_b.clics_gloss:
             return []
         chains = self._clics.find_chains(
-            anchor_a.clics_gloss, anchor_b.clics_gloss, family, max_depth
+            anchor_a.clics_gloss, anchor_b.clics_gloss, family, max_depth, top_k=top_k
         )
         return [c["path"] for c in chains]
 
@@ -188,37 +184,34 @@ class ColexificationService:
         """
         partitions: dict[str, LanguagePartition] = {}
 
+        # Resolve glosses and pair edges once; they don't depend on the language
+        nodes = self._clics.resolve_glosses(a.clics_gloss for a in anchors)
+        pair_edges: dict[tuple[int, int], int] = {}
+        for i, anchor_a in enumerate(anchors):
+            for j, anchor_b in enumerate(anchors):
+                if j <= i:
+                    continue
+                node_a = nodes.get(anchor_a.clics_gloss)
+                node_b = nodes.get(anchor_b.clics_gloss)
+                if node_a is None or node_b is None:
+                    continue
+                edge_id = self._clics.get_edge_id(node_a, node_b)
+                if edge_id is not None:
+                    pair_edges[(i, j)] = edge_id
+        pair_edge_ids = np.fromiter(pair_edges.values(), dtype=np.int64, count=len(pair_edges))
+
         for lang_code in language_codes:
             lang_info = supported_languages.get(lang_code, {})
             lang_name = lang_info.get("name", lang_code)
             family = lang_info.get("family", "Unknown")
 
             # Build adjacency: which pairs are colexified in this language?
-            colex_pairs: set[tuple[int, int]] = set()
-
-            for i, anchor_a in enumerate(anchors):
-                for j, anchor_b in enumerate(anchors):
-                    if j <= i:
-                        continue
-                    gloss_a = anchor_a.clics_gloss
-                    gloss_b = anchor_b.clics_gloss
-                    if not gloss_a or not gloss_b:
-                        continue
-
-                    node_a = self._clics._get_node_by_gloss(gloss_a)
-                    node_b = self._clics._get_node_by_gloss(gloss_b)
-                    if not node_a or not node_b:
-                        continue
-
-                    edge = self._clics.graph.get_edge_data(node_a, node_b)
-                    if not edge or "wofam" not in edge:
-                        continue
-
-                    direct, _ = self._parse_wofam_languages(
-                        edge["wofam"], [lang_code]
-                    )
-                    if direct:
-                        colex_pairs.add((i, j))
+            present = self._clics.language_bits.any(
+                pair_edge_ids, self._clics.iso_language_mask(lang_code)
+            )
+            colex_pairs: set[tuple[int, int]] = {
+                pair for pair, is_present in zip(pair_edges, present.tolist()) if is_present
+            }
 
             # Build connected components (merge groups)
             groups = self._connected_components(len(anchors), colex_pairs)
@@ -304,20 +297,25 @@ class ColexificationService:
         selected_labels = {a.clics_gloss: a.label for a in anchors if a.clics_gloss}
 
         if family_filter:
-            total_langs = len(self._clics.family_language_map.get(family_filter, set()))
+            total_langs = self._clics.family_language_map.size(family_filter)
         else:
-            total_langs = sum(len(v) for v in self._clics.family_language_map.values())
+            family_map = self._clics.family_language_map
+            total_langs = sum(family_map.size(f) for f in family_map)
 
+        bits = self._clics.language_bits
+        count_mask = bits.family_mask(family_filter or None)
         all_nodes: dict[str, SemanticMapNode] = {}
         all_edges: dict[tuple, SemanticMapEdge] = {}
 
+        nodes = self._clics.resolve_glosses(a.clics_gloss for a in anchors)
+
         for anchor in anchors:
             gloss = anchor.clics_gloss
             if not gloss:
                 continue
 
-            node_id = self._clics._get_node_by_gloss(gloss)
-            if not node_id:
+            node_id = nodes.get(gloss)
+            if node_id is None:
                 continue
 
             all_nodes[gloss] = SemanticMapNode(
@@ -327,41 +325,29 @@ class ColexificationService:
                 is_selected=True,
             )
 
+            nbs, edge_ids = self._clics.adjacency(node_id)
+            keep = edge_ids >= 0
+            nbs, edge_ids = nbs[keep], edge_ids[keep]
+            lang_counts = bits.counts(edge_ids, count_mask)
+
             neighbors = []
-            for nb in self._clics.graph.neighbors(node_id):
-                edge = self._clics.graph.get_edge_data(node_id, nb)
-                if not edge or "wofam" not in edge:
-                    continue
-                nb_gloss = self._clics.graph.nodes[nb].get("Gloss", "")
-
-                if family_filter:
-                    n_langs = len(set(
-                        p.split("/")[3].strip()
-                        for p in edge["wofam"].split(";")
-                        if p and len(p.split("/")) >= 5
-                        and p.split("/")[4].strip() == family_filter
-                    ))
-                else:
-                    n_langs = len(set(
-                        p.split("/")[3].strip()
-                        for p in edge["wofam"].split(";")
-                        if p and len(p.split("/")) >= 4
-                    ))
+            for nb, n_langs in zip(nbs.tolist(), lang_counts.tolist()):
+                nb_gloss = self._clics.gloss(nb)
 
                 # When filtering by family, skip edges with no attestation
                 if family_filter and n_langs == 0:
                     continue
 
-                neighbors.append((nb, nb_gloss, edge, n_langs))
+                neighbors.append((nb, nb_gloss, n_langs))
 
-            neighbors.sort(key=lambda x: -x[3])
+            neighbors.sort(key=lambda x: -x[2])
 
-            for nb, nb_gloss, edge, n_langs in neighbors[:max_neighbors]:
+            for nb, nb_gloss, n_langs in neighbors[:max_neighbors]:
                 if not nb_gloss:
                     continue
 
                 if nb_gloss not in all_nodes:
-                    nb_data = self._clics.graph.nodes[nb]
+                    nb_data = self._clics.node_data(nb)
                     all_nodes[nb_gloss] = SemanticMapNode(
                         concept=selected_labels.get(nb_gloss, nb_gloss),
                         semantic_field=nb_data.get("Semanticfield"),
@@ -392,30 +378,17 @@ class ColexificationService:
 
     def _parse_wofam_full(
         self,
-        wofam: str,
+        edge_id: int,
     ) -> tuple[list[str], dict[str, list[str]]]:
-        """Parse ALL entries from a CLICS wofam string without language filtering.
+        """Read ALL entries of an edge's wofam without language filtering.
         Returns (all_lang_codes, family→attesting_langs)."""
-        family_to_langs: dict[str, list[str]] = {}
-        all_langs: list[str] = []
-        seen_langs: set[str] = set()
-
-        for entry in wofam.split(";"):
-            if not entry.strip():
-                continue
-            parts = entry.strip().split("/")
-            if len(parts) < 5:
-                continue
-            lang_code = parts[3].strip()
-            family = parts[4].strip()
-            if lang_code and family:
-                if lang_code not in seen_langs:
-                    all_langs.append(lang_code)
-                    seen_langs.add(lang_code)
-                fam_langs = family_to_langs.setdefault(family, [])
-                if lang_code not in fam_langs:
-                    fam_langs.append(lang_code)
-
+        wofam = self._clics.wofam_index
+        family_to_langs = wofam.family_languages(edge_id)
+        # In wofam order, counting only entries that name a family
+        langs, fams = wofam.entries(edge_id)
+        all_langs = list(dict.fromkeys(
+            wofam.languages[lang_id] for lang_id in langs[fams >= 0].tolist()
+        ))
         return all_langs, family_to_langs
 
     def compute_family_profiles_full(
@@ -428,11 +401,12 @@ class ColexificationService:
         Uses ClicsService.family_language_map as the per-family denominator.
         Includes attesting_languages per pair for drill-down.
         """
-        family_map = self._clics.family_language_map  # Dict[str, Set[str]]
+        family_map = self._clics.family_language_map  # FamilyLanguageMap
         profiles: dict[str, dict] = {}
 
         n = len(anchors)
         pairs = [(i, j) for i in range(n) for j in range(i + 1, n)]
+        nodes = self._clics.resolve_glosses(a.clics_gloss for a in anchors)
 
         for i, j in pairs:
             anchor_a = anchors[i]
@@ -443,27 +417,27 @@ class ColexificationService:
             if not gloss_a or not gloss_b:
                 continue
 
-            node_a = self._clics._get_node_by_gloss(gloss_a)
-            node_b = self._clics._get_node_by_gloss(gloss_b)
-            if not node_a or not node_b:
+            node_a = nodes.get(gloss_a)
+            node_b = nodes.get(gloss_b)
+            if node_a is None or node_b is None:
                 continue
 
-            edge = self._clics.graph.get_edge_data(node_a, node_b)
-            if not edge or "wofam" not in edge:
+            edge_id = self._clics.get_edge_id(node_a, node_b)
+            if edge_id is None:
                 continue
 
-            _, family_attesting = self._parse_wofam_full(edge["wofam"])
+            _, family_attesting = self._parse_wofam_full(edge_id)
             pair_key = f"{anchor_a.label}|{anchor_b.label}"
 
             for family, attesting_langs in family_attesting.items():
                 if family not in profiles:
-                    total_in_family = len(family_map.get(family, set()))
+                    total_in_family = family_map.size(family)
                     profiles[family] = {
                         "total_languages": total_in_family,
                         "pair_rates": {},
                         "is_selected": not selected_families or family in selected_families,
                     }
-                total_in_family = len(family_map.get(family, set()))
+                total_in_family = family_map.size(family)
                 n_direct = len(attesting_langs)
                 profiles[family]["pair_rates"][pair_key] = {
                     "direct_count": n_direct,
@@ -535,40 +509,53 @@ class ColexificationService:
 
     def _parse_wofam_languages(
         self,
-        wofam: str,
+        edge_id: int,
         filter_codes: list[str],
     ) -> tuple[list[str], list[str]]:
         """
-        Parse a CLICS 'wofam' edge attribute string and return
+        Read a CLICS edge's parsed 'wofam' entries and return
         (matching_language_codes, matching_families) filtered to filter_codes.
 
         wofam format: "dataset/number/glottocode/langcode/family;..."
         """
         from app.constants.clics_mappings import get_clics_codes  # type: ignore
 
-        # Build reverse map: clics_code → iso_code (for filter_codes)
-        clics_to_iso: dict[str, str] = {}
-        for iso in filter_codes:
-            for clics_code in get_clics_codes(iso):
-                clics_to_iso[clics_code] = iso
+        wofam = self._clics.wofam_index
+        bits = self._clics.language_bits
+
+        # Only languages whose CLICS columns are set on this edge need the entry walk
+        edge_row = np.array([edge_id])
+        attested = [
+            iso for iso in filter_codes
+            if bits.any(edge_row, self._clics.iso_language_mask(iso))[0]
+        ]
 
         matched_langs: list[str] = []
         matched_families: list[str] = []
+        if not attested:
+            return matched_langs, matched_families
 
-        for entry in wofam.split(";"):
-            if not entry:
+        # Build reverse map: interned clics language ID → iso_code (for attested codes)
+        clics_to_iso: dict[int, str] = {}
+        for iso in attested:
+            for clics_code in get_clics_codes(iso):
+                lang_id = wofam.language_ids.get(clics_code)
+                if lang_id is not None:
+                    clics_to_iso[lang_id] = iso
+
+        langs, fams = wofam.entries(edge_id)
+        for lang_id, fam_id in zip(langs.tolist(), fams.tolist()):
+            iso = clics_to_iso.get(lang_id)
+            # Entries need the family field, but an empty one still attests the language
+            if iso is None or fam_id == FAMILY_FIELD_MISSING:
                 continue
-            parts = entry.split("/")
-            if len(parts) < 5:
+            if iso not in matched_langs:
+                matched_langs.append(iso)
+            if fam_id == NO_FAMILY:
                 continue
-            lang_code = parts[3].strip()
-            family = parts[4].strip()
-            if lang_code in clics_to_iso:
-                iso = clics_to_iso[lang_code]
-                if iso not in matched_langs:
-                    matched_langs.append(iso)
-                if family and family not in matched_families:
-                    matched_families.append(family)
+            family = wofam.families[fam_id]
+            if family not in matched_families:
+                matched_families.append(family)
 
         return matched_langs, matched_families
 
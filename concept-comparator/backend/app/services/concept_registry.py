@@ -2,40 +2,53 @@
 ConceptRegistryService — searches the Concepticon concept registry stored in
 atlas.sqlite and provides concept → CLICS gloss resolution.
 """
+import re
 import sqlite3
-import struct
 from pathlib import Path
 from typing import Optional
 
-from app.models.schemas import ConceptAnchor, SemanticMapNode
+from app.models.schemas import ConceptAnchor, SemanticMapNode, SimilarConcept
+from app.services.atlas_db import get_pool
+from app.services.colex_embeddings import ColexEmbeddingIndex
 
-_DB_CANDIDATES = [
-    Path(__file__).resolve().parents[3] / "data" / "atlas.sqlite",
-    Path(__file__).resolve().parents[2] / "data" / "atlas.sqlite",
-]
+# FTS5 column weights for bm25(): label, definition, semantic_field
+_BM25_WEIGHTS = (10.0, 1.0, 2.0)
 
+_SELECT_ANCHOR = (
+    "SELECT concepticon_id, label, definition, semantic_field, clics_gloss "
+    "FROM concept_registry"
+)
 
-def _find_db() -> Path:
-    for p in _DB_CANDIDATES:
-        if p.exists():
-            return p
-    raise FileNotFoundError(
-        "atlas.sqlite not found. Run backend/scripts/run_ingestion.py first.\n"
-        "Checked: " + ", ".join(str(p) for p in _DB_CANDIDATES)
-    )
 
-
-def _decode_embedding(blob: bytes) -> list[float]:
-    n = len(blob) // 4
-    return list(struct.unpack(f"{n}f", blob))
+def _fts_query(query: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 MATCH expression: every token must match,
+    the last one as a prefix (typeahead). Returns None if nothing is searchable.
+    """
+    tokens = re.findall(r"\w+", query)
+    if not tokens:
+        return None
+    terms = [f'"{t}"' for t in tokens[:-1]] + [f'"{tokens[-1]}"*']
+    return " ".join(terms)
 
 
 class ConceptRegistryService:
     def __init__(self) -> None:
-        db_path = _find_db()
-        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
-        self._conn.row_factory = sqlite3.Row
-        print(f"ConceptRegistryService: connected to {db_path}")
+        self._pool = get_pool()
+        self._has_fts = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'concept_registry_fts'"
+        ).fetchone() is not None
+        if not self._has_fts:
+            print("ConceptRegistryService: concept_registry_fts missing; "
+                  "run scripts/setup_database.py to enable full-text search")
+        self._embeddings = ColexEmbeddingIndex.load(self._conn)
+        print(f"ConceptRegistryService: connected to {self._pool.db_path} "
+              f"({len(self._embeddings)} colexification embeddings)")
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's read-only connection to atlas.sqlite."""
+        return self._pool.connection()
 
     # ------------------------------------------------------------------
     # Search
@@ -43,10 +56,38 @@ class ConceptRegistryService:
 
     def search(self, query: str, limit: int = 12) -> list[ConceptAnchor]:
         """
-        Full-text search over concept labels and semantic fields.
-        Returns concepts ranked by label prefix match, then CLICS coverage.
+        Full-text search over concept labels, definitions and semantic fields.
+        Exact and prefix label matches come first, then BM25 relevance, then
+        concepts with CLICS coverage.
         """
         q = query.strip().upper()
+        match = _fts_query(q) if self._has_fts else None
+        if match is not None:
+            try:
+                rows = self._conn.execute(
+                    f"""
+                    SELECT r.concepticon_id, r.label, r.definition, r.semantic_field, r.clics_gloss
+                    FROM concept_registry_fts f
+                    JOIN concept_registry r ON r.rowid = f.rowid
+                    WHERE concept_registry_fts MATCH ?
+                    ORDER BY
+                        CASE WHEN r.label = ? THEN 0
+                             WHEN r.label LIKE ? THEN 1
+                             ELSE 2 END,
+                        bm25(concept_registry_fts, {", ".join(map(str, _BM25_WEIGHTS))}),
+                        CASE WHEN r.clics_gloss IS NOT NULL THEN 0 ELSE 1 END,
+                        r.label
+                    LIMIT ?
+                    """,
+                    (match, q, f"{q}%", limit),
+                ).fetchall()
+                return [self._row_to_anchor(r) for r in rows]
+            except sqlite3.OperationalError as e:
+                print(f"ConceptRegistryService: FTS search failed for {query!r} ({e}); using LIKE")
+        return self._search_like(q, limit)
+
+    def _search_like(self, q: str, limit: int) -> list[ConceptAnchor]:
+        """Label substring scan; used when the FTS index is unavailable."""
         rows = self._conn.execute(
             """
             SELECT concepticon_id, label, definition, semantic_field, clics_gloss
@@ -66,8 +107,7 @@ class ConceptRegistryService:
 
     def get_by_id(self, concepticon_id: str) -> Optional[ConceptAnchor]:
         row = self._conn.execute(
-            "SELECT concepticon_id, label, definition, semantic_field, clics_gloss "
-            "FROM concept_registry WHERE concepticon_id = ?",
+            f"{_SELECT_ANCHOR} WHERE concepticon_id = ?",
             (concepticon_id,),
         ).fetchone()
         return self._row_to_anchor(row) if row else None
@@ -75,12 +115,45 @@ class ConceptRegistryService:
     def get_by_label(self, label: str) -> Optional[ConceptAnchor]:
         """Exact case-insensitive label lookup."""
         row = self._conn.execute(
-            "SELECT concepticon_id, label, definition, semantic_field, clics_gloss "
-            "FROM concept_registry WHERE label = ?",
+            f"{_SELECT_ANCHOR} WHERE label = ?",
             (label.upper(),),
         ).fetchone()
         return self._row_to_anchor(row) if row else None
 
+    def get_many(self, refs: list[str]) -> dict[str, ConceptAnchor]:
+        """
+        Batch lookup of Concepticon IDs or labels. Each ref resolves as an ID
+        first, then as an exact (case-insensitive) label. Refs that match
+        nothing are left out of the result.
+        """
+        if not refs:
+            return {}
+        unique = list(dict.fromkeys(refs))
+        placeholders = ",".join("?" * len(unique))
+        by_id = {
+            r["concepticon_id"]: self._row_to_anchor(r)
+            for r in self._conn.execute(
+                f"{_SELECT_ANCHOR} WHERE concepticon_id IN ({placeholders})", unique
+            ).fetchall()
+        }
+
+        labels = list(dict.fromkeys(r.upper() for r in unique if r not in by_id))
+        by_label: dict[str, ConceptAnchor] = {}
+        if labels:
+            rows = self._conn.execute(
+                f"{_SELECT_ANCHOR} WHERE label IN ({','.join('?' * len(labels))})", labels
+            ).fetchall()
+            for r in rows:
+                # Same row get_by_label would pick when a label is duplicated
+                by_label.setdefault(r["label"], self._row_to_anchor(r))
+
+        result: dict[str, ConceptAnchor] = {}
+        for ref in unique:
+            anchor = by_id.get(ref) or by_label.get(ref.upper())
+            if anchor:
+                result[ref] = anchor
+        return result
+
     # ------------------------------------------------------------------
     # Neighbors (for discovery widget)
     # ------------------------------------------------------------------
@@ -91,10 +164,23 @@ class ConceptRegistryService:
         limit: int = 10,
     ) -> list[SemanticMapNode]:
         """
-        Return concepts most frequently colexified with the given concept,
-        derived from the same semantic field (fast approximation from registry).
+        Return the concept's nearest neighbours in colexification space
+        (Node2Vec embeddings). Concepts without an embedding fall back to a
+        same-semantic-field approximation from the registry.
         The full colexification neighborhood is provided by ColexificationService.
         """
+        similar = self.get_similar(concepticon_id, limit)
+        if similar:
+            return [
+                SemanticMapNode(
+                    concept=s.label,
+                    concepticon_id=s.concepticon_id,
+                    semantic_field=s.semantic_field,
+                    is_selected=False,
+                )
+                for s in similar
+            ]
+
         anchor = self.get_by_id(concepticon_id)
         if not anchor or not anchor.semantic_field:
             return []
@@ -119,6 +205,16 @@ class ConceptRegistryService:
             for r in rows
         ]
 
+    def get_similar(self, concepticon_id: str, limit: int = 10) -> list[SimilarConcept]:
+        """Top-k concepts by cosine similarity of their colexification embeddings."""
+        nearest = self._embeddings.nearest(concepticon_id, limit)
+        anchors = self.get_many([cid for cid, _ in nearest])
+        return [
+            SimilarConcept(**anchors[cid].model_dump(), score=score)
+            for cid, score in nearest
+            if cid in anchors
+        ]
+
     # ------------------------------------------------------------------
     # OMW anchors
     # ------------------------------------------------------------------
@@ -128,7 +224,7 @@ class ConceptRegistryService:
         concepticon_id: str,
         language_codes: list[str],
     ) -> dict[str, list[str]]:
-        """Return OMW lemmas keyed by ISO 639-3 language code."""
+        """Return OMW lemmas keyed by ISO 639-3 language code, in ingestion order."""
         if not language_codes:
             return {}
         placeholders = ",".join("?" * len(language_codes))
@@ -136,6 +232,7 @@ class ConceptRegistryService:
             f"""
             SELECT language_code, lemma FROM omw_anchors
             WHERE concepticon_id = ? AND language_code IN ({placeholders})
+            ORDER BY rowid
             """,
             [concepticon_id] + language_codes,
         ).fetchall()
@@ -150,31 +247,17 @@ class ConceptRegistryService:
 
     def get_embedding(self, concepticon_id: str) -> Optional[list[float]]:
         """Return the 128-dim Node2Vec embedding for a concept, or None."""
-        row = self._conn.execute(
-            "SELECT embedding FROM colex_embeddings WHERE concepticon_id = ?",
-            (concepticon_id,),
-        ).fetchone()
-        if row and row[0]:
-            return _decode_embedding(row[0])
-        return None
+        vec = self._embeddings.vector(concepticon_id)
+        return None if vec is None else vec.tolist()
 
     def get_embeddings(
         self,
         concepticon_ids: list[str],
     ) -> dict[str, list[float]]:
         """Batch embedding lookup."""
-        if not concepticon_ids:
-            return {}
-        placeholders = ",".join("?" * len(concepticon_ids))
-        rows = self._conn.execute(
-            f"SELECT concepticon_id, embedding FROM colex_embeddings "
-            f"WHERE concepticon_id IN ({placeholders})",
-            concepticon_ids,
-        ).fetchall()
         return {
-            r["concepticon_id"]: _decode_embedding(r["embedding"])
-            for r in rows
-            if r["embedding"]
+            cid: vec.tolist()
+            for cid, vec in self._embeddings.vectors(concepticon_ids).items()
         }
 
     # ------------------------------------------------------------------
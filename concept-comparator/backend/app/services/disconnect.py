@@ -0,0 +1,143 @@
+"""
+Client-disconnect handling for the SSE endpoints.
+
+A streamed comparison or study keeps translating and embedding after the
+browser tab is closed unless it notices. DisconnectWatch polls
+request.is_disconnected() (at most every STREAM_DISCONNECT_POLL_SECONDS,
+default 0.5) while the stream waits on its work, and raises
+ClientDisconnected so the generator can cancel the tasks it owns.
+
+Every stream that ends early is recorded in CancelledWorkLog: counters for
+/metrics, plus one JSON line per stream appended to CANCELLED_WORK_LOG
+(default ~/.cache/concept-comparator/cancelled-work.jsonl) by a background
+writer thread, so recording never blocks the event loop on the file.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Set, Tuple
+
+DISCONNECT_POLL_SECONDS = float(os.getenv("STREAM_DISCONNECT_POLL_SECONDS", 0.5))
+
+
+class ClientDisconnected(Exception):
+    """The client of a streamed response went away."""
+
+
+class DisconnectWatch:
+    """Checks a Starlette request for a disconnect while awaiting work."""
+
+    def __init__(self, request=None, interval: float = DISCONNECT_POLL_SECONDS) -> None:
+        self._request = request  # None: never disconnects (e.g. non-HTTP callers)
+        self.interval = interval
+        self._checked = time.monotonic()
+
+    async def check(self) -> None:
+        """Raise ClientDisconnected if the client has gone; rate limited to `interval`."""
+        if self._request is None:
+            return
+        now = time.monotonic()
+        if now - self._checked < self.interval:
+            return
+        self._checked = now
+        if await self._request.is_disconnected():
+            raise ClientDisconnected()
+
+    async def wait(self, tasks: Iterable[asyncio.Future]) -> Tuple[Set[asyncio.Future], Set[asyncio.Future]]:
+        """asyncio.wait(FIRST_COMPLETED) that raises ClientDisconnected meanwhile."""
+        pending = set(tasks)
+        while True:
+            done, pending = await asyncio.wait(
+                pending, timeout=self.interval, return_when=asyncio.FIRST_COMPLETED
+            )
+            await self.check()
+            if done:
+                return done, pending
+
+    async def iterate(self, stream: AsyncIterator) -> AsyncIterator:
+        """
+        Re-yield `stream`'s items. Each step runs as a task, so on a disconnect
+        the step in progress is cancelled (inside `stream`) and
+        ClientDisconnected is raised.
+        """
+        step = None
+        try:
+            while True:
+                step = asyncio.ensure_future(stream.__anext__())
+                await self.wait({step})
+                try:
+                    item = step.result()
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            if step is not None and not step.done():
+                step.cancel()
+
+
+# ---------------------------------------------------------------------------
+# Cancelled-work log
+# ---------------------------------------------------------------------------
+
+def default_log_path() -> Path:
+    configured = (os.getenv("CANCELLED_WORK_LOG") or "").strip()
+    if configured:
+        return Path(configured).expanduser()
+    cache_home = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home) / "concept-comparator" / "cancelled-work.jsonl"
+
+
+class CancelledWorkLog:
+    """Counts streams that ended early and appends a JSON line for each."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path or default_log_path()
+        self._lock = threading.Lock()
+        # One thread, so lines are appended in the order they were recorded
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cancelled-work-log")
+        self.streams: Dict[str, int] = {}
+        self.reasons: Dict[str, int] = {}
+        self.languages_skipped = 0
+
+    def record(self, stream: str, reason: str, **details: Any) -> None:
+        """
+        reason is "disconnected" (seen by DisconnectWatch) or "closed" (the
+        server cancelled the response). Safe to call on the event loop: the
+        file is written on the writer thread. Never raises: a failed write only logs.
+        """
+        entry = {"time": time.time(), "stream": stream, "reason": reason, **details}
+        line = json.dumps(entry, default=str) + "\n"
+        with self._lock:
+            self.streams[stream] = self.streams.get(stream, 0) + 1
+            self.reasons[reason] = self.reasons.get(reason, 0) + 1
+            self.languages_skipped += len(details.get("unfinished_languages") or ())
+        try:
+            self._writer.submit(self._append, line)
+        except RuntimeError:  # closed: shutting down
+            pass
+        print(f"Cancelled {stream} stream ({reason}): "
+              + ", ".join(f"{k}={v}" for k, v in details.items() if not isinstance(v, list)))
+
+    def _append(self, line: str) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError as e:
+            print(f"Cancelled-work log: write to {self.path} failed ({e})")
+
+    def close(self) -> None:
+        """Finish pending writes and stop the writer thread."""
+        self._writer.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "streams": dict(self.streams),
+                "reasons": dict(self.reasons),
+                "languages_skipped": self.languages_skipped,
+            }
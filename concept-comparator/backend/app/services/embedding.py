@@ -1,38 +1,87 @@
+import os
 import numpy as np 
-from sentence_transformers import SentenceTransformer
-from typing import Dict
-import torch
+from typing import Dict, List, Optional, Sequence, Tuple
+from app.services.embedding_backends import create_backend, parity_report
+from app.services.embedding_cache import EmbeddingCache
+
+MODEL_NAME = 'sentence-transformers/LaBSE'
+
+# Texts per forward pass when encoding a batch; override with EMBEDDING_BATCH_SIZE
+DEFAULT_BATCH_SIZE = 64
 
 class EmbeddingService:
     def __init__(self):
         try:
-            self.model = SentenceTransformer('sentence-transformers/LaBSE')
-            self.cached_embeddings = {}
-            print("Embedding model loaded successfully")  # Debug log
+            # torch, torch-int8, onnx or onnx-int8; see EMBEDDING_BACKEND
+            self.backend = create_backend(model_name=MODEL_NAME)
+            self.model = self.backend.model
+            # Keyed by the exact prompt; the backend is part of the model id,
+            # so quantised vectors never mix with full-precision ones
+            self.cache = EmbeddingCache(self.backend.cache_id, self.backend.dim)
+            self.batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+            print(f"Embedding model loaded successfully ({self.backend.name})")  # Debug log
         except Exception as e:
             print(f"Error initializing embedding model: {str(e)}")
             raise
 
     def get_embedding(self, text: str, lang_name: str, meaning: str) -> np.ndarray:
         """Get embedding for a text in a specific language"""
+        return self.get_embeddings([(text, lang_name, meaning)])[0]
+
+    @staticmethod
+    def prompt(text: str, lang_name: str, meaning: str) -> str:
+        """The exact string sent to the model for a text"""
+        return f"{text} ({lang_name}, meaning '{meaning}')"
+
+    def get_embeddings(self, texts: Sequence[Tuple[str, str, str]]) -> List[np.ndarray]:
+        """
+        Get embeddings for many (text, lang_name, meaning) triples at once.
+        Cached and duplicate entries are skipped; every miss is encoded in a
+        single batched model call. Results are in input order.
+        """
         try:
-            cache_key = f"{lang_name}_{text}"
-            if cache_key not in self.cached_embeddings:
-                # Convert to numpy array explicitly
-                print(f"Getting embedding for {text} ({lang_name}, meaning '{meaning}')")
-                embedding = self.model.encode(f"{text} ({lang_name}, meaning '{meaning}')")
-                if isinstance(embedding, torch.Tensor):
-                    embedding = embedding.cpu().numpy()
-                elif not isinstance(embedding, np.ndarray):
-                    embedding = np.array(embedding)
-                
-                self.cached_embeddings[cache_key] = embedding
-                
-            return self.cached_embeddings[cache_key]
+            prompts = [self.prompt(*t) for t in texts]
+            vectors = self.cache.get_many(prompts)
+            misses = [p for p in dict.fromkeys(prompts) if p not in vectors]
+
+            if misses:
+                print(f"Encoding {len(misses)} texts "
+                      f"({len(prompts) - len(misses)} cached or duplicate)")
+                encoded = self.backend.encode(misses, self.batch_size)
+                fresh = dict(zip(misses, encoded))
+                self.cache.put_many(fresh)
+                vectors.update(fresh)
+
+            return [vectors[p] for p in prompts]
         except Exception as e:
-            print(f"Error getting embedding for text '{text}' in {lang_name}: {str(e)}")
+            print(f"Error getting embeddings for {len(texts)} texts: {str(e)}")
             raise
 
+    def parity_check(self, texts: Optional[Sequence[str]] = None) -> Dict[str, float]:
+        """
+        Cosine agreement and latency of the active backend against full-precision
+        torch. Loads a second model, so run it offline rather than per request.
+        """
+        reference = create_backend("torch", MODEL_NAME, self.backend.threads)
+        return parity_report(self.backend, reference, texts, batch_size=self.batch_size)
+
+    @staticmethod
+    def normalize(vectors: np.ndarray) -> np.ndarray:
+        """Row-normalise a stack of embeddings (zero rows stay zero)"""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def similarity_matrix(self, A: np.ndarray, B: np.ndarray, normalized: bool = False) -> np.ndarray:
+        """
+        Cosine similarity of every row of A against every row of B, as one
+        (len(A), len(B)) matmul. Pass normalized=True if the rows are already unit length.
+        """
+        if not normalized:
+            A, B = self.normalize(A), self.normalize(B)
+        return A @ B.T
+
     def compute_similarity(self, emb1: np.ndarray, emb2: np.ndarray) -> float:
         """Compute cosine similarity between two embeddings"""
         try:
@@ -47,4 +96,4 @@ class EmbeddingService:
             return dot_product / (norm1 * norm2)
         except Exception as e:
             print(f"Error computing similarity: {str(e)}")
-            raise
\ No newline at end of file
+            raise
@@ -0,0 +1,236 @@
+"""
+Interchangeable CPU inference backends for the sentence embedder.
+
+  torch       full-precision PyTorch (reference)
+  torch-int8  PyTorch with nn.Linear layers dynamically quantised to int8
+  onnx        ONNX Runtime, fp32 graph exported by sentence-transformers
+  onnx-int8   ONNX Runtime, dynamically quantised int8 graph
+
+Select with EMBEDDING_BACKEND (default torch) and the intra-op thread count
+with EMBEDDING_THREADS. The ONNX backends need `optimum[onnxruntime]`; the
+exported and quantised graphs are cached under EMBEDDING_ONNX_DIR (default
+~/.cache/concept-comparator/onnx) so export happens once per host.
+
+parity_report() compares a backend with the torch reference on the same
+texts, so a quantised deployment can be checked before it is switched on:
+
+    python scripts/check_embedding_backend.py --backend onnx-int8
+"""
+import hashlib
+import os
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+# Quantisation preset for onnx-int8 (arm64, avx2, avx512 or avx512_vnni)
+DEFAULT_ONNX_QCONFIG = "avx2"
+
+# Prompts in the same shape EmbeddingService sends, across scripts
+PARITY_TEXTS = [
+    "hand (English, meaning 'HAND')",
+    "arm (English, meaning 'ARM')",
+    "main (French, meaning 'HAND')",
+    "bras (French, meaning 'ARM')",
+    "mano (Spanish, meaning 'HAND')",
+    "Hand (German, meaning 'HAND')",
+    "рука (Russian, meaning 'HAND')",
+    "рука (Russian, meaning 'ARM')",
+    "手 (Mandarin Chinese, meaning 'HAND')",
+    "手 (Japanese, meaning 'HAND')",
+    "腕 (Japanese, meaning 'ARM')",
+    "손 (Korean, meaning 'HAND')",
+    "mkono (Swahili, meaning 'HAND')",
+    "käsi (Finnish, meaning 'HAND')",
+    "el (Turkish, meaning 'HAND')",
+    "يد (Arabic, meaning 'HAND')",
+    "हाथ (Hindi, meaning 'HAND')",
+    "tangan (Indonesian, meaning 'HAND')",
+    "tree (English, meaning 'TREE')",
+    "wood (English, meaning 'WOOD')",
+]
+
+
+def _onnx_root() -> Path:
+    configured = (os.getenv("EMBEDDING_ONNX_DIR") or "").strip()
+    if configured:
+        return Path(configured).expanduser()
+    cache_home = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home) / "concept-comparator" / "onnx"
+
+
+class EmbeddingBackend(ABC):
+    """A loaded sentence-embedding model that encodes batches of strings on CPU."""
+
+    name = "base"
+
+    def __init__(self, model_name: str, threads: Optional[int] = None) -> None:
+        self.model_name = model_name
+        self.threads = threads
+        self.model = self._load()
+
+    @abstractmethod
+    def _load(self):
+        """Load and return the model object for this backend."""
+
+    @property
+    def cache_id(self) -> str:
+        """Identity for cached vectors; backends with different numerics never share entries."""
+        return self.model_name if self.name == "torch" else f"{self.model_name}#{self.name}"
+
+    @property
+    def dim(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: Sequence[str], batch_size: int) -> np.ndarray:
+        encoded = self.model.encode(list(texts), batch_size=batch_size, convert_to_numpy=True)
+        return np.asarray(encoded, dtype=np.float32)
+
+
+class TorchBackend(EmbeddingBackend):
+    name = "torch"
+
+    def _load(self):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        return SentenceTransformer(self.model_name, device="cpu")
+
+
+class TorchInt8Backend(TorchBackend):
+    name = "torch-int8"
+
+    def _load(self):
+        import torch
+
+        model = super()._load()
+        model.eval()
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxBackend(EmbeddingBackend):
+    name = "onnx"
+
+    def _session_kwargs(self) -> Dict:
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if self.threads:
+            options.intra_op_num_threads = self.threads
+        return {"provider": "CPUExecutionProvider", "session_options": options}
+
+    def _export_dir(self) -> Path:
+        slug = hashlib.sha256(self.model_name.encode("utf-8")).hexdigest()[:16]
+        return _onnx_root() / slug
+
+    def _load(self):
+        from sentence_transformers import SentenceTransformer
+
+        export_dir = self._export_dir()
+        if not (export_dir / "onnx" / "model.onnx").exists():
+            print(f"Exporting {self.model_name} to ONNX at {export_dir} …")
+            SentenceTransformer(self.model_name, backend="onnx", device="cpu").save_pretrained(
+                str(export_dir)
+            )
+        return SentenceTransformer(
+            str(export_dir),
+            backend="onnx",
+            device="cpu",
+            model_kwargs={"file_name": self._file_name(export_dir), **self._session_kwargs()},
+        )
+
+    def _file_name(self, export_dir: Path) -> str:
+        return "onnx/model.onnx"
+
+
+class OnnxInt8Backend(OnnxBackend):
+    name = "onnx-int8"
+
+    def _file_name(self, export_dir: Path) -> str:
+        from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+        qconfig = (os.getenv("EMBEDDING_ONNX_QCONFIG") or DEFAULT_ONNX_QCONFIG).strip()
+        file_name = f"onnx/model_qint8_{qconfig}.onnx"
+        if not (export_dir / file_name).exists():
+            print(f"Quantising ONNX model ({qconfig}) …")
+            fp32 = SentenceTransformer(
+                str(export_dir), backend="onnx", device="cpu",
+                model_kwargs={"file_name": "onnx/model.onnx"},
+            )
+            export_dynamic_quantized_onnx_model(fp32, qconfig, str(export_dir))
+        return file_name
+
+
+_BACKEND_CLASSES = {
+    cls.name: cls for cls in (TorchBackend, TorchInt8Backend, OnnxBackend, OnnxInt8Backend)
+}
+
+
+def create_backend(
+    name: Optional[str] = None,
+    model_name: str = "sentence-transformers/LaBSE",
+    threads: Optional[int] = None,
+) -> EmbeddingBackend:
+    """Build the backend named by `name` or EMBEDDING_BACKEND (default torch)."""
+    name = (name or os.getenv("EMBEDDING_BACKEND") or "torch").strip().lower()
+    if name not in _BACKEND_CLASSES:
+        raise ValueError(f"Unknown embedding backend {name!r}; choose from {', '.join(BACKENDS)}")
+    if threads is None and os.getenv("EMBEDDING_THREADS"):
+        threads = int(os.getenv("EMBEDDING_THREADS"))
+    started = time.perf_counter()
+    backend = _BACKEND_CLASSES[name](model_name, threads)
+    print(f"Embedding backend '{name}' loaded in {time.perf_counter() - started:.1f}s"
+          + (f" ({threads} threads)" if threads else ""))
+    return backend
+
+
+def _timed_encode(backend: EmbeddingBackend, texts: List[str], batch_size: int, repeats: int):
+    backend.encode(texts[:2], batch_size)  # warm-up
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        vectors = backend.encode(texts, batch_size)
+        timings.append(time.perf_counter() - started)
+    return vectors, min(timings)
+
+
+def parity_report(
+    candidate: EmbeddingBackend,
+    reference: EmbeddingBackend,
+    texts: Optional[Sequence[str]] = None,
+    batch_size: int = 64,
+    repeats: int = 3,
+) -> Dict[str, float]:
+    """
+    Compare `candidate` with `reference` on the same texts.
+
+    Reports the cosine between each text's two embeddings, how far the
+    pairwise similarity scores (what the API returns) move, and the
+    best-of-`repeats` batch latency of each backend.
+    """
+    texts = list(texts or PARITY_TEXTS)
+    ref, ref_seconds = _timed_encode(reference, texts, batch_size, repeats)
+    cand, cand_seconds = _timed_encode(candidate, texts, batch_size, repeats)
+
+    def unit(m: np.ndarray) -> np.ndarray:
+        return m / np.maximum(np.linalg.norm(m, axis=1, keepdims=True), 1e-12)
+
+    ref, cand = unit(ref), unit(cand)
+    agreement = np.sum(ref * cand, axis=1)
+    drift = np.abs(ref @ ref.T - cand @ cand.T)[np.triu_indices(len(texts), k=1)]
+    return {
+        "texts": len(texts),
+        "cosine_mean": float(agreement.mean()),
+        "cosine_min": float(agreement.min()),
+        "similarity_drift_mean": float(drift.mean()) if len(drift) else 0.0,
+        "similarity_drift_max": float(drift.max()) if len(drift) else 0.0,
+        "reference_batch_seconds": ref_seconds,
+        "candidate_batch_seconds": cand_seconds,
+        "speedup": ref_seconds / cand_seconds if cand_seconds else float("inf"),
+    }
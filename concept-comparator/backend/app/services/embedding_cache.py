@@ -0,0 +1,260 @@
+"""
+Two-tier cache for sentence embeddings.
+
+Entries are keyed by the exact prompt string passed to the model; each
+EmbeddingCache belongs to one model, so (model, prompt) identifies a vector.
+
+  - Memory: an LRU of float32 vectors bounded by a byte budget
+    (EMBEDDING_CACHE_MB, default 256).
+  - Disk: a float16 matrix in a memory-mapped file plus a SQLite index
+    mapping (model, prompt) → row, under EMBEDDING_CACHE_DIR (default
+    ~/.cache/concept-comparator/embeddings). It survives restarts and is
+    shared by every worker on the host; new rows are allocated under the
+    SQLite write lock, so concurrent writers never collide.
+
+If the disk store cannot be opened the cache degrades to memory only.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_MEMORY_MB = 256
+# Rows added per growth step of the vectors file
+_GROW_ROWS = 4096
+# SQLite's default limit on bound parameters is 999
+_LOOKUP_CHUNK = 900
+
+
+def default_cache_root() -> Path:
+    configured = (os.getenv("EMBEDDING_CACHE_DIR") or "").strip()
+    if configured:
+        return Path(configured).expanduser()
+    cache_home = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home) / "concept-comparator" / "embeddings"
+
+
+class MemoryLRU:
+    """Least-recently-used map of vectors, bounded by total array bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        vec = self._entries.get(key)
+        if vec is not None:
+            self._entries.move_to_end(key)
+        return vec
+
+    def put(self, key: str, vec: np.ndarray) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old.nbytes
+        if vec.nbytes > self.max_bytes:
+            return
+        self._entries[key] = vec
+        self.nbytes += vec.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+
+class DiskEmbeddingStore:
+    """float16 vectors in a growable memory-mapped file, indexed by SQLite."""
+
+    def __init__(self, directory: Path, model_name: str, dim: int) -> None:
+        slug = hashlib.sha256(model_name.encode("utf-8")).hexdigest()[:16]
+        directory.mkdir(parents=True, exist_ok=True)
+        self.model_name = model_name
+        self.dim = dim
+        self.row_bytes = dim * np.dtype(np.float16).itemsize
+        self.vectors_path = directory / f"{slug}-{dim}.f16"
+
+        self._conn = sqlite3.connect(
+            str(directory / "index.sqlite"), timeout=30, check_same_thread=False,
+            isolation_level=None,
+        )
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model   TEXT NOT NULL,
+                dim     INTEGER NOT NULL,
+                prompt  TEXT NOT NULL,
+                row     INTEGER NOT NULL,
+                PRIMARY KEY (model, dim, prompt)
+            )
+        """)
+        self._fd = os.open(self.vectors_path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._map: Optional[np.memmap] = None
+        self._mapped_rows = 0
+
+    def __len__(self) -> int:
+        return self._conn.execute(
+            "SELECT count(*) FROM embeddings WHERE model = ? AND dim = ?",
+            (self.model_name, self.dim),
+        ).fetchone()[0]
+
+    def _rows(self, needed: int) -> np.memmap:
+        """Map the vectors file so that at least `needed` rows are visible."""
+        if self._map is None or needed > self._mapped_rows:
+            rows = os.fstat(self._fd).st_size // self.row_bytes
+            self._map = np.memmap(self.vectors_path, dtype=np.float16, mode="r",
+                                  shape=(rows, self.dim)) if rows else None
+            self._mapped_rows = rows
+        return self._map
+
+    def get_many(self, prompts: List[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, int] = {}
+        for start in range(0, len(prompts), _LOOKUP_CHUNK):
+            chunk = prompts[start:start + _LOOKUP_CHUNK]
+            rows = self._conn.execute(
+                f"SELECT prompt, row FROM embeddings WHERE model = ? AND dim = ? "
+                f"AND prompt IN ({','.join('?' * len(chunk))})",
+                [self.model_name, self.dim, *chunk],
+            ).fetchall()
+            found.update(rows)
+        if not found:
+            return {}
+        matrix = self._rows(max(found.values()) + 1)
+        return {p: np.asarray(matrix[r], dtype=np.float32) for p, r in found.items()}
+
+    def put_many(self, items: List[Tuple[str, np.ndarray]]) -> None:
+        if not items:
+            return
+        conn = self._conn
+        # BEGIN IMMEDIATE takes the write lock: row allocation and file growth
+        # are serialised across every process sharing the store
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            prompts = [p for p, _ in items]
+            existing = set()
+            for start in range(0, len(prompts), _LOOKUP_CHUNK):
+                chunk = prompts[start:start + _LOOKUP_CHUNK]
+                existing.update(r[0] for r in conn.execute(
+                    f"SELECT prompt FROM embeddings WHERE model = ? AND dim = ? "
+                    f"AND prompt IN ({','.join('?' * len(chunk))})",
+                    [self.model_name, self.dim, *chunk],
+                ))
+            new = [(p, v) for p, v in dict(items).items() if p not in existing]
+            if not new:
+                conn.execute("COMMIT")
+                return
+
+            next_row = conn.execute(
+                "SELECT coalesce(max(row) + 1, 0) FROM embeddings WHERE model = ? AND dim = ?",
+                (self.model_name, self.dim),
+            ).fetchone()[0]
+            needed = (next_row + len(new)) * self.row_bytes
+            size = os.fstat(self._fd).st_size
+            if size < needed:
+                os.ftruncate(self._fd, needed + _GROW_ROWS * self.row_bytes)
+
+            block = np.stack([np.asarray(v, dtype=np.float16) for _, v in new])
+            os.pwrite(self._fd, block.tobytes(), next_row * self.row_bytes)
+            conn.executemany(
+                "INSERT INTO embeddings (model, dim, prompt, row) VALUES (?, ?, ?, ?)",
+                [(self.model_name, self.dim, p, next_row + i) for i, (p, _) in enumerate(new)],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def close(self) -> None:
+        self._map = None
+        self._conn.close()
+        os.close(self._fd)
+
+
+class EmbeddingCache:
+    """
+    Memory LRU in front of an optional on-disk store for one model.
+
+    Disk reads and writes run outside the lock that guards the LRU and the
+    counters, so stats() never waits behind another process's write lock.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        dim: int,
+        root: Optional[Path] = None,
+        memory_bytes: Optional[int] = None,
+        disk: bool = True,
+    ) -> None:
+        if memory_bytes is None:
+            memory_bytes = int(os.getenv("EMBEDDING_CACHE_MB", DEFAULT_MEMORY_MB)) << 20
+        self.memory = MemoryLRU(memory_bytes)
+        self.disk: Optional[DiskEmbeddingStore] = None
+        self._lock = threading.Lock()  # memory and counters
+        self._store_lock = threading.Lock()  # one transaction at a time on the connection
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+
+        if disk:
+            directory = root or default_cache_root()
+            try:
+                self.disk = DiskEmbeddingStore(directory, model_name, dim)
+                print(f"Embedding cache: {len(self.disk)} vectors on disk at {directory}")
+            except (OSError, sqlite3.Error) as e:
+                print(f"Embedding cache: disk store unavailable at {directory} ({e}); memory only")
+
+    def get_many(self, prompts: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Cached vectors for whichever prompts are present (memory first, then disk)."""
+        prompts = list(dict.fromkeys(prompts))
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for prompt in prompts:
+                vec = self.memory.get(prompt)
+                if vec is not None:
+                    found[prompt] = vec
+            self.hits["memory"] += len(found)
+
+        missing = [p for p in prompts if p not in found]
+        from_disk: Dict[str, np.ndarray] = {}
+        if missing and self.disk is not None:
+            try:
+                with self._store_lock:
+                    from_disk = self.disk.get_many(missing)
+            except (OSError, sqlite3.Error) as e:
+                print(f"Embedding cache: disk read failed ({e})")
+        found.update(from_disk)
+
+        with self._lock:
+            for prompt, vec in from_disk.items():
+                self.memory.put(prompt, vec)
+            self.hits["disk"] += len(from_disk)
+            self.misses += len(prompts) - len(found)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        with self._lock:
+            for prompt, vec in items.items():
+                self.memory.put(prompt, np.asarray(vec, dtype=np.float32))
+        if self.disk is not None:
+            try:
+                with self._store_lock:
+                    self.disk.put_many(list(items.items()))
+            except (OSError, sqlite3.Error) as e:
+                print(f"Embedding cache: disk write failed ({e})")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "memory_entries": len(self.memory),
+                "memory_bytes": self.memory.nbytes,
+                "memory_hits": self.hits["memory"],
+                "disk_hits": self.hits["disk"],
+                "misses": self.misses,
+            }
@@ -0,0 +1,225 @@
+"""
+Execution layer: keeps blocking and CPU-bound work off the event loop.
+
+Work is dispatched by category, each with its own pool and concurrency limit:
+
+  io     threads    SQLite queries, snapshot lookups      EXECUTOR_IO_THREADS (16)
+  model  threads    LaBSE encoding (releases the GIL)     EXECUTOR_MODEL_THREADS (2)
+  graph  processes  pure-Python CLICS graph traversal     EXECUTOR_GRAPH_PROCESSES
+                                                          (min(4, CPUs); 0 = threads)
+
+Graph jobs are the functions in graph_worker, named by string so they can
+be sent to worker processes. Until the process pool has warmed up (or if it
+cannot start) they run on threads against the main process's ClicsService.
+
+Jobs beyond a category's limit wait on an asyncio semaphore rather than in
+the pool, so queue depth and wait time are measured per category (stats()).
+A job holds its slot until it finishes, even if its caller is cancelled
+first: a running thread or process cannot be interrupted.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.services import graph_worker
+
+IO = "io"
+MODEL = "model"
+GRAPH = "graph"
+
+
+def env_int(name: str, default: int) -> int:
+    """Integer environment setting; unset or blank means `default`."""
+    value = (os.getenv(name) or "").strip()
+    return int(value) if value else default
+
+
+class LoopBinding:
+    """
+    The event loop an owner's asyncio primitives were made for. They belong
+    to one loop, so the owner rebuilds them whenever changed() is True.
+    """
+
+    def __init__(self) -> None:
+        self._loop = None
+
+    def changed(self) -> bool:
+        """Whether the running loop differs from the last call's (and remember it)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return False
+        self._loop = loop
+        return True
+
+
+class _Category:
+    def __init__(self, name: str, limit: int) -> None:
+        self.name = name
+        self.limit = max(1, limit)
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.queued = 0
+        self.running = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            "limit": self.limit,
+            "queued": self.queued,
+            "running": self.running,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "mean_wait_ms": round(self.wait_seconds * 1000 / finished, 2) if finished else 0.0,
+            "mean_run_ms": round(self.run_seconds * 1000 / finished, 2) if finished else 0.0,
+        }
+
+
+class ExecutionLayer:
+    def __init__(self) -> None:
+        cpus = os.cpu_count() or 1
+        self.graph_processes = env_int("EXECUTOR_GRAPH_PROCESSES", min(4, cpus))
+        self._categories = {
+            IO: _Category(IO, env_int("EXECUTOR_IO_THREADS", 16)),
+            MODEL: _Category(MODEL, env_int("EXECUTOR_MODEL_THREADS", 2)),
+            GRAPH: _Category(GRAPH, self.graph_processes or min(4, cpus)),
+        }
+        self._threads = {
+            name: ThreadPoolExecutor(max_workers=c.limit, thread_name_prefix=f"exec-{name}")
+            for name, c in self._categories.items()
+        }
+        self._graph_pool: Optional[ProcessPoolExecutor] = None
+        self._loop = LoopBinding()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Startup / shutdown
+    # ------------------------------------------------------------------
+
+    def start_graph_workers(self, clics) -> "ExecutionLayer":
+        """
+        Bind graph jobs to `clics` for in-process use, then start and warm the
+        worker processes. Falls back to threads if the pool cannot start.
+        """
+        graph_worker.bind(clics)
+        if self.graph_processes <= 0:
+            print("Graph jobs: running on threads (EXECUTOR_GRAPH_PROCESSES=0)")
+            return self
+
+        started = time.perf_counter()
+        # spawn, not fork: the parent holds model threads and SQLite handles
+        pool = ProcessPoolExecutor(
+            max_workers=self.graph_processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=graph_worker.initialise,
+        )
+        try:
+            for future in [pool.submit(graph_worker.ping) for _ in range(self.graph_processes)]:
+                future.result()
+        except Exception as e:
+            pool.shutdown(wait=False, cancel_futures=True)
+            print(f"Graph jobs: process pool unavailable ({e}); running on threads")
+            return self
+        self._graph_pool = pool
+        print(f"Graph jobs: {self.graph_processes} worker processes ready in "
+              f"{time.perf_counter() - started:.1f}s")
+        return self
+
+    def shutdown(self) -> None:
+        for pool in self._threads.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        if self._graph_pool is not None:
+            self._graph_pool.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+
+    async def run(self, category: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on the category's thread pool, within its limit."""
+        return await self._dispatch(self._categories[category], self._threads[category],
+                                    fn, *args, **kwargs)
+
+    async def graph(self, job: str, *args) -> Any:
+        """Run graph_worker.<job>(*args) in a worker process (or a thread as fallback)."""
+        pool: Executor = self._graph_pool or self._threads[GRAPH]
+        return await self._dispatch(self._categories[GRAPH], pool, getattr(graph_worker, job), *args)
+
+    async def _dispatch(self, category: _Category, pool: Executor, fn, *args, **kwargs) -> Any:
+        semaphore = self._semaphore(category)
+        queued_at = time.perf_counter()
+        with self._lock:
+            category.queued += 1
+            category.max_queued = max(category.max_queued, category.queued)
+        try:
+            await semaphore.acquire()
+        finally:
+            with self._lock:
+                category.queued -= 1
+        started = time.perf_counter()
+        with self._lock:
+            category.running += 1
+            category.wait_seconds += started - queued_at
+        loop = asyncio.get_running_loop()
+
+        def finished(future: Future) -> None:
+            # Runs when the job itself ends, even if the caller stopped waiting
+            # for it: until then it still holds its slot and counts as running
+            with self._lock:
+                category.running -= 1
+                category.run_seconds += time.perf_counter() - started
+                if future.cancelled() or future.exception() is not None:
+                    category.failed += 1
+                else:
+                    category.completed += 1
+            try:
+                loop.call_soon_threadsafe(semaphore.release)
+            except RuntimeError:  # the loop has closed; so has its semaphore
+                pass
+
+        try:
+            future = pool.submit(_call, fn, args, kwargs)
+        except BaseException:
+            semaphore.release()
+            with self._lock:
+                category.running -= 1
+                category.failed += 1
+            raise
+        future.add_done_callback(finished)
+        # Cancelling the caller cancels the job only if it has not started
+        return await asyncio.wrap_future(future)
+
+    def _semaphore(self, category: _Category) -> asyncio.Semaphore:
+        if self._loop.changed():
+            for c in self._categories.values():
+                c.semaphore = asyncio.Semaphore(c.limit)
+        return category.semaphore
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {name: c.stats() for name, c in self._categories.items()}
+        stats[GRAPH]["processes"] = self.graph_processes if self._graph_pool else 0
+        return stats
+
+
+def _call(fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+    return fn(*args, **kwargs)
+
+
+async def run_io(executor: Optional[ExecutionLayer], fn: Callable[..., Any], *args) -> Any:
+    """Run a blocking call on the executor's I/O threads, or inline without one (tests, scripts)."""
+    if executor is None:
+        return fn(*args)
+    return await executor.run(IO, fn, *args)
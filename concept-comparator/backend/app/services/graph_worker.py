@@ -0,0 +1,74 @@
+"""
+Graph jobs run by the execution layer's process pool.
+
+Each worker process opens the memory-mapped CLICS snapshot (initialise) with
+a ClicsService that skips the concept search table, so the arrays chain,
+family-colexification and family-profile jobs use are shared through the
+page cache rather than copied; language partitions are derived from the
+profiles alone. Node attributes (nodes.json) are read only if a
+semantic-map job needs them. A ColexificationService is built on first use. Jobs take and
+return plain picklable values.
+
+When no process pool is available, bind() points these same functions at
+the main process's ClicsService and they run on threads instead.
+"""
+import os
+from typing import Optional
+
+from app.models.schemas import ConceptAnchor
+
+_clics = None
+_colex = None
+
+
+def initialise() -> None:
+    """Process-pool initializer: load the CLICS snapshot in this worker."""
+    from app.services.clics import ClicsService
+
+    bind(ClicsService(search_index=False))
+    print(f"Graph worker {os.getpid()} ready")
+
+
+def bind(clics) -> None:
+    global _clics, _colex
+    _clics = clics
+    _colex = None
+
+
+def ping() -> int:
+    return os.getpid()
+
+
+def _colexification():
+    global _colex
+    if _colex is None:
+        from app.services.colexification import ColexificationService
+
+        _colex = ColexificationService(_clics)
+    return _colex
+
+
+# ---------------------------------------------------------------------------
+# Jobs
+# ---------------------------------------------------------------------------
+
+def find_chains(concept1: str, concept2: str, family: str, max_depth: int, top_k: int) -> list:
+    return _clics.find_chains(concept1, concept2, family, max_depth, top_k=top_k)
+
+
+def family_colexifications(concept1: str, concept2: str, families: list) -> dict:
+    return _clics.get_family_colexifications(concept1, concept2, families=families)
+
+
+def semantic_map(anchors: list[ConceptAnchor], max_neighbors: int, family_filter: Optional[str]):
+    return _colexification().get_semantic_map(
+        anchors, max_neighbors=max_neighbors, family_filter=family_filter
+    )
+
+
+def family_profiles(anchors: list[ConceptAnchor], families: list[str]) -> dict:
+    return _colexification().compute_family_profiles_full(anchors, families)
+
+
+def language_partitions(anchors: list[ConceptAnchor], families: list[str], profiles: dict) -> dict:
+    return _colexification().compute_language_partitions_from_profiles(anchors, families, profiles)
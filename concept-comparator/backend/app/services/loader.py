@@ -0,0 +1,161 @@
+"""
+Background, dependency-aware service initialisation.
+
+Services are registered with a factory and the names of the services it
+needs. start() launches every factory on its own thread as soon as its
+dependencies are ready, so independent services (LaBSE, the CLICS
+snapshot, the atlas database) load in parallel and nothing blocks import.
+Endpoints await only the services they use; the first request starts
+loading if startup has not already done so.
+
+Futures are thread-based (concurrent.futures), so they can be awaited from
+any event loop.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from fastapi import HTTPException
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class _Service:
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[..., Any],
+        deps: Sequence[str],
+        optional: bool,
+        hint: str,
+    ) -> None:
+        self.name = name
+        self.factory = factory
+        self.deps = tuple(deps)
+        self.optional = optional
+        self.hint = hint
+        self.future: Future = Future()
+        self.state = PENDING
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+
+class ServiceLoader:
+    def __init__(self) -> None:
+        self._services: Dict[str, _Service] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._created_at = time.monotonic()
+
+    def add(
+        self,
+        name: str,
+        factory: Callable[..., Any],
+        deps: Sequence[str] = (),
+        optional: bool = False,
+        hint: str = "",
+    ) -> None:
+        """
+        Register a service. `factory` is called with the dependency instances
+        in `deps` order. Optional services may fail without making the app
+        unready; `hint` is appended to the 503 raised when one is requested.
+        """
+        missing = [d for d in deps if d not in self._services]
+        if missing:
+            raise ValueError(f"{name} depends on unregistered services: {missing}")
+        self._services[name] = _Service(name, factory, deps, optional, hint)
+
+    def start(self) -> None:
+        """Begin loading every service in the background (idempotent)."""
+        with self._lock:
+            if self._executor is not None:
+                return
+            # One thread per service, so waiting on dependencies cannot starve the pool
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(1, len(self._services)),
+                thread_name_prefix="service-init",
+            )
+            for service in self._services.values():
+                self._executor.submit(self._load, service)
+
+    def _load(self, service: _Service) -> None:
+        try:
+            deps = [self._services[d].future.result() for d in service.deps]
+        except Exception as e:
+            service.state = FAILED
+            service.error = f"dependency failed: {e}"
+            service.future.set_exception(RuntimeError(service.error))
+            print(f"{service.name}: not loaded ({service.error})")
+            return
+
+        service.state = LOADING
+        service.started_at = time.monotonic()
+        try:
+            instance = service.factory(*deps)
+        except Exception as e:
+            service.finished_at = time.monotonic()
+            service.state = FAILED
+            service.error = str(e)
+            service.future.set_exception(e)
+            print(f"{service.name}: failed to load after "
+                  f"{service.finished_at - service.started_at:.1f}s: {e}")
+            return
+        service.finished_at = time.monotonic()
+        service.state = READY
+        service.future.set_result(instance)
+        print(f"{service.name}: ready in {service.finished_at - service.started_at:.1f}s")
+
+    async def get(self, name: str) -> Any:
+        """Wait for a service; raises 503 if it failed to load."""
+        self.start()
+        service = self._services[name]
+        try:
+            return await asyncio.wrap_future(service.future)
+        except Exception as e:
+            detail = f"{name} service unavailable: {e}"
+            if service.hint and service.hint not in detail:
+                detail += f". {service.hint}"
+            raise HTTPException(status_code=503, detail=detail)
+
+    def instance(self, name: str) -> Any:
+        """An already-loaded service, for code running after `await get(name)`."""
+        return self._services[name].future.result(timeout=0)
+
+    def loaded(self, name: str) -> bool:
+        """Whether a service has finished loading successfully."""
+        return self._services[name].state == READY
+
+    def is_ready(self) -> bool:
+        """Every required service is ready and every optional one has settled."""
+        return all(
+            s.state == READY or (s.optional and s.state == FAILED)
+            for s in self._services.values()
+        )
+
+    def status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        services = {}
+        for s in self._services.values():
+            entry: Dict[str, Any] = {"state": s.state, "optional": s.optional}
+            if s.started_at is not None:
+                end = s.finished_at if s.finished_at is not None else now
+                entry["load_seconds"] = round(end - s.started_at, 3)
+                entry["ready_after_seconds"] = round(end - self._created_at, 3)
+            if s.error:
+                entry["error"] = s.error
+            services[s.name] = entry
+        return {
+            "ready": self.is_ready(),
+            "uptime_seconds": round(now - self._created_at, 3),
+            "services": services,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=False)
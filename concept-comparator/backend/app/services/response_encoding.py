@@ -0,0 +1,190 @@
+"""
+Response encoding: fast JSON, compact comparison payloads, compression.
+
+  - FastJSONResponse renders with orjson when it is installed (the app's
+    default response class); without it, the standard json module.
+  - Compact comparisons (?format=compact on the comparison endpoints) hoist
+    the family colexifications shared by every language to one top-level
+    field and leave the LaBSE vectors out unless asked for:
+      ?embeddings=none   omitted (default)
+      ?embeddings=f16    base64 of little-endian float16, one string per vector
+      ?embeddings=float  JSON float lists, as in the full format
+    Each language carries two 768-d vectors: about 4 KB per language as
+    f16, about 30 KB as JSON floats.
+  - CompressionMiddleware compresses complete (non-streamed) responses of
+    at least RESPONSE_COMPRESS_MIN_BYTES (default 4096) with brotli, if it
+    is installed and the client accepts it, else gzip. SSE is never buffered.
+"""
+import asyncio
+import base64
+import gzip
+import json
+import os
+from typing import Any, Dict, Optional
+
+import numpy as np
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+from app.models.schemas import ComparisonResult
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", 4096))
+# Compressing more than this is moved off the event loop
+_INLINE_COMPRESS_BYTES = 256 * 1024
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON; numpy arrays and scalars are serialised as lists / numbers."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, ensure_ascii=False, separators=(",", ":"), default=_to_builtin,
+    ).encode("utf-8")
+
+
+def _to_builtin(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# ---------------------------------------------------------------------------
+# Compact comparison payloads
+# ---------------------------------------------------------------------------
+
+def encode_embedding(vector, encoding: str) -> Any:
+    if encoding == "f16":
+        return base64.b64encode(np.asarray(vector, dtype="<f2").tobytes()).decode("ascii")
+    return list(vector)
+
+
+def compact_result(result: ComparisonResult, embeddings: str = "none") -> Dict[str, Any]:
+    """A ComparisonResult without family_colexifications, embeddings encoded as requested."""
+    data = result.model_dump(exclude={"family_colexifications", "embeddings"})
+    if embeddings != "none":
+        data["embeddings"] = [encode_embedding(vector, embeddings) for vector in result.embeddings]
+    return data
+
+
+def compact_comparison(
+    results: Dict[str, ComparisonResult],
+    family_colexifications: dict,
+    has_family: Dict[str, bool],
+    embeddings: str = "none",
+) -> Dict[str, Any]:
+    """
+    {"format": "compact", "embeddings": encoding, "family_colexifications": {...},
+     "results": {lang: compact_result + has_family}}
+    """
+    return {
+        "format": "compact",
+        "embeddings": embeddings,
+        "family_colexifications": family_colexifications,
+        "results": {
+            lang: {**compact_result(result, embeddings), "has_family": has_family[lang]}
+            for lang, result in results.items()
+        },
+    }
+
+
+# ---------------------------------------------------------------------------
+# Compression
+# ---------------------------------------------------------------------------
+
+def _negotiate(accept_encoding: str) -> Optional[str]:
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        params = params.strip().lower()
+        try:
+            quality = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            quality = 0.0
+        if quality > 0:
+            accepted.add(name.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+class CompressionMiddleware:
+    """
+    Compress complete responses of at least `minimum_size` bytes with the
+    best encoding the client accepts. Streamed bodies (more_body), SSE, and
+    responses that are already encoded pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_BYTES) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send) -> None:
+        encoding = None
+        if scope["type"] == "http":
+            encoding = _negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_compressed(message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message  # held until the body shows whether to compress
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=list(start["headers"]))
+            start["headers"] = headers.raw
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or headers.get("content-type", "").startswith("text/event-stream")
+                or len(body) < self.minimum_size
+            ):
+                await send(start)
+                start = None
+                await send(message)
+                return
+
+            if len(body) > _INLINE_COMPRESS_BYTES:
+                body = await asyncio.get_running_loop().run_in_executor(None, _compress, body, encoding)
+            else:
+                body = _compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            start = None
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,247 @@
+"""
+Result cache for concept comparisons.
+
+A comparison is cached per language, so a request whose language set
+overlaps an earlier one only computes the languages that are new. Each
+entry is keyed by a canonical hash of everything the result depends on:
+
+  language results     concepts, sense definitions, language, translation
+                       model, embedding model, CLICS source hash,
+                       dataset_versions
+  family patterns      concepts, sorted family set, CLICS source hash,
+                       dataset_versions
+
+Changing a model or re-ingesting a dataset therefore never serves a stale
+result; old entries simply age out.
+
+  - Memory: an LRU of up to RESULT_CACHE_ENTRIES entries (default 1024).
+  - Disk (optional): a SQLite file under RESULT_CACHE_DIR, shared by
+    workers and kept across restarts. Off unless RESULT_CACHE_DIR is set.
+
+Bump SCHEMA_VERSION whenever ComparisonResult or the way it is computed
+changes; it is part of every key and of the disk store's user_version.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.models.schemas import ComparisonRequest, ComparisonResult
+
+SCHEMA_VERSION = 1
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def canonical_hash(fields: Dict[str, Any]) -> str:
+    """Stable hash of a JSON-serialisable dict (key order does not matter)."""
+    encoded = json.dumps(fields, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def language_key(request: ComparisonRequest, lang: str, fingerprint: Dict[str, Any]) -> str:
+    """Key of one language's ComparisonResult (without family colexifications)."""
+    return canonical_hash({
+        "schema": SCHEMA_VERSION,
+        "kind": "language",
+        "concept1": request.concept1,
+        "sense_id1": request.sense_id1,
+        "concept2": request.concept2,
+        "sense_id2": request.sense_id2,
+        "language": lang,
+        **fingerprint,
+    })
+
+
+def family_key(request: ComparisonRequest, families: Iterable[str], fingerprint: Dict[str, Any]) -> str:
+    """Key of the family colexification patterns shared by a request's languages."""
+    return canonical_hash({
+        "schema": SCHEMA_VERSION,
+        "kind": "families",
+        "concept1": request.concept1,
+        "concept2": request.concept2,
+        "families": sorted(families),
+        "clics": fingerprint.get("clics"),
+        "dataset_versions": fingerprint.get("dataset_versions"),
+    })
+
+
+class ResultStore:
+    """JSON payloads by key in a shared SQLite file."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(
+            str(path), timeout=30, check_same_thread=False, isolation_level=None,
+        )
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            if version:
+                print(f"Result cache: schema {version} → {SCHEMA_VERSION}, discarding old entries")
+            self._conn.execute("DROP TABLE IF EXISTS results")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key         TEXT PRIMARY KEY,
+                payload     TEXT NOT NULL,
+                created_at  REAL NOT NULL
+            )
+        """)
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT count(*) FROM results").fetchone()[0]
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        found: Dict[str, str] = {}
+        # SQLite's default limit on bound parameters is 999
+        for start in range(0, len(keys), 900):
+            chunk = keys[start:start + 900]
+            rows = self._conn.execute(
+                f"SELECT key, payload FROM results WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            found.update(rows)
+        return found
+
+    def put_many(self, payloads: Dict[str, str]) -> None:
+        now = time.time()
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results (key, payload, created_at) VALUES (?, ?, ?)",
+                [(key, payload, now) for key, payload in payloads.items()],
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def default_store_path() -> Optional[Path]:
+    configured = (os.getenv("RESULT_CACHE_DIR") or "").strip()
+    return Path(configured).expanduser() / "results.sqlite" if configured else None
+
+
+class ResultCache:
+    """
+    LRU of comparison results in front of an optional shared SQLite store.
+    get_* and put_* block on the store when there is one; async callers run
+    them on the IO executor. stats() never waits for the store.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, path: Optional[Path] = None) -> None:
+        configured = (os.getenv("RESULT_CACHE_ENTRIES") or "").strip()
+        self.max_entries = max_entries or (int(configured) if configured else DEFAULT_MAX_ENTRIES)
+        self.memory: "OrderedDict[str, Any]" = OrderedDict()
+        self.store: Optional[ResultStore] = None
+        self._lock = threading.Lock()  # memory and counters
+        self._store_lock = threading.Lock()  # one transaction at a time on the connection
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+
+        path = path or default_store_path()
+        if path is not None:
+            try:
+                self.store = ResultStore(path)
+                print(f"Result cache: {len(self.store)} entries on disk at {path}")
+            except (OSError, sqlite3.Error) as e:
+                print(f"Result cache: store unavailable at {path} ({e}); memory only")
+
+    # ------------------------------------------------------------------
+    # Language results
+    # ------------------------------------------------------------------
+
+    def get_results(self, keys: Dict[str, str]) -> Dict[str, ComparisonResult]:
+        """{lang: key} → {lang: cached result} for the languages that hit."""
+        return self._get_many(keys, ComparisonResult.model_validate_json)
+
+    def put_results(self, results: Dict[str, ComparisonResult]) -> None:
+        """{key: result}; results must not carry family colexifications."""
+        self._put_many(results, lambda result: result.model_dump_json())
+
+    # ------------------------------------------------------------------
+    # Family colexification patterns
+    # ------------------------------------------------------------------
+
+    def get_families(self, key: str) -> Optional[dict]:
+        return self._get_many({key: key}, json.loads).get(key)
+
+    def put_families(self, key: str, family_colexifications: dict) -> None:
+        self._put_many({key: family_colexifications}, json.dumps)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _get_many(self, keys: Dict[str, str], decode) -> Dict[str, Any]:
+        found: Dict[str, Any] = {}
+        with self._lock:
+            missing = {}
+            for name, key in keys.items():
+                value = self.memory.get(key)
+                if value is not None:
+                    self.memory.move_to_end(key)
+                    self.hits["memory"] += 1
+                    found[name] = value
+                else:
+                    missing[name] = key
+        if missing and self.store is not None:
+            try:
+                with self._store_lock:
+                    payloads = self.store.get_many(list(missing.values()))
+            except sqlite3.Error as e:
+                print(f"Result cache: read failed ({e})")
+                payloads = {}
+            loaded = {}
+            for name, key in list(missing.items()):
+                if key not in payloads:
+                    continue
+                try:
+                    loaded[key] = found[name] = decode(payloads[key])
+                except ValueError as e:  # includes pydantic ValidationError
+                    print(f"Result cache: dropping unreadable entry ({e})")
+                    continue
+                del missing[name]
+            with self._lock:
+                for key, value in loaded.items():
+                    self._remember(key, value)
+                self.hits["disk"] += len(loaded)
+        with self._lock:
+            self.misses += len(missing)
+        return found
+
+    def _put_many(self, values: Dict[str, Any], encode) -> None:
+        if not values:
+            return
+        with self._lock:
+            for key, value in values.items():
+                self._remember(key, value)
+        if self.store is not None:
+            payloads = {key: encode(value) for key, value in values.items()}
+            try:
+                with self._store_lock:
+                    self.store.put_many(payloads)
+            except sqlite3.Error as e:
+                print(f"Result cache: write failed ({e})")
+
+    def _remember(self, key: str, value: Any) -> None:
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "memory_entries": len(self.memory),
+                "memory_hits": self.hits["memory"],
+                "disk_hits": self.hits["disk"],
+                "misses": self.misses,
+            }
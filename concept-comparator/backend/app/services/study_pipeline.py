@@ -6,18 +6,24 @@ For a StudyRequest with N concepts (2–6), computes:
   - LanguagePartition for each requested language
   - Family profiles aggregated from the pair data
   - Node2Vec colexification-space embeddings for UMAP visualisation
-  - Optional: surface translations via TranslationService (show_translations=True)
+  - Optional: surface translations (show_translations=True) via
+    TieredTranslationResolver: OMW lemmas first, the LLM only where OMW has none
 """
 import asyncio
 from typing import AsyncGenerator, Optional
 
+from app.constants.clics_mappings import get_iso_code
 from app.models.schemas import (
     ColexResult,
+    ConceptAnchor,
+    LanguagePartition,
     StudyRequest,
     StudyResult,
 )
-from app.services.colexification import ColexificationService
+from app.services.colexification import ColexificationService, _get_supported_languages
 from app.services.concept_registry import ConceptRegistryService
+from app.services.executor import ExecutionLayer, run_io
+from app.services.translation_resolver import TieredTranslationResolver
 
 
 class StudyPipelineService:
@@ -26,10 +32,14 @@ class StudyPipelineService:
         colex_service: ColexificationService,
         registry_service: ConceptRegistryService,
         translation_service=None,  # optional; injected at startup
+        executor: Optional[ExecutionLayer] = None,  # runs blocking steps off the event loop
     ) -> None:
         self._colex = colex_service
         self._registry = registry_service
-        self._translation = translation_service
+        self._executor = executor
+        self._translator = TieredTranslationResolver(
+            registry_service, translation_service, executor=executor
+        )
 
     async def run(
         self,
@@ -72,8 +82,8 @@ class StudyPipelineService:
             anchor_a = anchors[i]
             anchor_b = anchors[j]
 
-            evidence = self._colex.get_direct_evidence(
-                anchor_a, anchor_b, [], {}
+            evidence = await run_io(
+                self._executor, self._colex.get_direct_evidence, anchor_a, anchor_b, [], {}
             )
 
             col_result = ColexResult(
@@ -101,9 +111,14 @@ class StudyPipelineService:
         yield {"progress": 50, "step": "Aggregating family profiles from CLICS …"}
         await asyncio.sleep(0)
 
-        family_profiles = self._colex.compute_family_profiles_full(
-            anchors, request.families
-        )
+        if self._executor is not None:
+            family_profiles = await self._executor.graph(
+                "family_profiles", anchors, request.families
+            )
+        else:
+            family_profiles = self._colex.compute_family_profiles_full(
+                anchors, request.families
+            )
 
         # -----------------------------------------------------------------
         # Step 3: Language partitions (selected families, or all attesting families by default)
@@ -111,14 +126,30 @@ class StudyPipelineService:
         yield {"progress": 70, "step": "Computing language partitions …"}
         await asyncio.sleep(0)
 
-        language_partitions = self._colex.compute_language_partitions_from_profiles(
-            anchors, request.families, family_profiles
-        )
+        if self._executor is not None:
+            language_partitions = await self._executor.graph(
+                "language_partitions", anchors, request.families, family_profiles
+            )
+        else:
+            language_partitions = self._colex.compute_language_partitions_from_profiles(
+                anchors, request.families, family_profiles
+            )
 
-        colex_embeddings = self._registry.get_embeddings(
-            [anchor.concepticon_id for anchor in anchors]
+        colex_embeddings = await run_io(
+            self._executor, self._registry.get_embeddings, [anchor.concepticon_id for anchor in anchors]
         )
         translations: Optional[dict[str, list[str]]] = None
+        translation_sources: Optional[dict[str, list[Optional[str]]]] = None
+
+        # -----------------------------------------------------------------
+        # Step 4: Surface translations (OMW first, LLM fallback), if requested
+        # -----------------------------------------------------------------
+        if request.show_translations:
+            yield {"progress": 80, "step": "Translating concepts …"}
+            await asyncio.sleep(0)
+            translations, translation_sources = await self._translate(
+                anchors, language_partitions
+            )
 
         # -----------------------------------------------------------------
         # Assemble final result
@@ -126,7 +157,7 @@ class StudyPipelineService:
         yield {"progress": 95, "step": "Assembling result …"}
         await asyncio.sleep(0)
 
-        dataset_versions = self._registry.get_dataset_versions()
+        dataset_versions = await run_io(self._executor, self._registry.get_dataset_versions)
 
         result = StudyResult(
             concepts=anchors,
@@ -135,7 +166,35 @@ class StudyPipelineService:
             family_profiles=family_profiles,
             colexification_embeddings=colex_embeddings,
             translations=translations,
+            translation_sources=translation_sources,
             dataset_versions=dataset_versions,
         )
 
         yield {"progress": 100, "step": "Done", "result": result}
+
+    async def _translate(
+        self,
+        anchors: list[ConceptAnchor],
+        language_partitions: dict[str, LanguagePartition],
+    ) -> tuple[dict[str, list[str]], dict[str, list[Optional[str]]]]:
+        """
+        Surface forms for every concept in every partitioned language we can name.
+        Keyed like language_partitions; "" / None where no tier had a translation.
+        """
+        supported = _get_supported_languages()
+        iso_by_lang = {
+            lang: iso for lang in language_partitions
+            if (iso := get_iso_code(lang) or lang) in supported
+        }
+        resolved = await self._translator.resolve_many(
+            anchors,
+            {iso: supported[iso]["name"] for iso in set(iso_by_lang.values())},
+        )
+
+        translations: dict[str, list[str]] = {}
+        sources: dict[str, list[Optional[str]]] = {}
+        for lang, iso in iso_by_lang.items():
+            row = resolved[iso]
+            translations[lang] = [t.main_translation if t else "" for t in row]
+            sources[lang] = [t.source if t else None for t in row]
+        return translations, sources
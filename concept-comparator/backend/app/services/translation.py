@@ -1,13 +1,49 @@
+import asyncio
 import json
 import os
 import re
+from typing import Dict, Iterable, List, Optional, Sequence
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from app.models.schemas import Translation
+from app.services.executor import ExecutionLayer, LoopBinding, run_io
+from app.services.translation_cache import CacheKey, TranslationCache
+
+# Concurrent LLM requests across all callers; override with TRANSLATION_CONCURRENCY
+DEFAULT_CONCURRENCY = 8
+
+# Languages per request in batch mode. TRANSLATION_BATCH_SIZE is either one size for
+# every model or per-model "model=size" pairs, e.g. "gpt-4o-mini=15,translategemma:4b=3".
+# 1 (the default) keeps one request per language.
+DEFAULT_BATCH_SIZE = 1
+
+
+def batch_size_for(model: str, setting: Optional[str] = None) -> int:
+    """Languages per translation request for `model` under a TRANSLATION_BATCH_SIZE setting"""
+    setting = (os.getenv("TRANSLATION_BATCH_SIZE", "") if setting is None else setting).strip()
+    if not setting:
+        return DEFAULT_BATCH_SIZE
+    if "=" not in setting:
+        return max(1, int(setting))
+    sizes = dict(pair.rsplit("=", 1) for pair in setting.split(",") if "=" in pair)
+    size = sizes.get(model, sizes.get("*"))
+    return max(1, int(size)) if size else DEFAULT_BATCH_SIZE
+
+SYSTEM_PROMPT = """You are a linguistic expert specializing in semantic analysis and translation.
+Your task is to provide precise translations capturing semantic distinctions that are grammatically
+or culturally mandatory in the target language.
+Only provide variations when the target language requires different words based on context, nuance,
+physical properties, social relationships, or other factors."""
+
+TRANSLATION_SCHEMA = """{
+  "main_translation": "string",
+  "variations": [{"word": "string", "context": "string", "nuance": "string"}],
+  "usage_notes": "string"
+}"""
 
 class TranslationService:
-    def __init__(self):
+    def __init__(self, executor: Optional[ExecutionLayer] = None):
         self.model = os.getenv("TRANSLATION_MODEL", "gpt-4o-mini")
         api_key = os.getenv("OPENAI_API_KEY") or os.getenv("TRANSLATION_API_KEY") or "ollama"
         base_url = os.getenv("OPENAI_BASE_URL")
@@ -17,27 +53,232 @@ class TranslationService:
             client_kwargs["base_url"] = base_url
 
         self.client = OpenAI(**client_kwargs)
-        self.cached_translations = {}
+        # Same endpoint, used by the async path so LLM round trips don't block the event loop
+        self.async_client = AsyncOpenAI(**client_kwargs)
+        self.concurrency = int(os.getenv("TRANSLATION_CONCURRENCY", DEFAULT_CONCURRENCY))
+        self.batch_size = batch_size_for(self.model)
+        self._semaphore = None
+        self._inflight = {}
+        self._waiters = {}
+        self._prefetched = set()  # started by prefetch(), not yet joined by translate()
+        self._loop = LoopBinding()
+        # Persisted across restarts and shared by workers; see TRANSLATION_CACHE_DIR.
+        # The async path reads and writes its SQLite store on the executor's I/O threads
+        self.cache = TranslationCache()
+        self._executor = executor
 
     def get_translation(self, word: str, sense_definition: str, target_lang: str) -> Translation:
-        cache_key = f"{self.model}_{word}_{sense_definition}_{target_lang}"
+        cache_key = self._cache_key(word, sense_definition, target_lang)
         print(f"Translating: {cache_key}...")
-        if cache_key in self.cached_translations:
-            return self.cached_translations[cache_key]
-        
-        word = word.title() if (word.isupper() or word.islower()) else word
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        response = self.client.chat.completions.create(
+            **self._request(word, sense_definition, target_lang)
+        )
+
+        content = response.choices[0].message.content or ""
+        translation = self._parse_translation(content)
+        self.cache.put(cache_key, translation)
+        return translation
+
+    async def translate(self, word: str, sense_definition: str, target_lang: str) -> Translation:
+        """
+        Async get_translation. Concurrent calls for the same key share one LLM
+        request, and at most `concurrency` requests are in flight at once.
+        """
+        cache_key = self._cache_key(word, sense_definition, target_lang)
+        self._bind_loop()
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            if cache_key in self._prefetched:
+                self._prefetched.discard(cache_key)  # its miss was counted by prefetch()
+            else:
+                self.cache.record_coalesced()
+            return await self._join(cache_key, inflight)
+
+        cached = self.cache.get_memory(cache_key)
+        if cached is not None:
+            return cached
+
+        # Registered before the disk read, so concurrent calls for the key join it
+        task = asyncio.ensure_future(self._lookup(cache_key, word, sense_definition, target_lang))
+        self._inflight[cache_key] = task
+        task.add_done_callback(lambda t: self._settle(cache_key, t))
+        return await self._join(cache_key, task)
+
+    async def _join(self, cache_key: CacheKey, task: asyncio.Task) -> Translation:
+        """
+        Wait for a shared call. A cancelled waiter leaves the call running for
+        the others; the last one to leave cancels it, since nobody needs it.
+        """
+        self._waiters[cache_key] = self._waiters.get(cache_key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            remaining = self._waiters.pop(cache_key, 1) - 1
+            if remaining:
+                self._waiters[cache_key] = remaining
+            elif not task.done():
+                task.cancel()
+                self.cache.record_cancelled()
+
+    def abandon(self, cache_keys: Iterable[CacheKey]) -> int:
+        """
+        Cancel prefetched calls for these keys that nobody is waiting on (a
+        stream that started them went away). Returns how many were cancelled.
+        """
+        cancelled = 0
+        for cache_key in cache_keys:
+            task = self._inflight.get(cache_key)
+            if task is not None and not task.done() and not self._waiters.get(cache_key):
+                task.cancel()
+                cancelled += 1
+        for _ in range(cancelled):
+            self.cache.record_cancelled()
+        return cancelled
+
+    async def prefetch(self, word: str, sense_definition: str, target_langs: Sequence[str]) -> List[CacheKey]:
+        """
+        In batch mode, start translating `word` into every uncached language in
+        groups of `batch_size` per request. Later translate() calls for these
+        languages join the pending work instead of making their own requests.
+        Does nothing when batch_size is 1.
+
+        Returns the keys it started, for abandon() if the caller goes away.
+        """
+        if self.batch_size <= 1:
+            return []
+        self._bind_loop()
+        keys = {
+            lang: self._cache_key(word, sense_definition, lang)
+            for lang in dict.fromkeys(target_langs)
+        }
+        # missing(), not get(): each key is counted once, as a miss below or in translate()
+        missing = await run_io(
+            self._executor,
+            self.cache.missing,
+            [key for key in keys.values() if key not in self._inflight],
+        )
+        # translate() may have started some of these while the cache was read
+        langs = [
+            lang for lang, key in keys.items()
+            if key in missing and key not in self._inflight
+        ]
+        started = []
+        for start in range(0, len(langs), self.batch_size):
+            group = langs[start:start + self.batch_size]
+            if len(group) == 1:
+                continue  # translate() sends a single-language request anyway
+            batch = asyncio.ensure_future(self._fetch_batch(word, sense_definition, group))
+            members = []
+            for lang in group:
+                cache_key = self._cache_key(word, sense_definition, lang)
+                task = asyncio.ensure_future(
+                    self._from_batch(batch, cache_key, word, sense_definition, lang)
+                )
+                self._inflight[cache_key] = task
+                self._prefetched.add(cache_key)
+                self.cache.record_miss()
+                task.add_done_callback(lambda t, key=cache_key: self._settle(key, t))
+                members.append(task)
+                started.append(cache_key)
+            for task in members:
+                task.add_done_callback(lambda _, b=batch, m=members: self._release_batch(b, m))
+        return started
+
+    async def _fetch_batch(self, word: str, sense_definition: str, target_langs: List[str]) -> Dict[str, Translation]:
+        """One request for several languages; returns only the entries that validate"""
+        try:
+            async with self._semaphore:
+                print(f"Translating: {word} into {len(target_langs)} languages in one request...")
+                response = await self.async_client.chat.completions.create(
+                    **self._batch_request(word, sense_definition, target_langs)
+                )
+            content = response.choices[0].message.content or ""
+            entries = json.loads(self._extract_json_object(content)).get("translations") or {}
+        except Exception as e:
+            print(f"Batch translation of {word} failed ({e}); falling back to single requests")
+            return {}
+
+        # Models sometimes change the case of language names
+        by_name = {str(name).casefold(): entry for name, entry in entries.items()}
+        translations = {}
+        for lang in target_langs:
+            entry = by_name.get(lang.casefold())
+            if not isinstance(entry, dict):
+                continue
+            try:
+                translation = self._parse_translation(json.dumps(entry))
+            except ValueError as e:  # includes pydantic ValidationError
+                print(f"Invalid batch entry for {word} in {lang} ({e})")
+                continue
+            translations[lang] = translation
+        await run_io(self._executor, self.cache.put_many, {
+            self._cache_key(word, sense_definition, lang): translation
+            for lang, translation in translations.items()
+        })
+        return translations
+
+    async def _from_batch(
+        self, batch: asyncio.Task, cache_key: CacheKey, word: str, sense_definition: str, lang: str
+    ) -> Translation:
+        # shield: cancelling one language must not cancel the others' request
+        translations = await asyncio.shield(batch)
+        if lang in translations:
+            return translations[lang]
+        return await self._fetch(cache_key, word, sense_definition, lang)
+
+    @staticmethod
+    def _release_batch(batch: asyncio.Task, members: List[asyncio.Task]) -> None:
+        # Once no language needs the batch (all answered or cancelled), stop it
+        if not batch.done() and all(task.done() for task in members):
+            batch.cancel()
+
+    def _settle(self, cache_key: CacheKey, task: asyncio.Task) -> None:
+        self._inflight.pop(cache_key, None)
+        self._prefetched.discard(cache_key)
+        # Retrieve the exception so it isn't reported as unhandled if every waiter left
+        if not task.cancelled():
+            task.exception()
+
+    async def _lookup(self, cache_key: CacheKey, word: str, sense_definition: str, target_lang: str) -> Translation:
+        """translate()'s shared task: the cache's disk tier, then the LLM."""
+        cached = await run_io(self._executor, self.cache.get, cache_key)
+        if cached is not None:
+            return cached
+        return await self._fetch(cache_key, word, sense_definition, target_lang)
+
+    async def _fetch(self, cache_key: CacheKey, word: str, sense_definition: str, target_lang: str) -> Translation:
+        async with self._semaphore:
+            print(f"Translating: {cache_key}...")
+            response = await self.async_client.chat.completions.create(
+                **self._request(word, sense_definition, target_lang)
+            )
+
+        content = response.choices[0].message.content or ""
+        translation = self._parse_translation(content)
+        await run_io(self._executor, self.cache.put, cache_key, translation)
+        return translation
+
+    def _bind_loop(self) -> None:
+        if self._loop.changed():
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._inflight = {}
+            self._waiters = {}
+            self._prefetched = set()
+
+    def _cache_key(self, word: str, sense_definition: str, target_lang: str) -> CacheKey:
+        return (self.model, word, sense_definition, target_lang)
+
+    def _request(self, word: str, sense_definition: str, target_lang: str) -> dict:
+        """Chat completion arguments for one translation"""
+        word = self._display_word(word)
             
-        system_prompt = """You are a linguistic expert specializing in semantic analysis and translation.
-Your task is to provide precise translations capturing semantic distinctions that are grammatically
-or culturally mandatory in the target language.
-Only provide variations when the target language requires different words based on context, nuance,
-physical properties, social relationships, or other factors.
+        system_prompt = f"""{SYSTEM_PROMPT}
 Return ONLY valid JSON with this exact schema:
-{
-  "main_translation": "string",
-  "variations": [{"word": "string", "context": "string", "nuance": "string"}],
-  "usage_notes": "string"
-}
+{TRANSLATION_SCHEMA}
 If there are no required variations, return an empty array for "variations"."""
         
         user_prompt = f"""Translate the following word into {target_lang}, noting only variations that are
@@ -46,7 +287,7 @@ If there are no required variations, return an empty array for "variations"."""
         Specifics: {sense_definition}
         Return JSON only."""
 
-        response = self.client.chat.completions.create(
+        return dict(
             model=self.model,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -56,10 +297,41 @@ If there are no required variations, return an empty array for "variations"."""
             response_format={"type": "json_object"},
         )
 
-        content = response.choices[0].message.content or ""
-        translation = self._parse_translation(content)
-        self.cached_translations[cache_key] = translation
-        return translation
+    def _batch_request(self, word: str, sense_definition: str, target_langs: List[str]) -> dict:
+        """Chat completion arguments for one word into several languages"""
+        word = self._display_word(word)
+        schema = TRANSLATION_SCHEMA.replace("\n", "\n    ")
+
+        system_prompt = f"""{SYSTEM_PROMPT}
+You will be asked for several target languages at once. Treat each language independently.
+Return ONLY valid JSON with this exact schema, with one entry per requested language,
+keyed by the language name exactly as given:
+{{
+  "translations": {{
+    "<language name>": {schema}
+  }}
+}}
+If a language has no required variations, return an empty array for its "variations"."""
+
+        user_prompt = f"""Translate the following word into each of these languages: {", ".join(target_langs)}.
+        For each language, note only variations that are required by the language's usage rules.
+        Word: {word}
+        Specifics: {sense_definition}
+        Return JSON only."""
+
+        return dict(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=0,
+            response_format={"type": "json_object"},
+        )
+
+    @staticmethod
+    def _display_word(word: str) -> str:
+        return word.title() if (word.isupper() or word.islower()) else word
 
     def _parse_translation(self, content: str) -> Translation:
         json_text = self._extract_json_object(content)
@@ -0,0 +1,231 @@
+"""
+Persistent cache for LLM translations.
+
+Entries are keyed by (model, word, sense definition, target language) and
+stored as the validated Translation JSON in a SQLite file under
+TRANSLATION_CACHE_DIR (default ~/.cache/concept-comparator/translations).
+The file survives restarts and is shared by every worker on the host (WAL
+mode, so readers never block the writer). A process-local dict sits in
+front of it.
+
+SCHEMA_VERSION is stored in the database's user_version. Bump it whenever
+the table layout, the prompt, or the Translation schema changes, and any
+existing store is discarded and rebuilt on open.
+
+If the store cannot be opened the cache degrades to memory only.
+"""
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from app.models.schemas import Translation
+
+SCHEMA_VERSION = 1
+
+CacheKey = Tuple[str, str, str, str]  # (model, word, sense definition, target language)
+
+
+def default_cache_path() -> Path:
+    configured = (os.getenv("TRANSLATION_CACHE_DIR") or "").strip()
+    if configured:
+        root = Path(configured).expanduser()
+    else:
+        cache_home = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+        root = Path(cache_home) / "concept-comparator" / "translations"
+    return root / "translations.sqlite"
+
+
+class TranslationStore:
+    """Translations as JSON rows in a shared SQLite file."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(
+            str(path), timeout=30, check_same_thread=False, isolation_level=None,
+        )
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            if version:
+                print(f"Translation cache: schema {version} → {SCHEMA_VERSION}, discarding old entries")
+            self._conn.execute("DROP TABLE IF EXISTS translations")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS translations (
+                model        TEXT NOT NULL,
+                word         TEXT NOT NULL,
+                sense        TEXT NOT NULL,
+                target_lang  TEXT NOT NULL,
+                payload      TEXT NOT NULL,
+                created_at   REAL NOT NULL,
+                PRIMARY KEY (model, word, sense, target_lang)
+            )
+        """)
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT count(*) FROM translations").fetchone()[0]
+
+    def get(self, key: CacheKey) -> Optional[Translation]:
+        row = self._conn.execute(
+            "SELECT payload FROM translations "
+            "WHERE model = ? AND word = ? AND sense = ? AND target_lang = ?",
+            key,
+        ).fetchone()
+        return Translation.model_validate_json(row[0]) if row else None
+
+    def put(self, key: CacheKey, translation: Translation) -> None:
+        self.put_many({key: translation})
+
+    def put_many(self, translations: Dict[CacheKey, Translation]) -> None:
+        now = time.time()
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations "
+                "(model, word, sense, target_lang, payload, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [(*key, translation.model_dump_json(), now) for key, translation in translations.items()],
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class TranslationCache:
+    """
+    Process-local dict in front of an optional shared SQLite store.
+
+    Methods that may touch the store block on SQLite; async callers run them
+    on the execution layer's I/O threads. get_memory() never does I/O, and
+    store reads and writes happen outside the lock that guards memory and
+    counters, so get_memory() and stats() never wait behind the disk.
+    """
+
+    def __init__(self, path: Optional[Path] = None, disk: bool = True) -> None:
+        self.memory: Dict[CacheKey, Translation] = {}
+        self.store: Optional[TranslationStore] = None
+        self._lock = threading.Lock()  # memory and counters
+        self._store_lock = threading.Lock()  # one statement at a time on the connection
+        # Loaded from disk by contains(); their first get() counts as a disk hit
+        self._promoted: Set[CacheKey] = set()
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        self.coalesced = 0
+        self.cancelled = 0
+
+        if disk:
+            path = path or default_cache_path()
+            try:
+                self.store = TranslationStore(path)
+                print(f"Translation cache: {len(self.store)} translations on disk at {path}")
+            except (OSError, sqlite3.Error) as e:
+                print(f"Translation cache: store unavailable at {path} ({e}); memory only")
+
+    def get(self, key: CacheKey) -> Optional[Translation]:
+        """The cached translation, or None (counted as a miss)."""
+        with self._lock:
+            translation = self._from_memory(key)
+        if translation is not None:
+            return translation
+        if self.store is not None:
+            try:
+                with self._store_lock:
+                    translation = self.store.get(key)
+            except (sqlite3.Error, ValueError) as e:
+                print(f"Translation cache: read failed ({e})")
+        with self._lock:
+            if translation is None:
+                self.misses += 1
+                return None
+            self.hits["disk"] += 1
+            return self.memory.setdefault(key, translation)
+
+    def get_memory(self, key: CacheKey) -> Optional[Translation]:
+        """The translation if it is in memory (counted as a hit); None is not counted, follow with get()."""
+        with self._lock:
+            return self._from_memory(key)
+
+    def contains(self, key: CacheKey) -> bool:
+        """
+        Whether the key is cached, without counting a hit or miss. A disk
+        entry is loaded into memory, so the get() that follows is cheap.
+        """
+        return key not in self.missing([key])
+
+    def missing(self, keys: Iterable[CacheKey]) -> Set[CacheKey]:
+        """The keys that are not cached, without counting (see contains())."""
+        with self._lock:
+            missing = {key for key in keys if key not in self.memory}
+        if not missing or self.store is None:
+            return missing
+        loaded = {}
+        for key in missing:
+            try:
+                with self._store_lock:
+                    translation = self.store.get(key)
+            except (sqlite3.Error, ValueError) as e:
+                print(f"Translation cache: read failed ({e})")
+                continue
+            if translation is not None:
+                loaded[key] = translation
+        with self._lock:
+            for key, translation in loaded.items():
+                if key not in self.memory:
+                    self.memory[key] = translation
+                    self._promoted.add(key)
+        return missing - loaded.keys()
+
+    def put(self, key: CacheKey, translation: Translation) -> None:
+        self.put_many({key: translation})
+
+    def put_many(self, translations: Dict[CacheKey, Translation]) -> None:
+        if not translations:
+            return
+        with self._lock:
+            self.memory.update(translations)
+        if self.store is not None:
+            try:
+                with self._store_lock:
+                    self.store.put_many(translations)
+            except sqlite3.Error as e:
+                print(f"Translation cache: write failed ({e})")
+
+    def _from_memory(self, key: CacheKey) -> Optional[Translation]:
+        # Caller holds the lock
+        translation = self.memory.get(key)
+        if translation is not None:
+            if key in self._promoted:
+                self._promoted.discard(key)
+                self.hits["disk"] += 1
+            else:
+                self.hits["memory"] += 1
+        return translation
+
+    def record_miss(self) -> None:
+        """A miss found without get() (see contains())."""
+        with self._lock:
+            self.misses += 1
+
+    def record_coalesced(self) -> None:
+        with self._lock:
+            self.coalesced += 1
+
+    def record_cancelled(self) -> None:
+        with self._lock:
+            self.cancelled += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "memory_entries": len(self.memory),
+                "memory_hits": self.hits["memory"],
+                "disk_hits": self.hits["disk"],
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "cancelled": self.cancelled,
+            }
@@ -0,0 +1,132 @@
+"""
+TieredTranslationResolver — surface translations for Concepticon concepts.
+
+Tier 1: Open Multilingual Wordnet lemmas from omw_anchors. The first lemma
+        is the main translation and the rest become variations. No LLM call.
+Tier 2: TranslationService (LLM) for languages or concepts without OMW
+        coverage, batched per concept when TRANSLATION_BATCH_SIZE allows.
+
+Every Translation carries `source` ("omw" or "llm") so callers can show
+which tier produced it.
+"""
+import asyncio
+from typing import Optional
+
+from app.models.schemas import ConceptAnchor, Translation, TranslationVariant
+from app.services.concept_registry import ConceptRegistryService
+from app.services.executor import ExecutionLayer, run_io
+from app.services.translation import TranslationService
+
+OMW_SOURCE = "omw"
+
+
+class TieredTranslationResolver:
+    def __init__(
+        self,
+        registry_service: ConceptRegistryService,
+        translation_service: Optional[TranslationService] = None,
+        executor: Optional[ExecutionLayer] = None,  # runs OMW lookups off the event loop
+    ) -> None:
+        self._registry = registry_service
+        self._translation = translation_service
+        self._executor = executor
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def resolve(
+        self, anchor: ConceptAnchor, lang_code: str, lang_name: str
+    ) -> Optional[Translation]:
+        """Translate one concept into one language (ISO 639-3 code + display name)."""
+        return (await self.resolve_many([anchor], {lang_code: lang_name}))[lang_code][0]
+
+    async def resolve_many(
+        self,
+        anchors: list[ConceptAnchor],
+        languages: dict[str, str],
+    ) -> dict[str, list[Optional[Translation]]]:
+        """
+        Translate every concept into every language.
+
+        languages maps ISO 639-3 code → display name. Returns
+        {lang_code: [translation per anchor]}, with None where neither tier
+        produced a translation (no OMW lemma and no LLM, or the LLM call failed).
+        """
+        lang_codes = list(languages)
+        result: dict[str, list[Optional[Translation]]] = {
+            code: [None] * len(anchors) for code in lang_codes
+        }
+
+        # Tier 1: one OMW lookup per concept across all languages
+        omw = await run_io(self._executor, self._omw_lemmas, anchors, lang_codes)
+        pending: list[tuple[int, str]] = []
+        for idx, lemmas_by_lang in enumerate(omw):
+            for code in lang_codes:
+                lemmas = lemmas_by_lang.get(code)
+                if lemmas:
+                    result[code][idx] = self._from_omw(lemmas)
+                else:
+                    pending.append((idx, code))
+
+        if not pending or self._translation is None:
+            return result
+
+        # Tier 2: the LLM, only for what OMW does not cover
+        prefetched = []
+        try:
+            for idx, anchor in enumerate(anchors):
+                names = [languages[code] for i, code in pending if i == idx]
+                prefetched += await self._translation.prefetch(anchor.label, self._sense(anchor), names)
+            llm = await asyncio.gather(
+                *(
+                    self._translation.translate(
+                        anchors[idx].label, self._sense(anchors[idx]), languages[code]
+                    )
+                    for idx, code in pending
+                ),
+                return_exceptions=True,
+            )
+        finally:
+            # If we were cancelled, stop batch calls nobody else has joined
+            self._translation.abandon(prefetched)
+        for (idx, code), translation in zip(pending, llm):
+            if isinstance(translation, Exception):
+                print(f"LLM translation of {anchors[idx].label} into {languages[code]} failed: {translation}")
+                continue
+            result[code][idx] = translation
+
+        covered = len(anchors) * len(lang_codes) - len(pending)
+        print(f"Translations: {covered} from OMW, {len(pending)} via LLM")
+        return result
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _omw_lemmas(self, anchors: list[ConceptAnchor], lang_codes: list[str]) -> list[dict[str, list[str]]]:
+        """OMW lemmas by language, per anchor (blocking: reads atlas.sqlite)."""
+        return [
+            self._registry.get_omw_anchors(anchor.concepticon_id, lang_codes)
+            for anchor in anchors
+        ]
+
+    @staticmethod
+    def _from_omw(lemmas: list[str]) -> Translation:
+        return Translation(
+            main_translation=lemmas[0],
+            variations=[
+                TranslationVariant(word=lemma, context="OMW synonym", nuance="")
+                for lemma in lemmas[1:]
+            ],
+            usage_notes="Lemmas from Open Multilingual Wordnet",
+            source=OMW_SOURCE,
+        )
+
+    @staticmethod
+    def _sense(anchor: ConceptAnchor) -> str:
+        """Sense description sent to the LLM (and part of its cache key)."""
+        sense = f"the Concepticon concept {anchor.label} (ID {anchor.concepticon_id})"
+        if anchor.semantic_field:
+            sense += f", semantic field: {anchor.semantic_field}"
+        return sense
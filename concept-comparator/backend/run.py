@@ -1,10 +1,17 @@
+import os
+
 import uvicorn
 
 if __name__ == "__main__":
+    # Workers memory-map the same compiled CLICS snapshot, so adding workers
+    # does not multiply the graph's resident memory. Reload is dev-only and
+    # cannot be combined with multiple workers.
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        reload=workers == 1,
         reload_dirs=["backend"],
+        workers=workers,
     )
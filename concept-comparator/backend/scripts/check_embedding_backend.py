@@ -0,0 +1,61 @@
+"""
+Check an embedding backend against the full-precision PyTorch model.
+
+Encodes the same prompts with both and reports per-text cosine agreement,
+how much pairwise similarity scores move, and per-batch latency. Run before
+switching EMBEDDING_BACKEND in a deployment.
+
+Usage:
+    python scripts/check_embedding_backend.py --backend onnx-int8 --threads 4
+    python scripts/check_embedding_backend.py --backend torch-int8 --texts prompts.txt
+
+The ONNX backends require: pip install "optimum[onnxruntime]"
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Allow running from any working directory
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.embedding import MODEL_NAME
+from app.services.embedding_backends import BACKENDS, create_backend, parity_report
+
+# Agreement below this is reported as a failure (exit status 1)
+MIN_COSINE = 0.98
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--backend", choices=BACKENDS, default="onnx-int8")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--texts", type=Path, default=None,
+                        help="file with one prompt per line (default: built-in sample)")
+    args = parser.parse_args()
+
+    texts = None
+    if args.texts:
+        texts = [line.strip() for line in args.texts.read_text(encoding="utf-8").splitlines()
+                 if line.strip()]
+
+    reference = create_backend("torch", MODEL_NAME, args.threads)
+    candidate = create_backend(args.backend, MODEL_NAME, args.threads)
+    report = parity_report(candidate, reference, texts, batch_size=args.batch_size)
+
+    print(f"\n{args.backend} vs torch on {report['texts']} texts")
+    print(f"  cosine agreement   mean {report['cosine_mean']:.5f}  min {report['cosine_min']:.5f}")
+    print(f"  similarity drift   mean {report['similarity_drift_mean']:.5f}  "
+          f"max {report['similarity_drift_max']:.5f}")
+    print(f"  batch latency      torch {report['reference_batch_seconds'] * 1000:.1f} ms  "
+          f"{args.backend} {report['candidate_batch_seconds'] * 1000:.1f} ms  "
+          f"({report['speedup']:.2f}x)")
+
+    if report["cosine_min"] < MIN_COSINE:
+        print(f"FAIL: minimum cosine agreement below {MIN_COSINE}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
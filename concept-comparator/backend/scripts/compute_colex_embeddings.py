@@ -17,6 +17,12 @@ import struct
 import sys
 from pathlib import Path
 
+# Allow running from any working directory
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.atlas_db import atlas_writer
+from app.services.clics_snapshot import load_or_compile_snapshot
+
 DB_PATH = Path(__file__).parent.parent / "data" / "atlas.sqlite"
 GML_CANDIDATES = [
     Path(__file__).parent.parent / "data" / "clics" / "network-3-families.gml",
@@ -37,16 +43,9 @@ def find_gml() -> Path:
 
 
 def load_graph(gml_path: Path):
-    import networkx as nx
     print(f"Loading CLICS graph from {gml_path} …")
-    raw = gml_path.read_text(encoding="utf-8")
-    cleaned = raw.encode("ascii", "ignore").decode("ascii")
-    tmp = gml_path.with_suffix(".tmp")
-    tmp.write_text(cleaned)
-    try:
-        g = nx.read_gml(tmp)
-    finally:
-        tmp.unlink(missing_ok=True)
+    # Served from the compiled snapshot shared with ClicsService
+    g = load_or_compile_snapshot(gml_path).to_networkx()
     print(f"Graph: {len(g.nodes)} nodes, {len(g.edges)} edges")
     return g
 
@@ -130,7 +129,7 @@ def compute_and_store(conn: sqlite3.Connection, g) -> int:
 def main() -> None:
     gml_path = find_gml()
     g = load_graph(gml_path)
-    with sqlite3.connect(DB_PATH) as conn:
+    with atlas_writer(DB_PATH) as conn:
         n = compute_and_store(conn, g)
     print(f"Done: {n} concept embeddings stored")
 
@@ -7,9 +7,17 @@ Run after setup_database.py.
 import csv
 import io
 import sqlite3
+import sys
 import urllib.request
 from pathlib import Path
 
+# Allow running from any working directory
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.atlas_db import atlas_writer
+from setup_database import rebuild_concept_search
+
 DB_PATH = Path(__file__).parent.parent / "data" / "atlas.sqlite"
 
 # Concepticon 3.4.0 release asset (raw TSV from GitHub)
@@ -57,6 +65,8 @@ def ingest(conn: sqlite3.Connection, rows: list[dict]) -> int:
         ))
 
     conn.executemany(insert_sql, records)
+    # REPLACE bypasses the FTS delete trigger, so re-index from scratch
+    rebuild_concept_search(conn)
 
     conn.execute("""
         INSERT OR REPLACE INTO dataset_versions (name, version, url)
@@ -69,7 +79,7 @@ def ingest(conn: sqlite3.Connection, rows: list[dict]) -> int:
 
 def main() -> None:
     rows = download_conceptsets(CONCEPTSETS_URL)
-    with sqlite3.connect(DB_PATH) as conn:
+    with atlas_writer(DB_PATH) as conn:
         n = ingest(conn, rows)
     print(f"Ingested {n} concept sets into concept_registry")
 
@@ -18,6 +18,11 @@ import sqlite3
 import sys
 from pathlib import Path
 
+# Allow running from any working directory
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.atlas_db import atlas_writer
+
 DB_PATH = Path(__file__).parent.parent / "data" / "atlas.sqlite"
 
 # OMW language packs to download (ISO 639-3 → OMW language code)
@@ -118,7 +123,7 @@ def ingest_omw(conn: sqlite3.Connection) -> int:
 
 
 def main() -> None:
-    with sqlite3.connect(DB_PATH) as conn:
+    with atlas_writer(DB_PATH) as conn:
         n = ingest_omw(conn)
     print(f"\nIngested {n} OMW anchor records")
 
@@ -17,7 +17,8 @@ from pathlib import Path
 # Allow running from any working directory
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import networkx as nx
+from app.services.atlas_db import atlas_writer
+from app.services.clics_snapshot import load_or_compile_snapshot
 
 DB_PATH = Path(__file__).parent.parent / "data" / "atlas.sqlite"
 GML_CANDIDATES = [
@@ -38,18 +39,11 @@ def find_gml() -> Path:
 def load_graph_glosses(gml_path: Path) -> list[str]:
     """Load CLICS GML and return all unique non-empty Gloss values."""
     print(f"Loading CLICS graph from {gml_path} …")
-    # Clean non-ASCII before loading (mirrors ClicsService)
-    raw = gml_path.read_text(encoding="utf-8")
-    cleaned = raw.encode("ascii", "ignore").decode("ascii")
-    tmp = gml_path.with_suffix(".tmp")
-    tmp.write_text(cleaned)
-    try:
-        g = nx.read_gml(tmp)
-    finally:
-        tmp.unlink(missing_ok=True)
+    # Same compiled snapshot ClicsService loads; no GML re-parse once cached
+    snapshot = load_or_compile_snapshot(gml_path)
 
     glosses = []
-    for _, data in g.nodes(data=True):
+    for data in snapshot.node_attrs:
         gloss = data.get("Gloss", "").strip()
         if gloss:
             glosses.append(gloss)
@@ -100,7 +94,7 @@ def main() -> None:
     gml_path = find_gml()
     glosses = load_graph_glosses(gml_path)
 
-    with sqlite3.connect(DB_PATH) as conn:
+    with atlas_writer(DB_PATH) as conn:
         matched, unmatched = match_glosses(conn, glosses)
 
     total = matched + unmatched
@@ -3,8 +3,14 @@ Create the atlas.sqlite database with all required tables.
 Run once before any other ingestion scripts.
 """
 import sqlite3
+import sys
 from pathlib import Path
 
+# Allow running from any working directory
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.atlas_db import atlas_writer
+
 DB_PATH = Path(__file__).parent.parent / "data" / "atlas.sqlite"
 
 
@@ -24,6 +30,31 @@ def create_tables(conn: sqlite3.Connection) -> None:
         CREATE INDEX IF NOT EXISTS idx_concept_field ON concept_registry(semantic_field);
         CREATE INDEX IF NOT EXISTS idx_concept_clics ON concept_registry(clics_gloss);
 
+        -- Full-text index over concept_registry (external content, keyed by rowid)
+        CREATE VIRTUAL TABLE IF NOT EXISTS concept_registry_fts USING fts5(
+            label,
+            definition,
+            semantic_field,
+            content='concept_registry',
+            content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        );
+        CREATE TRIGGER IF NOT EXISTS concept_registry_fts_ai AFTER INSERT ON concept_registry BEGIN
+            INSERT INTO concept_registry_fts(rowid, label, definition, semantic_field)
+            VALUES (new.rowid, new.label, new.definition, new.semantic_field);
+        END;
+        CREATE TRIGGER IF NOT EXISTS concept_registry_fts_ad AFTER DELETE ON concept_registry BEGIN
+            INSERT INTO concept_registry_fts(concept_registry_fts, rowid, label, definition, semantic_field)
+            VALUES ('delete', old.rowid, old.label, old.definition, old.semantic_field);
+        END;
+        CREATE TRIGGER IF NOT EXISTS concept_registry_fts_au AFTER UPDATE OF label, definition, semantic_field ON concept_registry BEGIN
+            INSERT INTO concept_registry_fts(concept_registry_fts, rowid, label, definition, semantic_field)
+            VALUES ('delete', old.rowid, old.label, old.definition, old.semantic_field);
+            INSERT INTO concept_registry_fts(rowid, label, definition, semantic_field)
+            VALUES (new.rowid, new.label, new.definition, new.semantic_field);
+        END;
+
         -- Multilingual lexical anchors (from Open Multilingual Wordnet)
         CREATE TABLE IF NOT EXISTS omw_anchors (
             concepticon_id  TEXT NOT NULL,
@@ -65,13 +96,25 @@ def create_tables(conn: sqlite3.Connection) -> None:
             ingested_at TEXT DEFAULT (datetime('now'))
         );
     """)
+    rebuild_concept_search(conn)
     conn.commit()
     print(f"Database tables created at {DB_PATH}")
 
 
+def rebuild_concept_search(conn: sqlite3.Connection) -> None:
+    """
+    Re-index concept_registry_fts from concept_registry.
+
+    The triggers keep the index in sync for ordinary writes, but INSERT OR
+    REPLACE deletes the old row without firing DELETE triggers, so bulk
+    loaders call this afterwards (it also backfills databases created before
+    the FTS table existed).
+    """
+    conn.execute("INSERT INTO concept_registry_fts(concept_registry_fts) VALUES ('rebuild')")
+
+
 def main() -> None:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with sqlite3.connect(DB_PATH) as conn:
+    with atlas_writer(DB_PATH) as conn:
         create_tables(conn)
 
 
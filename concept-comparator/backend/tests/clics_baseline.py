@@ -0,0 +1,221 @@
+"""
+The networkx ClicsService and wofam parsing as they were before the
+compiled index and snapshot, kept as the reference the parity tests
+compare against. Logic is unchanged; logging is dropped.
+"""
+from typing import Dict, List, Optional, Set
+
+import networkx as nx
+import numpy as np
+
+from app.constants.clics_mappings import get_clics_codes
+
+
+def family_language_map(graph: nx.Graph) -> Dict[str, Set[str]]:
+    result: Dict[str, Set[str]] = {}
+    for _, _, data in graph.edges(data=True):
+        if "wofam" not in data:
+            continue
+        for entry in data["wofam"].split(";"):
+            if not entry:
+                continue
+            parts = entry.split("/")
+            if len(parts) >= 5:
+                family = parts[4].strip()
+                language = parts[3].strip()
+                if family and language:
+                    result.setdefault(family, set()).add(language)
+    return result
+
+
+def node_by_gloss(graph: nx.Graph, concept: str) -> Optional[str]:
+    for node, data in graph.nodes(data=True):
+        if data.get("Gloss") == concept or data.get("Gloss") == concept.upper():
+            return node
+    return None
+
+
+def language_colexifications(graph: nx.Graph, concept: str, language_code: str) -> List[tuple]:
+    """(neighbor gloss, present) pairs, as LanguageColexification fields."""
+    node_id = node_by_gloss(graph, concept)
+    if not node_id:
+        return []
+    clics_codes = get_clics_codes(language_code)
+    result = []
+    for neighbor in graph.neighbors(node_id):
+        edge = graph.get_edge_data(node_id, neighbor)
+        if edge and "wofam" in edge:
+            languages = set()
+            for entry in edge["wofam"].split(";"):
+                if entry:
+                    parts = entry.split("/")
+                    if len(parts) >= 4:
+                        languages.add(parts[3].strip())
+            result.append((graph.nodes[neighbor]["Gloss"], any(c in languages for c in clics_codes)))
+    return result
+
+
+def _family_langs_on_edge(wofam: str, family: str, family_langs: Set[str]) -> Set[str]:
+    langs = set()
+    for entry in wofam.split(";"):
+        if not entry:
+            continue
+        parts = entry.split("/")
+        if len(parts) >= 5:
+            if parts[4].strip() == family and parts[3].strip() in family_langs:
+                langs.add(parts[3].strip())
+    return langs
+
+
+def family_colexifications(
+    graph: nx.Graph, concept1: str, concept2: str, families: Optional[List[str]] = None
+) -> Dict[str, Dict]:
+    fam_map = family_language_map(graph)
+    node1 = node_by_gloss(graph, concept1)
+    node2 = node_by_gloss(graph, concept2)
+    if not node1 and not node2:
+        return {}
+
+    results = {}
+    for family in (families or fam_map.keys()):
+        family_langs = fam_map.get(family, set())
+        if not family_langs:
+            continue
+        results[family] = {
+            "concept1_colexifications": {},
+            "concept2_colexifications": {},
+            "direct_colexification": {"frequency": 0, "languages": []},
+            "total_languages": len(family_langs),
+        }
+        for key, node, other in (("concept1_colexifications", node1, node2),
+                                 ("concept2_colexifications", node2, node1)):
+            if not node:
+                continue
+            for neighbor in graph.neighbors(node):
+                if other and neighbor == other:
+                    continue
+                edge = graph.get_edge_data(node, neighbor)
+                if not edge or "wofam" not in edge:
+                    continue
+                neighbor_concept = graph.nodes[neighbor].get("Gloss")
+                if not neighbor_concept:
+                    continue
+                langs = _family_langs_on_edge(edge["wofam"], family, family_langs)
+                if langs:
+                    results[family][key][neighbor_concept] = {
+                        "frequency": len(langs), "languages": list(langs),
+                    }
+        if node1 and node2:
+            edge = graph.get_edge_data(node1, node2)
+            if edge and "wofam" in edge:
+                langs = _family_langs_on_edge(edge["wofam"], family, family_langs)
+                if langs:
+                    results[family]["direct_colexification"] = {
+                        "frequency": len(langs), "languages": list(langs),
+                    }
+    return results
+
+
+def edge_family_languages(edge_data: Dict, family: str) -> Set[str]:
+    """ClicsService._get_family_languages"""
+    languages = set()
+    for entry in edge_data.get("wofam", "").split(";"):
+        if not entry:
+            continue
+        parts = entry.split("/")
+        if len(parts) >= 5 and parts[4].strip() == family:
+            languages.add(parts[3].strip())
+    return languages
+
+
+def find_chains(graph: nx.Graph, concept1: str, concept2: str, family: str, max_depth: int = 4) -> List[Dict]:
+    fam_map = family_language_map(graph)
+    node1 = node_by_gloss(graph, concept1)
+    node2 = node_by_gloss(graph, concept2)
+    if not node1 or not node2:
+        return []
+    chains = []
+    for path in nx.all_simple_paths(graph, node1, node2, cutoff=max_depth):
+        scores = []
+        for a, b in zip(path, path[1:]):
+            edge = graph.get_edge_data(a, b)
+            if not edge or "wofam" not in edge:
+                break
+            langs = edge_family_languages(edge, family)
+            if not langs:
+                break
+            family_langs = fam_map.get(family, set())
+            scores.append(len(langs) / len(family_langs) if family_langs else 0)
+        else:
+            if scores:
+                chains.append({
+                    "path": [graph.nodes[n]["Gloss"] for n in path],
+                    "scores": scores,
+                    "total_score": np.exp(np.mean(np.log(scores))) if all(s > 0 for s in scores) else 0,
+                })
+    return chains
+
+
+def search_concepts(graph: nx.Graph, query: str) -> List[Dict]:
+    query = query.upper()
+    matches = []
+    for node, data in graph.nodes(data=True):
+        gloss = data.get("Gloss", "")
+        if gloss and query in gloss.upper():
+            matches.append({
+                "concept": gloss,
+                "semantic_field": data.get("Semanticfield", ""),
+                "category": data.get("Category", ""),
+                "family_frequency": data.get("FamilyFrequency", 0),
+                "language_frequency": data.get("LanguageFrequency", 0),
+                "word_frequency": data.get("WordFrequency", 0),
+                "frequency": sum(1 for edge in graph.edges(node, data=True) if edge[2].get("wofam")),
+            })
+    matches.sort(key=lambda x: x["frequency"], reverse=True)
+    return matches
+
+
+# ColexificationService helpers
+
+def parse_wofam_languages(wofam: str, filter_codes: List[str]) -> tuple:
+    clics_to_iso: Dict[str, str] = {}
+    for iso in filter_codes:
+        for clics_code in get_clics_codes(iso):
+            clics_to_iso[clics_code] = iso
+    matched_langs: List[str] = []
+    matched_families: List[str] = []
+    for entry in wofam.split(";"):
+        if not entry:
+            continue
+        parts = entry.split("/")
+        if len(parts) < 5:
+            continue
+        lang_code = parts[3].strip()
+        family = parts[4].strip()
+        if lang_code in clics_to_iso:
+            iso = clics_to_iso[lang_code]
+            if iso not in matched_langs:
+                matched_langs.append(iso)
+            if family and family not in matched_families:
+                matched_families.append(family)
+    return matched_langs, matched_families
+
+
+def parse_wofam_full(wofam: str) -> tuple:
+    family_to_langs: Dict[str, List[str]] = {}
+    all_langs: List[str] = []
+    for entry in wofam.split(";"):
+        if not entry.strip():
+            continue
+        parts = entry.strip().split("/")
+        if len(parts) < 5:
+            continue
+        lang_code = parts[3].strip()
+        family = parts[4].strip()
+        if lang_code and family:
+            if lang_code not in all_langs:
+                all_langs.append(lang_code)
+            fam_langs = family_to_langs.setdefault(family, [])
+            if lang_code not in fam_langs:
+                fam_langs.append(lang_code)
+    return all_langs, family_to_langs
@@ -0,0 +1,95 @@
+import random
+from pathlib import Path
+
+import networkx as nx
+import pytest
+
+# CLICS codes that clics_mappings maps to an ISO code, so language-level
+# queries have something to find. Family None: the entry has no family field.
+MAPPED_LANGUAGES = [
+    ("wold-13", "Indo-European"),         # eng
+    ("ids-190", "Indo-European"),         # eng
+    ("northeuralex-eng", "Indo-European"),
+    ("wold-135", "Indo-European"),        # deu
+    ("northeuralex-fra", "Indo-European"),
+    ("wold-22", "Sino-Tibetan"),          # zho
+    ("northeuralex-cmn", "Sino-Tibetan"),
+    ("wold-21", "Japonic"),               # jpn
+    ("northeuralex-jpn", ""),             # jpn, empty family field
+    ("wold-189", None),                   # kor, no family field
+]
+ISO_CODES = ["eng", "deu", "fra", "zho", "jpn", "kor", "xxx"]
+FAMILIES = ["Indo-European", "Sino-Tibetan", "Austronesian", "Uralic", "Japonic"]
+
+
+def build_network(seed: int = 7, n_nodes: int = 40, n_edges: int = 220) -> nx.Graph:
+    """
+    A small CLICS-like network. Besides ordinary entries, wofam strings
+    include the irregular shapes found in the real data: languages with an
+    empty family field or none at all, empty entries and repeated entries.
+    Some edges have no wofam. As in CLICS, a language's family field is the
+    same on every edge (it comes from the language's metadata).
+    """
+    rng = random.Random(seed)
+    glosses = ["HAND", "ARM", "SKY", "GOD", "TREE", "WOOD", "FIRE", "SUN",
+               "DAY", "MOON", "MONTH", "WATER", "RIVER", "Fingernail", "CLAW"]
+    glosses += [f"CONCEPT {i}" for i in range(n_nodes - len(glosses) - 1)]
+    glosses.append("WATER")  # shared gloss: the first node wins
+
+    languages = MAPPED_LANGUAGES + [(f"lang-{i}", rng.choice(FAMILIES)) for i in range(30)]
+    languages += [("lang-empty-1", ""), ("lang-empty-2", ""), ("lang-nofield", None)]
+
+    g = nx.Graph()
+    for i, gloss in enumerate(glosses):
+        g.add_node(
+            str(1000 + i),
+            Gloss=gloss,
+            Semanticfield=rng.choice(["Body", "Nature", "Time"]),
+            Category="Person/Thing",
+            FamilyFrequency=rng.randint(1, 50),
+            LanguageFrequency=rng.randint(1, 200),
+            WordFrequency=rng.randint(1, 300),
+        )
+    nodes = list(g.nodes)
+    hubs = nodes[:12]
+    while g.number_of_edges() < n_edges:
+        a = rng.choice(hubs) if rng.random() < 0.5 else rng.choice(nodes)
+        b = rng.choice(nodes)
+        if a == b or g.has_edge(a, b):
+            continue
+        if rng.random() < 0.08:
+            g.add_edge(a, b, FamilyWeight=1)
+            continue
+        entries = []
+        for lang, family in rng.sample(languages, rng.randint(1, 12)):
+            entry = f"ds{rng.randint(1, 9)}/{rng.randint(1, 999)}/glot{rng.randint(1, 99)}/{lang}"
+            entries.append(entry if family is None else f"{entry}/{family}")
+        if rng.random() < 0.2:
+            entries.append(entries[0])
+        if rng.random() < 0.1:
+            entries.append("")
+        g.add_edge(a, b, wofam=";".join(entries), FamilyWeight=3, LanguageWeight=len(entries))
+    return g
+
+
+@pytest.fixture(scope="session")
+def network_path(tmp_path_factory) -> Path:
+    path = tmp_path_factory.mktemp("clics") / "network-3-families.gml"
+    nx.write_gml(build_network(), str(path))
+    return path
+
+
+@pytest.fixture(scope="session")
+def baseline_graph(network_path) -> nx.Graph:
+    """The network as the networkx-based ClicsService used to load it."""
+    return nx.read_gml(str(network_path))
+
+
+@pytest.fixture(scope="session")
+def clics(network_path, tmp_path_factory):
+    from app.services.clics import ClicsService
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("CLICS_NETWORK_PATH", str(network_path))
+        mp.setenv("CLICS_SNAPSHOT_DIR", str(tmp_path_factory.mktemp("snapshots")))
+        yield ClicsService()
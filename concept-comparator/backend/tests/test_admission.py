@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+from starlette.requests import ClientDisconnect
+
+from app.services.admission import AdmissionController, AdmittedStreamingResponse, Overloaded
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+# ----------------------------------------------------------------------
+# Queueing
+# ----------------------------------------------------------------------
+
+def test_round_robin_across_clients():
+    async def scenario():
+        controller = AdmissionController("t", concurrency=1, max_queue=10, client_queue=5)
+        running = controller.enqueue("a")
+        queued = [controller.enqueue(c) for c in ("a", "a", "a", "b", "c")]
+        order = []
+        current = running
+        for _ in queued:
+            current.release()
+            current = next(t for t in queued if t.state == "running")
+            order.append(current.client)
+        current.release()
+        return order, controller.running
+
+    order, running = run(scenario())
+    assert order == ["a", "b", "c", "a", "a"]
+    assert running == 0
+
+
+def test_positions_follow_admission_order():
+    async def scenario():
+        controller = AdmissionController("t", concurrency=1, max_queue=10, client_queue=5)
+        controller.enqueue("a")
+        a2, a3, b = controller.enqueue("a"), controller.enqueue("a"), controller.enqueue("b")
+        return a2.position(), b.position(), a3.position()
+
+    assert run(scenario()) == (1, 2, 3)
+
+
+def test_rejects_with_429_then_503():
+    async def scenario():
+        controller = AdmissionController("t", concurrency=1, max_queue=3, client_queue=2)
+        controller.enqueue("a")
+        controller.enqueue("a")
+        controller.enqueue("a")
+        with pytest.raises(Overloaded) as per_client:
+            controller.enqueue("a")
+        controller.enqueue("b")
+        with pytest.raises(Overloaded) as full:
+            controller.enqueue("c")
+        return per_client.value, full.value, controller.rejected
+
+    per_client, full, rejected = run(scenario())
+    assert per_client.status_code == 429 and per_client.retry_after >= 1
+    assert full.status_code == 503 and full.retry_after >= 1
+    assert rejected == {429: 1, 503: 1}
+
+
+def test_release_is_idempotent_and_frees_queue_places():
+    async def scenario():
+        controller = AdmissionController("t", concurrency=1, max_queue=2, client_queue=2)
+        running = controller.enqueue("a")
+        queued = controller.enqueue("b")
+        queued.release()
+        queued.release()
+        running.release()
+        running.release()
+        return controller
+
+    controller = run(scenario())
+    assert controller.running == 0
+    assert controller.queued == 0
+    assert controller.abandoned == 1
+    assert controller.completed == 1
+
+
+def test_slot_waits_for_release():
+    async def scenario():
+        controller = AdmissionController("t", concurrency=1, max_queue=2)
+        first = controller.enqueue("a")
+        entered = asyncio.Event()
+
+        async def second():
+            async with controller.slot("b"):
+                entered.set()
+
+        task = asyncio.ensure_future(second())
+        await asyncio.sleep(0.05)
+        waited = not entered.is_set()
+        first.release()
+        await asyncio.wait_for(task, 1)
+        return waited, controller.running
+
+    assert run(scenario()) == (True, 0)
+
+
+# ----------------------------------------------------------------------
+# Streaming responses
+# ----------------------------------------------------------------------
+
+HTTP_SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0", "spec_version": "2.4"},
+    "http_version": "1.1",
+    "method": "GET",
+    "path": "/",
+    "headers": [],
+}
+
+
+async def _disconnected_before_first_chunk(ticket):
+    started = []
+
+    async def body():
+        started.append(True)
+        try:
+            yield "data: {}\n\n"
+        finally:
+            ticket.release()
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        raise OSError("client went away")
+
+    response = AdmittedStreamingResponse(body(), ticket, media_type="text/event-stream")
+    with pytest.raises(ClientDisconnect):
+        await response(HTTP_SCOPE, receive, send)
+    return started
+
+
+def test_streaming_response_releases_slot_if_body_never_starts():
+    async def scenario():
+        controller = AdmissionController("t", concurrency=1, max_queue=2)
+        ticket = controller.enqueue("a")
+        started = await _disconnected_before_first_chunk(ticket)
+        return started, controller.running, controller.enqueue("b").admitted
+
+    started, running, next_admitted = run(scenario())
+    assert started == []
+    assert running == 0
+    assert next_admitted
+
+
+def test_streaming_response_releases_queue_place_if_body_never_starts():
+    async def scenario():
+        controller = AdmissionController("t", concurrency=1, max_queue=1)
+        controller.enqueue("a")
+        queued = controller.enqueue("b")
+        await _disconnected_before_first_chunk(queued)
+        return controller.queued, controller.abandoned
+
+    assert run(scenario()) == (0, 1)
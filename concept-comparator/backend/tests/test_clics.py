@@ -0,0 +1,249 @@
+import numpy as np
+import pytest
+
+import clics_baseline as baseline
+from conftest import FAMILIES, ISO_CODES
+
+
+def _sorted_languages(results: dict) -> dict:
+    """Family colexification results with every `languages` list sorted."""
+    def fix(entry):
+        return {**entry, "languages": sorted(entry["languages"])}
+
+    return {
+        family: {
+            "concept1_colexifications": {k: fix(v) for k, v in data["concept1_colexifications"].items()},
+            "concept2_colexifications": {k: fix(v) for k, v in data["concept2_colexifications"].items()},
+            "direct_colexification": fix(data["direct_colexification"]),
+            "total_languages": data["total_languages"],
+        }
+        for family, data in results.items()
+    }
+
+
+def _wofam_edges(clics, baseline_graph):
+    """(wofam string, index edge ID) for every graph edge that has one."""
+    index = {node_id: i for i, node_id in enumerate(clics.snapshot.node_ids)}
+    for a, b, data in baseline_graph.edges(data=True):
+        if "wofam" in data:
+            yield data["wofam"], clics.get_edge_id(index[a], index[b])
+
+
+def _glosses(baseline_graph):
+    return list(dict.fromkeys(data["Gloss"] for _, data in baseline_graph.nodes(data=True)))
+
+
+# ----------------------------------------------------------------------
+# Wofam index and language bitsets
+# ----------------------------------------------------------------------
+
+def test_family_language_map_matches_baseline(clics, baseline_graph):
+    expected = baseline.family_language_map(baseline_graph)
+    assert set(clics.family_language_map) == set(expected)
+    for family, languages in expected.items():
+        assert clics.family_language_map[family] == languages
+        assert clics.family_language_map.size(family) == len(languages)
+
+
+def test_edge_languages_match_baseline(clics, baseline_graph):
+    bits = clics.language_bits
+    fam_map = baseline.family_language_map(baseline_graph)
+    checked = 0
+    for wofam, edge_id in _wofam_edges(clics, baseline_graph):
+        for family in FAMILIES:
+            expected = baseline.edge_family_languages({"wofam": wofam}, family)
+            assert clics.wofam_index.languages_for(edge_id, family) == expected
+            in_family = expected & fam_map.get(family, set())
+            mask = bits.family_mask(family)
+            assert sorted(bits.members(edge_id, mask)) == sorted(in_family)
+            assert bits.counts(np.array([edge_id]), mask)[0] == len(in_family)
+        checked += 1
+    assert checked > 100
+
+
+def test_wofam_index_entry_shapes():
+    from app.services.clics_index import FAMILY_FIELD_MISSING, NO_FAMILY, WofamIndex
+
+    index = WofamIndex.build([
+        "d/1/g/a/F;d/2/g/b/;d/3/g/c;;d/1/g/a/F;d/4/g//F",
+        None,
+    ])
+    assert len(index) == 2
+    langs, fams = index.entries(0)
+    assert [index.languages[i] for i in langs] == ["a", "b", "c"]
+    assert fams.tolist() == [index.family_ids["F"], NO_FAMILY, FAMILY_FIELD_MISSING]
+    assert index.family_languages(0) == {"F": ["a"]}
+    assert index.entries(1)[0].size == 0
+
+
+# ----------------------------------------------------------------------
+# ClicsService queries
+# ----------------------------------------------------------------------
+
+def test_gloss_lookup_matches_baseline(clics, baseline_graph):
+    node_ids = clics.snapshot.node_ids
+    for gloss in _glosses(baseline_graph) + ["hand", "Missing"]:
+        expected = baseline.node_by_gloss(baseline_graph, gloss)
+        found = clics.glosses.node(gloss)
+        assert (node_ids[found] if found is not None else None) == expected
+
+
+def test_gloss_lookup_is_case_insensitive(clics):
+    assert clics.glosses.node("FINGERNAIL") == clics.glosses.node("Fingernail")
+    assert clics.gloss(clics.glosses.node("fingernail")) == "Fingernail"
+    assert clics.glosses.node("") is None
+
+
+def test_gloss_maps_are_built_on_first_lookup():
+    from app.services.clics_index import GlossIndex
+
+    arrays = GlossIndex.build(["WATER", "", "Fingernail", "WATER"])
+    index = GlossIndex(*arrays.values())
+    assert index._maps is None
+    assert index.node("WATER") == 0
+    maps = index._maps
+    assert index.node("fingernail") == 2 and index.node("") is None
+    assert index._maps is maps
+    assert maps[0] == {"WATER": 0, "Fingernail": 2}
+
+
+def test_language_colexifications_match_baseline(clics, baseline_graph):
+    for gloss in _glosses(baseline_graph)[:15]:
+        for iso in ISO_CODES:
+            found = [(c.concept, c.present) for c in clics.get_language_colexifications(gloss, iso)]
+            assert found == baseline.language_colexifications(baseline_graph, gloss, iso)
+
+
+@pytest.mark.parametrize("families", [None, ["Indo-European"], ["Japonic", "Missing"]])
+def test_family_colexifications_match_baseline(clics, baseline_graph, families):
+    glosses = _glosses(baseline_graph)
+    pairs = [(a, b) for a in glosses[:6] for b in glosses[:6] if a != b] + [("HAND", "Missing")]
+    for concept1, concept2 in pairs:
+        found = clics.get_family_colexifications(concept1, concept2, families)
+        expected = baseline.family_colexifications(baseline_graph, concept1, concept2, families)
+        assert _sorted_languages(found) == _sorted_languages(expected)
+
+
+def test_search_matches_baseline(clics, baseline_graph):
+    for query in ["", "A", "on", "CONCEPT 1", "fingernail", "wat", "zzz"]:
+        assert clics.search_concepts(query) == baseline.search_concepts(baseline_graph, query)
+    assert clics.get_all_concepts() == baseline.search_concepts(baseline_graph, "")
+
+
+def test_search_page(clics):
+    rows, total = clics.search_concepts_page("CONCEPT", limit=5)
+    assert total == len(clics.search_concepts("CONCEPT"))
+    assert rows == clics.search_concepts("CONCEPT")[:5]
+
+
+# ----------------------------------------------------------------------
+# ConceptTable
+# ----------------------------------------------------------------------
+
+def test_concept_table_match_equals_substring_scan():
+    from app.services.clics_index import ConceptTable
+
+    glosses = ["HAND", "HANDLE", "Fingernail", "NAIL", "SHAND", "HA", "ANDHA", "H"]
+    rows = [{"concept": g, "frequency": len(glosses) - i} for i, g in enumerate(glosses)]
+    table = ConceptTable(rows)
+    queries = {g[i:j] for g in glosses for i in range(len(g)) for j in range(i + 1, len(g) + 1)}
+    queries |= {"", "xyz", "handlex", "nail", "ANDH"}
+    for query in sorted(queries):
+        expected = [r for r, g in enumerate(glosses) if query.upper() in g.upper()]
+        assert table.match(query).tolist() == expected, query
+
+
+def test_concept_table_pages():
+    import json
+
+    from app.services.clics_index import ConceptTable
+
+    table = ConceptTable([{"concept": f"C{i}", "frequency": 10 - i} for i in range(5)])
+    first = json.loads(table.page_payload(0, 2))
+    assert [row["concept"] for row in first["concepts"]] == ["C0", "C1"]
+    assert first["total"] == 5 and first["next_cursor"] == "2"
+    last = json.loads(table.page_payload(4, 2))
+    assert [row["concept"] for row in last["concepts"]] == ["C4"]
+    assert last["next_cursor"] is None
+    assert json.loads(table.page_payload(0, None))["concepts"] == table.rows
+
+
+# ----------------------------------------------------------------------
+# Chain search
+# ----------------------------------------------------------------------
+
+UNBOUNDED = dict(top_k=10 ** 6, max_expansions=10 ** 9, time_budget=10 ** 6)
+CHAIN_CASES = [("HAND", "ARM", "Indo-European"), ("SKY", "GOD", "Uralic"), ("TREE", "FIRE", "Japonic"),
+               ("DAY", "MONTH", "Austronesian"), ("WATER", "RIVER", "Sino-Tibetan")]
+
+
+def _chains(chains):
+    """Comparable form; paths are glosses, so two node paths can share a key (WATER)."""
+    return sorted(
+        (tuple(c["path"]), tuple(round(s, 9) for s in c["scores"]), round(float(c["total_score"]), 9))
+        for c in chains
+    )
+
+
+@pytest.mark.parametrize("concept1,concept2,family", CHAIN_CASES)
+@pytest.mark.parametrize("max_depth", [3, 4])
+def test_find_chains_finds_every_baseline_chain(clics, baseline_graph, concept1, concept2, family, max_depth):
+    found = clics.find_chains(concept1, concept2, family, max_depth, **UNBOUNDED)
+    expected = baseline.find_chains(baseline_graph, concept1, concept2, family, max_depth)
+    assert expected, "fixture should give every case some chains"
+    assert _chains(found) == _chains(expected)
+
+
+@pytest.mark.parametrize("concept1,concept2,family", CHAIN_CASES)
+def test_find_chains_best_first_and_top_k(clics, baseline_graph, concept1, concept2, family):
+    everything = clics.find_chains(concept1, concept2, family, 3, **UNBOUNDED)
+    totals = [c["total_score"] for c in everything]
+    assert totals == sorted(totals, reverse=True)
+
+    best = sorted((c["total_score"] for c in baseline.find_chains(baseline_graph, concept1, concept2, family, 3)),
+                  reverse=True)
+    top = clics.find_chains(concept1, concept2, family, 3, top_k=3)
+    assert len(top) == min(3, len(best))
+    assert [c["total_score"] for c in top] == pytest.approx(best[:len(top)])
+
+
+def test_find_chains_respects_budgets(clics):
+    assert clics.find_chains("HAND", "ARM", "Indo-European", 4, max_expansions=0) == []
+    assert clics.find_chains("HAND", "ARM", "Indo-European", 4, time_budget=-1) == []
+    bounded = clics.find_chains("HAND", "ARM", "Indo-European", 4, max_expansions=3)
+    unbounded = clics.find_chains("HAND", "ARM", "Indo-European", 4, **UNBOUNDED)
+    assert len(bounded) < len(unbounded)
+
+
+def test_find_chains_edge_cases(clics):
+    assert clics.find_chains("HAND", "Missing", "Indo-European") == []
+    assert clics.find_chains("HAND", "ARM", "Missing") == []
+    assert clics.find_chains("HAND", "HAND", "Indo-European") == []
+    assert clics.find_chains("HAND", "ARM", "Indo-European", max_depth=0) == []
+
+
+# ----------------------------------------------------------------------
+# ColexificationService wofam helpers
+# ----------------------------------------------------------------------
+
+@pytest.fixture
+def colexification(clics, tmp_path, monkeypatch):
+    from app.services import atlas_db
+    from app.services.colexification import ColexificationService
+
+    db = tmp_path / "atlas.sqlite"
+    db.touch()
+    monkeypatch.setattr(atlas_db, "DB_CANDIDATES", [db])
+    return ColexificationService(clics)
+
+
+def test_parse_wofam_languages_matches_baseline(colexification, clics, baseline_graph):
+    for wofam, edge_id in _wofam_edges(clics, baseline_graph):
+        for codes in (ISO_CODES, ["zho", "jpn"], ["deu"], []):
+            assert colexification._parse_wofam_languages(edge_id, codes) == \
+                baseline.parse_wofam_languages(wofam, codes)
+
+
+def test_parse_wofam_full_matches_baseline(colexification, clics, baseline_graph):
+    for wofam, edge_id in _wofam_edges(clics, baseline_graph):
+        assert colexification._parse_wofam_full(edge_id) == baseline.parse_wofam_full(wofam)
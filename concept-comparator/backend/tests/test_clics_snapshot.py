@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from app.services.clics_snapshot import ClicsSnapshot, load_or_compile_snapshot
+
+
+def arrays_equal(a: ClicsSnapshot, b: ClicsSnapshot) -> bool:
+    return a.arrays.keys() == b.arrays.keys() and all(
+        np.array_equal(a.arrays[name], b.arrays[name]) for name in a.arrays
+    )
+
+
+@pytest.fixture
+def saved(network_path, tmp_path):
+    """A saved snapshot, read into memory so damaging its files leaves it intact."""
+    directory = load_or_compile_snapshot(network_path, tmp_path).directory
+    return ClicsSnapshot.load(directory, mmap=False), directory
+
+
+def test_round_trip_and_reuse(network_path, tmp_path, saved):
+    snapshot, directory = saved
+    assert directory.parent == tmp_path
+    again = load_or_compile_snapshot(network_path, tmp_path)
+    assert again.directory == directory
+    assert isinstance(again.indptr, np.memmap)
+    assert arrays_equal(snapshot, again)
+    assert again.node_attrs == snapshot.node_attrs
+    assert again.meta == snapshot.meta
+
+
+@pytest.mark.parametrize("damage", ["garbage_array", "missing_array", "missing_nodes", "bad_meta"])
+def test_unreadable_snapshot_is_recompiled(network_path, tmp_path, saved, damage):
+    snapshot, directory = saved
+    if damage == "garbage_array":
+        (directory / "indptr.npy").write_bytes(b"not an array")
+    elif damage == "missing_array":
+        (directory / "edge_language_bits.npy").unlink()
+    elif damage == "missing_nodes":
+        (directory / "nodes.json").unlink()
+    else:
+        (directory / "meta.json").write_text("{")
+
+    recovered = load_or_compile_snapshot(network_path, tmp_path)
+    assert recovered.directory == directory
+    assert arrays_equal(snapshot, recovered)
+    assert [p.name for p in tmp_path.iterdir()] == [directory.name]
+
+
+def test_directory_without_meta_is_replaced(network_path, tmp_path, saved):
+    snapshot, directory = saved
+    (directory / "meta.json").unlink()
+    recovered = load_or_compile_snapshot(network_path, tmp_path)
+    assert (directory / "meta.json").is_file()
+    assert arrays_equal(snapshot, recovered)
+
+
+def test_changed_source_gets_a_new_snapshot(network_path, tmp_path, saved):
+    _, directory = saved
+    changed = tmp_path / "changed.gml"
+    changed.write_text(network_path.read_text().replace('"HAND"', '"PALM"', 1))
+    other = load_or_compile_snapshot(changed, tmp_path)
+    assert other.directory != directory
+    assert other.glosses.node("PALM") is not None
@@ -0,0 +1,91 @@
+import pytest
+
+from app.services import atlas_db
+from app.services.atlas_db import atlas_writer
+from app.services.concept_registry import ConceptRegistryService, _fts_query
+from scripts.setup_database import create_tables
+
+CONCEPTS = [
+    # concepticon_id, label, definition, semantic_field, clics_gloss
+    ("1", "HAND", "The part of the arm below the wrist.", "The body", "HAND"),
+    ("2", "HANDLE", "The part of a tool that is held.", "Basic actions and technology", None),
+    ("3", "LEFT HAND", "The hand on the left side of the body.", "The body", None),
+    ("4", "ARM", "The upper limb from shoulder to hand.", "The body", "ARM"),
+    ("5", "SHORTHAND", "A system of rapid writing.", "Cognition", None),
+    ("6", "HANDSOME", "Good-looking.", "Emotions and values", "HANDSOME"),
+    ("7", "HANDFUL", "A quantity that fills the hand.", "Quantity", None),
+    ("8", "CAFÉ", "A small restaurant.", "Food and drink", None),
+]
+
+
+def build_atlas(path, fts: bool = True):
+    with atlas_writer(path) as conn:
+        create_tables(conn)
+        if not fts:
+            conn.execute("DROP TABLE concept_registry_fts")
+            for suffix in ("ai", "ad", "au"):
+                conn.execute(f"DROP TRIGGER concept_registry_fts_{suffix}")
+        conn.executemany(
+            "INSERT INTO concept_registry (concepticon_id, label, definition, semantic_field, clics_gloss) "
+            "VALUES (?, ?, ?, ?, ?)",
+            CONCEPTS,
+        )
+
+
+@pytest.fixture(params=[True, False], ids=["fts", "like"])
+def registry(request, tmp_path, monkeypatch):
+    path = tmp_path / "atlas.sqlite"
+    build_atlas(path, fts=request.param)
+    monkeypatch.setattr(atlas_db, "DB_CANDIDATES", [path])
+    service = ConceptRegistryService()
+    assert service._has_fts is request.param
+    return service
+
+
+def labels(anchors):
+    return [a.label for a in anchors]
+
+
+def test_fts_query():
+    assert _fts_query("LEFT HA") == '"LEFT" "HA"*'
+    assert _fts_query("  hand, ") == '"hand"*'
+    assert _fts_query("-- ") is None
+
+
+def test_exact_then_prefix_then_other_label_matches(registry):
+    found = labels(registry.search("hand"))
+    assert found[0] == "HAND"
+    # Prefix matches next, CLICS-linked first under LIKE; any order under BM25
+    assert set(found[1:4]) == {"HANDLE", "HANDSOME", "HANDFUL"}
+    assert registry.search("hand", limit=2)[0].label == "HAND"
+    assert len(registry.search("hand", limit=2)) == 2
+
+
+def test_fts_searches_every_token_and_definitions(registry):
+    assert labels(registry.search("left ha")) == ["LEFT HAND"]
+    if not registry._has_fts:
+        return
+    # Definitions and semantic fields are indexed too
+    assert "SHORTHAND" in labels(registry.search("rapid writing"))
+    assert set(labels(registry.search("restaurant"))) == {"CAFÉ"}
+    # Diacritics are folded
+    assert labels(registry.search("cafe")) == ["CAFÉ"]
+
+
+def test_like_fallback_finds_substrings(registry):
+    found = labels(registry.search("HAND", limit=20))
+    if registry._has_fts:
+        # FTS matches whole tokens by prefix, not inside words
+        assert "SHORTHAND" not in found
+    else:
+        assert found[-1] == "SHORTHAND"
+        assert labels(registry.search("restaurant")) == []
+
+
+def test_fts_errors_fall_back_to_like(registry, monkeypatch):
+    monkeypatch.setattr("app.services.concept_registry._fts_query", lambda q: "AND AND")
+    assert labels(registry.search("hand"))[0] == "HAND"
+
+
+def test_punctuation_only_query(registry):
+    assert registry.search("!!!") == []
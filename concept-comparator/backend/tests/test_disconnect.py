@@ -0,0 +1,47 @@
+import asyncio
+import json
+import threading
+
+from app.services.disconnect import CancelledWorkLog
+
+
+def test_record_counts_and_appends_lines_in_order(tmp_path):
+    log = CancelledWorkLog(tmp_path / "logs" / "cancelled.jsonl")
+    log.record("compare", "disconnected", processed=1, unfinished_languages=["deu", "fra"])
+    log.record("study", "closed", step="Translating")
+    log.close()
+    assert log.stats() == {
+        "streams": {"compare": 1, "study": 1},
+        "reasons": {"disconnected": 1, "closed": 1},
+        "languages_skipped": 2,
+    }
+    lines = [json.loads(line) for line in log.path.read_text().splitlines()]
+    assert [(e["stream"], e["reason"]) for e in lines] == [("compare", "disconnected"), ("study", "closed")]
+    assert lines[0]["unfinished_languages"] == ["deu", "fra"]
+
+
+def test_record_does_not_wait_for_the_file(tmp_path, monkeypatch):
+    log = CancelledWorkLog(tmp_path / "cancelled.jsonl")
+    release = threading.Event()
+    append = log._append
+    monkeypatch.setattr(log, "_append", lambda line: (release.wait(5), append(line)))
+
+    async def on_loop():
+        log.record("compare", "closed")
+        return log.stats()
+
+    assert asyncio.run(on_loop())["streams"] == {"compare": 1}
+    assert not log.path.exists()
+    release.set()
+    log.close()
+    assert len(log.path.read_text().splitlines()) == 1
+
+
+def test_write_failures_only_log(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    log = CancelledWorkLog(blocker / "cancelled.jsonl")
+    log.record("compare", "closed")
+    log.close()
+    log.record("compare", "closed")  # after close: counted, not written
+    assert log.stats()["streams"] == {"compare": 2}
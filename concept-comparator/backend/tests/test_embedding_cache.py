@@ -0,0 +1,99 @@
+import numpy as np
+
+from app.services.embedding_cache import EmbeddingCache, MemoryLRU
+
+DIM = 8
+
+
+def vectors(*prompts):
+    return {p: np.random.default_rng(len(p)).standard_normal(DIM).astype(np.float32) for p in prompts}
+
+
+def counters(cache):
+    stats = cache.stats()
+    return stats["memory_hits"], stats["disk_hits"], stats["misses"]
+
+
+def test_memory_then_disk_then_miss(tmp_path):
+    cache = EmbeddingCache("model", DIM, root=tmp_path)
+    stored = vectors("a", "bb")
+    cache.put_many(stored)
+
+    found = cache.get_many(["a", "bb", "ccc"])
+    assert set(found) == {"a", "bb"}
+    assert np.array_equal(found["a"], stored["a"])
+    assert counters(cache) == (2, 0, 1)
+
+    # A new process sees the disk tier; vectors come back as float16 precision
+    reopened = EmbeddingCache("model", DIM, root=tmp_path)
+    found = reopened.get_many(["a", "bb", "ccc", "a"])
+    assert set(found) == {"a", "bb"}
+    assert found["a"].dtype == np.float32
+    np.testing.assert_allclose(found["a"], stored["a"], rtol=1e-3, atol=1e-3)
+    assert counters(reopened) == (0, 2, 1)
+
+    # Disk hits are promoted to memory
+    reopened.get_many(["a"])
+    assert counters(reopened) == (1, 2, 1)
+
+
+def test_models_and_dimensions_do_not_collide(tmp_path):
+    EmbeddingCache("model-a", DIM, root=tmp_path).put_many(vectors("a"))
+    assert EmbeddingCache("model-b", DIM, root=tmp_path).get_many(["a"]) == {}
+    assert EmbeddingCache("model-a", DIM * 2, root=tmp_path).get_many(["a"]) == {}
+    assert set(EmbeddingCache("model-a", DIM, root=tmp_path).get_many(["a"])) == {"a"}
+
+
+def test_rewriting_a_prompt_keeps_one_row(tmp_path):
+    cache = EmbeddingCache("model", DIM, root=tmp_path)
+    cache.put_many(vectors("a", "bb"))
+    cache.put_many(vectors("bb", "ccc"))
+    assert len(cache.disk) == 3
+    reopened = EmbeddingCache("model", DIM, root=tmp_path)
+    assert set(reopened.get_many(["a", "bb", "ccc"])) == {"a", "bb", "ccc"}
+
+
+def test_store_grows_past_one_block(tmp_path):
+    cache = EmbeddingCache("model", DIM, root=tmp_path, memory_bytes=0)
+    # float16 holds integers exactly up to 2048
+    stored = {f"p{i}": np.full(DIM, i % 2048, dtype=np.float32) for i in range(5000)}
+    cache.put_many(stored)
+    found = cache.get_many(["p0", "p4999"])
+    assert found["p0"][0] == 0 and found["p4999"][0] == 4999 % 2048
+    assert counters(cache) == (0, 2, 0)
+
+
+def test_memory_only(tmp_path):
+    cache = EmbeddingCache("model", DIM, root=tmp_path, disk=False)
+    cache.put_many(vectors("a"))
+    assert set(cache.get_many(["a", "bb"])) == {"a"}
+    assert not any(tmp_path.iterdir())
+
+
+def test_memory_lru_is_bounded_by_bytes():
+    lru = MemoryLRU(max_bytes=3 * DIM * 4)
+    for prompt, vec in vectors("a", "bb", "ccc").items():
+        lru.put(prompt, vec)
+    lru.get("a")  # now most recently used
+    lru.put("dddd", np.zeros(DIM, dtype=np.float32))
+    assert lru.get("bb") is None
+    assert lru.get("a") is not None
+    assert len(lru) == 3 and lru.nbytes == 3 * DIM * 4
+    lru.put("huge", np.zeros(DIM * 4, dtype=np.float32))
+    assert lru.get("huge") is None
+
+
+def test_disk_io_never_holds_the_memory_lock(tmp_path):
+    cache = EmbeddingCache("model", DIM, root=tmp_path, memory_bytes=0)
+    disk_get, disk_put = cache.disk.get_many, cache.disk.put_many
+
+    def unlocked(method):
+        def wrapper(*args):
+            assert not cache._lock.locked()
+            return method(*args)
+        return wrapper
+
+    cache.disk.get_many, cache.disk.put_many = unlocked(disk_get), unlocked(disk_put)
+    cache.put_many(vectors("a"))
+    assert set(cache.get_many(["a", "bb"])) == {"a"}
+    assert counters(cache) == (0, 1, 1)
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.models.schemas import ConceptAnchor
+from app.services import atlas_db, graph_worker
+from app.services.colexification import ColexificationService
+from app.services.executor import IO, ExecutionLayer
+
+ANCHORS = [
+    ConceptAnchor(concepticon_id=str(i), label=gloss, clics_gloss=gloss)
+    for i, gloss in enumerate(["HAND", "ARM", "SKY", "GOD"])
+]
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    monkeypatch.setenv("EXECUTOR_GRAPH_PROCESSES", "0")
+    layer = ExecutionLayer()
+    yield layer
+    layer.shutdown()
+
+
+# ----------------------------------------------------------------------
+# Graph jobs
+# ----------------------------------------------------------------------
+
+def test_study_graph_jobs_match_the_service(executor, clics, tmp_path, monkeypatch):
+    db = tmp_path / "atlas.sqlite"
+    db.touch()
+    monkeypatch.setattr(atlas_db, "DB_CANDIDATES", [db])
+    executor.start_graph_workers(clics)
+    colex = ColexificationService(clics)
+
+    async def scenario():
+        profiles = await executor.graph("family_profiles", ANCHORS, [])
+        partitions = await executor.graph("language_partitions", ANCHORS, [], profiles)
+        return profiles, partitions
+
+    profiles, partitions = asyncio.run(scenario())
+    assert profiles == colex.compute_family_profiles_full(ANCHORS, [])
+    assert partitions == colex.compute_language_partitions_from_profiles(ANCHORS, [], profiles)
+    assert partitions
+    assert executor.stats()["graph"]["completed"] == 2
+    graph_worker.bind(None)
+
+
+# ----------------------------------------------------------------------
+# Limits
+# ----------------------------------------------------------------------
+
+@pytest.fixture
+def one_io_thread(monkeypatch):
+    monkeypatch.setenv("EXECUTOR_IO_THREADS", "1")
+    layer = ExecutionLayer()
+    release = threading.Event()
+    yield layer, release
+    release.set()
+    layer.shutdown()
+
+
+def test_a_cancelled_caller_keeps_the_slot_until_the_job_ends(one_io_thread):
+    layer, release = one_io_thread
+    started = []
+
+    def job(name):
+        started.append(name)
+        release.wait(5)
+        return name
+
+    async def scenario():
+        first = asyncio.ensure_future(layer.run(IO, job, "first"))
+        while not started:
+            await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        second = asyncio.ensure_future(layer.run(IO, job, "second"))
+        await asyncio.sleep(0.05)
+        during = layer.stats()[IO], list(started)
+        release.set()
+        return during, await second
+
+    (io, started_then), result = asyncio.run(scenario())
+    # The abandoned job still ran alone; the next one waited for its slot
+    assert started_then == ["first"]
+    assert (io["running"], io["queued"]) == (1, 1)
+    assert result == "second"
+    stats = layer.stats()[IO]
+    assert (stats["running"], stats["completed"]) == (0, 2)
+
+
+def test_a_queued_job_is_dropped_when_its_caller_is_cancelled(one_io_thread):
+    layer, release = one_io_thread
+    ran = []
+
+    async def scenario():
+        blocker = asyncio.ensure_future(layer.run(IO, release.wait, 5))
+        await asyncio.sleep(0.01)
+        waiting = asyncio.ensure_future(layer.run(IO, ran.append, "queued"))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        release.set()
+        await blocker
+        return waiting.cancelled()
+
+    assert asyncio.run(scenario())
+    assert ran == []
+    stats = layer.stats()[IO]
+    assert (stats["running"], stats["queued"], stats["completed"]) == (0, 0, 1)
@@ -0,0 +1,133 @@
+import asyncio
+import base64
+import gzip
+import json
+
+import numpy as np
+import pytest
+
+from app.models.schemas import ComparisonResult
+from app.services.response_encoding import (
+    CompressionMiddleware,
+    _negotiate,
+    compact_comparison,
+    dumps,
+    encode_embedding,
+)
+
+DIM = 768
+PATTERN = {
+    "concept1_colexifications": {"FINGER": {"frequency": 3, "languages": ["deu", "eng"]}},
+    "concept2_colexifications": {},
+    "direct_colexification": {"frequency": 1, "languages": ["deu"]},
+    "total_languages": 5,
+}
+
+
+def result(lang: str) -> ComparisonResult:
+    rng = np.random.default_rng(len(lang))
+    return ComparisonResult(
+        main_similarity=0.42,
+        main_translations=(f"hand-{lang}", f"arm-{lang}"),
+        embeddings=(rng.standard_normal(DIM).tolist(), rng.standard_normal(DIM).tolist()),
+        variation_similarities=[{"variation": "x", "similarity": 0.1}],
+        usage_notes={"concept1": "", "concept2": "note"},
+        language_colexifications={"concept1": [{"concept": "FINGER", "present": True}]},
+        family_colexifications={},
+    )
+
+
+def decode_f16(encoded: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(encoded), dtype="<f2").astype(np.float32)
+
+
+def test_encode_embedding():
+    vector = np.random.default_rng(0).standard_normal(DIM).tolist()
+    encoded = encode_embedding(vector, "f16")
+    assert len(base64.b64decode(encoded)) == DIM * 2
+    np.testing.assert_allclose(decode_f16(encoded), vector, rtol=1e-3, atol=1e-3)
+    assert encode_embedding(vector, "float") == vector
+
+
+@pytest.mark.parametrize("embeddings", ["none", "f16", "float"])
+def test_compact_comparison_expands_to_the_full_format(embeddings):
+    results = {"deu": result("deu"), "eng": result("eng"), "xxx": result("xxx")}
+    families = {"Indo-European": PATTERN}
+    has_family = {"deu": True, "eng": True, "xxx": False}
+    compact = json.loads(dumps(compact_comparison(results, families, has_family, embeddings)))
+    assert compact["format"] == "compact" and compact["embeddings"] == embeddings
+
+    # Re-expand the way a client would and compare with the full response
+    for lang, entry in compact["results"].items():
+        full = results[lang].model_dump(mode="json")
+        full["family_colexifications"] = families if has_family[lang] else {}
+        assert entry.pop("has_family") is has_family[lang]
+        vectors = entry.pop("embeddings", None)
+        expected_vectors = full.pop("embeddings")
+        if embeddings == "none":
+            assert vectors is None
+        elif embeddings == "float":
+            assert vectors == expected_vectors
+        else:
+            for encoded, expected in zip(vectors, expected_vectors):
+                np.testing.assert_allclose(decode_f16(encoded), expected, rtol=1e-3, atol=1e-3)
+        entry["family_colexifications"] = compact["family_colexifications"] if has_family[lang] else {}
+        assert entry == full
+
+
+def test_dumps_handles_numpy():
+    assert json.loads(dumps({"a": np.arange(3), "b": np.float32(0.5), "c": "é"})) == {
+        "a": [0, 1, 2], "b": 0.5, "c": "é",
+    }
+
+
+def test_negotiate():
+    assert _negotiate("gzip, deflate") == "gzip"
+    assert _negotiate("gzip;q=0") is None
+    assert _negotiate("identity") is None
+
+
+# ----------------------------------------------------------------------
+# Compression middleware
+# ----------------------------------------------------------------------
+
+def respond(body: bytes, content_type: str = "application/json", more_body: bool = False):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", content_type.encode())]})
+        await send({"type": "http.response.body", "body": body, "more_body": more_body})
+        if more_body:
+            await send({"type": "http.response.body", "body": b""})
+    return app
+
+
+def call(app, accept: str = "gzip"):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept.encode())]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=100)(scope, None, send))
+    headers = dict(messages[0]["headers"])
+    return headers, b"".join(m.get("body", b"") for m in messages[1:])
+
+
+def test_large_responses_are_compressed():
+    body = dumps({"x": list(range(200))})
+    headers, sent = call(respond(body))
+    assert headers[b"content-encoding"] == b"gzip"
+    assert int(headers[b"content-length"]) == len(sent)
+    assert gzip.decompress(sent) == body
+
+
+@pytest.mark.parametrize("app,accept", [
+    (respond(b"{}"), "gzip"),                                       # too small
+    (respond(b"x" * 500), "identity"),                              # not accepted
+    (respond(b"data: x\n\n" * 100, "text/event-stream"), "gzip"),   # SSE
+    (respond(b"x" * 500, more_body=True), "gzip"),                  # streamed
+])
+def test_other_responses_pass_through(app, accept):
+    headers, sent = call(app, accept)
+    assert b"content-encoding" not in headers
+    assert not sent.startswith(b"\x1f\x8b")
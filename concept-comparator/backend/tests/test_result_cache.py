@@ -0,0 +1,113 @@
+import sqlite3
+
+from app.models.schemas import ComparisonRequest, ComparisonResult
+from app.services import result_cache
+from app.services.result_cache import ResultCache, family_key, language_key
+
+REQUEST = ComparisonRequest(concept1="HAND", sense_id1="h1", concept2="ARM", sense_id2="a1",
+                            languages=["deu", "fra"])
+FINGERPRINT = {
+    "translation_model": "gpt-4o-mini",
+    "embedding_model": "labse",
+    "clics": "abc",
+    "dataset_versions": {"concepticon": "3.4.0"},
+}
+
+
+def result(similarity: float = 0.5) -> ComparisonResult:
+    return ComparisonResult(
+        main_similarity=similarity,
+        main_translations=("Hand", "Arm"),
+        embeddings=([0.1, 0.2], [0.3, 0.4]),
+        variation_similarities=[],
+        usage_notes={"concept1": "", "concept2": ""},
+        language_colexifications={},
+        family_colexifications={},
+    )
+
+
+# ----------------------------------------------------------------------
+# Keys
+# ----------------------------------------------------------------------
+
+def test_language_key_covers_everything_the_result_depends_on():
+    key = language_key(REQUEST, "deu", FINGERPRINT)
+    assert key == language_key(REQUEST, "deu", dict(reversed(list(FINGERPRINT.items()))))
+    # The requested language set is not part of a language's key
+    assert key == language_key(REQUEST.model_copy(update={"languages": ["deu"]}), "deu", FINGERPRINT)
+
+    variants = [
+        language_key(REQUEST, "fra", FINGERPRINT),
+        language_key(REQUEST.model_copy(update={"concept1": "FOOT"}), "deu", FINGERPRINT),
+        language_key(REQUEST.model_copy(update={"sense_id1": "h2"}), "deu", FINGERPRINT),
+        language_key(REQUEST.model_copy(update={"concept2": "LEG"}), "deu", FINGERPRINT),
+        language_key(REQUEST.model_copy(update={"sense_id2": "a2"}), "deu", FINGERPRINT),
+    ]
+    for field, value in [("translation_model", "other"), ("embedding_model", "other"),
+                         ("clics", "def"), ("dataset_versions", {"concepticon": "3.5.0"})]:
+        variants.append(language_key(REQUEST, "deu", {**FINGERPRINT, field: value}))
+    assert len({key, *variants}) == len(variants) + 1
+
+
+def test_family_key_ignores_order_and_models():
+    key = family_key(REQUEST, {"Uralic", "Indo-European"}, FINGERPRINT)
+    assert key == family_key(REQUEST, ["Indo-European", "Uralic"], FINGERPRINT)
+    assert key == family_key(REQUEST, ["Uralic", "Indo-European"],
+                             {**FINGERPRINT, "translation_model": "other", "embedding_model": "other"})
+    assert key == family_key(REQUEST.model_copy(update={"sense_id1": "h2"}), ["Uralic", "Indo-European"],
+                             FINGERPRINT)
+    assert key != family_key(REQUEST, ["Indo-European"], FINGERPRINT)
+    assert key != family_key(REQUEST, ["Uralic", "Indo-European"], {**FINGERPRINT, "clics": "def"})
+    assert key != language_key(REQUEST, "deu", FINGERPRINT)
+
+
+# ----------------------------------------------------------------------
+# Tiers
+# ----------------------------------------------------------------------
+
+def test_results_round_trip_through_memory_and_disk(tmp_path):
+    path = tmp_path / "results.sqlite"
+    keys = {lang: language_key(REQUEST, lang, FINGERPRINT) for lang in ("deu", "fra")}
+    cache = ResultCache(path=path)
+    cache.put_results({keys["deu"]: result(0.7)})
+    assert cache.get_results(keys) == {"deu": result(0.7)}
+
+    reopened = ResultCache(path=path)
+    assert reopened.get_results(keys) == {"deu": result(0.7)}
+    assert reopened.get_results(keys) == {"deu": result(0.7)}
+    stats = reopened.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 2)
+
+
+def test_family_patterns_round_trip(tmp_path):
+    path = tmp_path / "results.sqlite"
+    patterns = {"Uralic": {"total_languages": 3, "concept1_colexifications": {}}}
+    key = family_key(REQUEST, ["Uralic"], FINGERPRINT)
+    ResultCache(path=path).put_families(key, patterns)
+    assert ResultCache(path=path).get_families(key) == patterns
+    assert ResultCache(path=path).get_families("other") is None
+
+
+def test_memory_is_an_lru():
+    cache = ResultCache(max_entries=2)
+    cache.put_results({"a": result(0.1), "b": result(0.2)})
+    cache.get_results({"a": "a"})
+    cache.put_results({"c": result(0.3)})
+    assert set(cache.get_results({"a": "a", "b": "b", "c": "c"})) == {"a", "c"}
+
+
+def test_schema_change_discards_the_store(tmp_path, monkeypatch):
+    path = tmp_path / "results.sqlite"
+    ResultCache(path=path).put_results({"a": result()})
+    monkeypatch.setattr(result_cache, "SCHEMA_VERSION", result_cache.SCHEMA_VERSION + 1)
+    assert ResultCache(path=path).get_results({"a": "a"}) == {}
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == result_cache.SCHEMA_VERSION
+
+
+def test_unreadable_entries_are_misses(tmp_path):
+    path = tmp_path / "results.sqlite"
+    ResultCache(path=path).put_results({"a": result()})
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE results SET payload = '{}'")
+    assert ResultCache(path=path).get_results({"a": "a"}) == {}
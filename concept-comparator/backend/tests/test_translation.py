@@ -0,0 +1,226 @@
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.schemas import Translation
+from app.services.executor import ExecutionLayer
+from app.services.translation import TranslationService
+from app.services.translation_cache import TranslationCache
+
+
+class FakeCompletions:
+    """Stands in for AsyncOpenAI's chat.completions; answers after `delay` seconds."""
+
+    def __init__(self, delay: float = 0.05) -> None:
+        self.delay = delay
+        self.calls = []   # target languages of each request
+        self.cancelled = 0
+
+    async def create(self, **kwargs):
+        prompt = kwargs["messages"][1]["content"]
+        batch = re.search(r"each of these languages: (.*)\.\n", prompt)
+        langs = batch.group(1).split(", ") if batch else [re.search(r"word into (.*), noting", prompt).group(1)]
+        self.calls.append(langs)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        entries = {lang: {"main_translation": f"word-{lang}", "variations": [], "usage_notes": ""}
+                   for lang in langs}
+        content = json.dumps({"translations": entries} if batch else entries[langs[0]])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture(params=["inline", "executor"])
+def make_service(request, tmp_path, monkeypatch):
+    monkeypatch.setenv("TRANSLATION_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("TRANSLATION_MODEL", "test-model")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+    monkeypatch.delenv("TRANSLATION_BATCH_SIZE", raising=False)
+    executors = []
+
+    def make(batch_size: str = "1", delay: float = 0.05):
+        monkeypatch.setenv("TRANSLATION_BATCH_SIZE", batch_size)
+        executor = ExecutionLayer() if request.param == "executor" else None
+        if executor is not None:
+            executors.append(executor)
+        service = TranslationService(executor=executor)
+        service.fake = FakeCompletions(delay)
+        service.async_client = SimpleNamespace(chat=SimpleNamespace(completions=service.fake))
+        return service
+
+    yield make
+    for executor in executors:
+        executor.shutdown()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def counters(service):
+    stats = service.cache.stats()
+    return {k: stats[k] for k in ("memory_hits", "disk_hits", "misses", "coalesced", "cancelled")}
+
+
+# ----------------------------------------------------------------------
+# Single flight
+# ----------------------------------------------------------------------
+
+def test_concurrent_calls_share_one_request(make_service):
+    service = make_service()
+
+    async def scenario():
+        results = await asyncio.gather(*(service.translate("HAND", "s", "German") for _ in range(5)))
+        again = await service.translate("HAND", "s", "German")
+        return results, again
+
+    results, again = run(scenario())
+    assert service.fake.calls == [["German"]]
+    assert {r.main_translation for r in results} == {"word-German"}
+    assert again == results[0]
+    assert counters(service) == {"memory_hits": 1, "disk_hits": 0, "misses": 1, "coalesced": 4, "cancelled": 0}
+
+
+def test_disk_tier_is_shared_across_instances(make_service):
+    first = make_service()
+    run(first.translate("HAND", "s", "German"))
+    second = make_service()
+
+    async def scenario():
+        return await asyncio.gather(*(second.translate("HAND", "s", "German") for _ in range(3)))
+
+    results = run(scenario())
+    assert second.fake.calls == []
+    assert {r.main_translation for r in results} == {"word-German"}
+    assert counters(second)["disk_hits"] == 1
+    assert counters(second)["misses"] == 0
+
+
+def test_store_io_never_holds_the_memory_lock(tmp_path):
+    cache = TranslationCache(path=tmp_path / "translations.sqlite")
+    store_get, store_put_many = cache.store.get, cache.store.put_many
+
+    def unlocked(method):
+        def wrapper(*args):
+            assert not cache._lock.locked()
+            return method(*args)
+        return wrapper
+
+    cache.store.get, cache.store.put_many = unlocked(store_get), unlocked(store_put_many)
+    key = ("test-model", "HAND", "s", "German")
+    translation = Translation(main_translation="Hand", variations=[], usage_notes="")
+    cache.put(key, translation)
+    cache.memory.clear()
+    assert cache.missing([key, (*key[:3], "French")]) == {(*key[:3], "French")}
+    cache.memory.clear()
+    assert cache.get(key) == translation
+    assert cache.get((*key[:3], "French")) is None
+
+
+# ----------------------------------------------------------------------
+# Batch prefetch
+# ----------------------------------------------------------------------
+
+LANGS = ["German", "French", "Dutch", "Polish"]
+
+
+def test_prefetch_batches_languages_and_translate_joins(make_service):
+    service = make_service(batch_size="3")
+
+    async def scenario():
+        started = await service.prefetch("HAND", "s", LANGS)
+        results = await asyncio.gather(*(service.translate("HAND", "s", lang) for lang in LANGS))
+        return started, results
+
+    started, results = run(scenario())
+    # Groups of three; the single language left over is translated on its own
+    assert len(started) == 3
+    assert sorted(map(sorted, service.fake.calls)) == [["Dutch", "French", "German"], ["Polish"]]
+    assert [r.main_translation for r in results] == [f"word-{lang}" for lang in LANGS]
+    # Each language is one miss, whether prefetch() or translate() found it
+    assert counters(service) == {"memory_hits": 0, "disk_hits": 0, "misses": 4, "coalesced": 0, "cancelled": 0}
+
+
+def test_prefetch_skips_cached_languages(make_service):
+    service = make_service(batch_size="3")
+    run(service.translate("HAND", "s", "German"))
+
+    async def scenario():
+        return await service.prefetch("HAND", "s", LANGS)
+
+    started = run(scenario())
+    assert len(started) == 3
+    assert sorted(service.fake.calls[-1]) == ["Dutch", "French", "Polish"]
+
+
+def test_prefetch_does_nothing_without_batching(make_service):
+    service = make_service()
+    assert run(service.prefetch("HAND", "s", LANGS)) == []
+    assert service.fake.calls == []
+
+
+# ----------------------------------------------------------------------
+# Cancellation
+# ----------------------------------------------------------------------
+
+def test_a_cancelled_waiter_leaves_the_request_to_the_others(make_service):
+    service = make_service()
+
+    async def scenario():
+        leaving = asyncio.ensure_future(service.translate("HAND", "s", "German"))
+        staying = asyncio.ensure_future(service.translate("HAND", "s", "German"))
+        await asyncio.sleep(0.01)
+        leaving.cancel()
+        return await staying
+
+    assert run(scenario()).main_translation == "word-German"
+    assert service.fake.cancelled == 0
+    assert counters(service)["cancelled"] == 0
+
+
+def test_the_last_waiter_to_leave_cancels_the_request(make_service):
+    service = make_service(delay=5)
+
+    async def scenario():
+        waiters = [asyncio.ensure_future(service.translate("HAND", "s", "German")) for _ in range(2)]
+        while not service.fake.calls:
+            await asyncio.sleep(0.01)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        return dict(service._inflight)
+
+    assert run(scenario()) == {}
+    assert service.fake.cancelled == 1
+    assert counters(service)["cancelled"] == 1
+
+
+def test_abandon_cancels_unclaimed_prefetches(make_service):
+    service = make_service(batch_size="3", delay=5)
+
+    async def scenario():
+        started = await service.prefetch("HAND", "s", LANGS)
+        claimed = asyncio.ensure_future(service.translate("HAND", "s", "German"))
+        await asyncio.sleep(0.01)
+        cancelled = service.abandon(started)
+        await asyncio.sleep(0.01)
+        pending = sorted(key[3] for key in service._inflight)
+        claimed.cancel()
+        await asyncio.gather(claimed, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        return cancelled, pending, dict(service._inflight)
+
+    cancelled, pending, inflight = run(scenario())
+    assert cancelled == 2
+    assert pending == ["German"]
+    assert inflight == {}
+    # The shared batch request stops once no language needs it
+    assert service.fake.cancelled == 1
+    assert counters(service)["cancelled"] == 3
@@ -2,9 +2,12 @@ import axios, { AxiosError } from 'axios';
 import {
   ComparisonData,
   ComparisonResult,
+  CompactComparisonResult,
   ProgressCallback,
   ComparisonProgress,
   ConceptAnchor,
+  FamilyColexifications,
+  LanguageResultCallback,
   FamilyInfo,
   StudyRequest,
   StudyResult,
@@ -42,11 +45,48 @@ api.interceptors.response.use(
   }
 );
 
+/**
+ * For 429/503 (the server's queue for this kind of request is full), a
+ * message with the server's Retry-After; undefined for other statuses.
+ */
+const busyMessage = (response: Response): string | undefined => {
+  if (response.status !== 429 && response.status !== 503) return undefined;
+  const retryAfter = response.headers.get('Retry-After');
+  return `Server busy, try again${retryAfter ? ` in ${retryAfter}s` : ' later'}`;
+};
+
+// Little-endian IEEE half floats (base64) → numbers
+const decodeFloat16 = (encoded: string): number[] => {
+  const bytes = Uint8Array.from(atob(encoded), c => c.charCodeAt(0));
+  const view = new DataView(bytes.buffer);
+  const values: number[] = [];
+  for (let i = 0; i + 1 < bytes.length; i += 2) {
+    const h = view.getUint16(i, true);
+    const sign = h & 0x8000 ? -1 : 1;
+    const exponent = (h >> 10) & 0x1f;
+    const fraction = h & 0x3ff;
+    if (exponent === 0) {
+      values.push(sign * fraction * 2 ** -24);
+    } else if (exponent === 0x1f) {
+      values.push(fraction ? NaN : sign * Infinity);
+    } else {
+      values.push(sign * (1 + fraction / 1024) * 2 ** (exponent - 15));
+    }
+  }
+  return values;
+};
+
+/**
+ * Compare concepts via SSE. Each language's result arrives as soon as it is
+ * ready (onResult); resolves with all results in the requested language order.
+ */
 export const compareWordsWithProgress = async (
   data: ComparisonData, 
-  onProgress: ProgressCallback
+  onProgress: ProgressCallback,
+  onResult?: LanguageResultCallback
 ): Promise<Record<string, ComparisonResult>> => {
-  const response = await fetch(`${API_URL}/compare-concepts-progress`, {
+  // Compact results: embeddings as float16, about a third the size of JSON floats
+  const response = await fetch(`${API_URL}/compare-concepts-progress?format=compact&embeddings=f16`, {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
@@ -55,12 +95,15 @@ export const compareWordsWithProgress = async (
   });
 
   if (!response.ok) {
-    throw new Error('Network response was not ok');
+    throw new Error(busyMessage(response) ?? 'Network response was not ok');
   }
 
   const reader = response.body!.getReader();
   const decoder = new TextDecoder();
   let buffer = '';
+  // Sent once, shared by every language that belongs to a family
+  let familyColexifications: Record<string, FamilyColexifications> = {};
+  const results: Record<string, ComparisonResult> = {};
 
   while (true) {
     const { done, value } = await reader.read();
@@ -72,30 +115,60 @@ export const compareWordsWithProgress = async (
     buffer = lines.pop() || '';
     
     for (const line of lines) {
-      if (line.startsWith('data: ')) {
-        try {
-          const data = JSON.parse(line.slice(6)) as ComparisonProgress;
-          
-          if ('error' in data && typeof data.error === 'string') {
-            throw new Error(data.error);
-          }
-
-          if (data.progress) {
-            onProgress(data.progress, data.current_language);
-          }
-
-          if (data.results) {
-            return data.results;
-          }
-        } catch (e) {
-          console.error('Error parsing SSE data:', e);
+      if (!line.startsWith('data: ')) continue;
+
+      let update: ComparisonProgress;
+      try {
+        update = JSON.parse(line.slice(6)) as ComparisonProgress;
+      } catch (e) {
+        console.error('Error parsing SSE data:', e);
+        continue;
+      }
+
+      if (update.error) {
+        throw new Error(update.error);
+      }
+
+      if (update.queue_position) {
+        onProgress(0, `Queued (position ${update.queue_position})`);
+        continue;
+      }
+
+      if (update.family_colexifications) {
+        familyColexifications = update.family_colexifications;
+      }
+
+      if (update.result && update.language) {
+        const compact: CompactComparisonResult = update.result;
+        const result: ComparisonResult = {
+          ...compact,
+          embeddings: [decodeFloat16(compact.embeddings[0]), decodeFloat16(compact.embeddings[1])],
+          family_colexifications: update.has_family ? familyColexifications : {},
+        };
+        results[update.language] = result;
+        onResult?.(update.language, result);
+      }
+
+      if (update.progress && update.current_language) {
+        onProgress(update.progress, update.current_language);
+      }
+
+      if (update.summary) {
+        if (update.summary.completed === 0) {
+          throw new Error('Failed to process any languages');
+        }
+        // Results arrive in completion order; return them in request order
+        const ordered: Record<string, ComparisonResult> = {};
+        for (const lang of data.languages) {
+          if (results[lang]) ordered[lang] = results[lang];
         }
+        return ordered;
       }
     }
   }
 
   throw new Error('Stream ended without results');
-};
+}
 
 // Type-safe API functions
 export const apiClient = {
@@ -161,7 +234,7 @@ export const runStudyWithProgress = async (
   });
 
   if (!response.ok) {
-    throw new Error(`Study request failed: ${response.statusText}`);
+    throw new Error(`Study request failed: ${busyMessage(response) ?? response.statusText}`);
   }
 
   const reader = response.body!.getReader();
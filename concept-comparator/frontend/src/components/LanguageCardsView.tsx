@@ -47,7 +47,7 @@ function getMergedGroupIndices(groups: number[]): Set<number> {
  * Optional translation data shown when available.
  */
 export function LanguageCardsView({ studyResult, languages }: Props) {
-  const { concepts, language_partitions, translations } = studyResult;
+  const { concepts, language_partitions, translations, translation_sources } = studyResult;
   const [familyFilter, setFamilyFilter] = useState('');
 
   const families = useMemo(() => {
@@ -98,6 +98,7 @@ export function LanguageCardsView({ studyResult, languages }: Props) {
           }
 
           const langTranslations = translations?.[langCode] ?? null;
+          const langSources = translation_sources?.[langCode] ?? null;
           const mergedPairCount = [...mergedIndices].length;
           const isAllSplit = mergedIndices.size === 0;
 
@@ -141,7 +142,18 @@ export function LanguageCardsView({ studyResult, languages }: Props) {
                         {SLOT_LETTERS[i]} · {c.label}
                       </span>
                       {langTranslations?.[i] && (
-                        <span className="text-xs text-slate-500 italic">{langTranslations[i]}</span>
+                        <span
+                          className="text-xs text-slate-500 italic"
+                          title={
+                            langSources?.[i] === 'omw'
+                              ? 'From Open Multilingual Wordnet'
+                              : langSources?.[i] === 'llm'
+                                ? 'Machine translation'
+                                : undefined
+                          }
+                        >
+                          {langTranslations[i]}
+                        </span>
                       )}
                     </div>
                   );
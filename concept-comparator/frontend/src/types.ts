@@ -16,6 +16,7 @@ export interface Translation {
   main_translation: string;
   variations: TranslationVariant[];
   usage_notes: string;
+  source?: 'omw' | 'llm';  // tier that produced the translation
 }
 
 export interface ComparisonData {
@@ -60,6 +61,12 @@ export interface ComparisonResult {
   family_colexifications: Record<string, FamilyColexifications>;
 }
 
+// A ComparisonResult as sent with ?format=compact&embeddings=f16: family
+// colexifications are sent separately, and each embedding is base64 float16
+export type CompactComparisonResult = Omit<ComparisonResult, 'embeddings' | 'family_colexifications'> & {
+  embeddings: [string, string];
+};
+
 export interface ClicsMatch {
   concept: string;
   semantic_field: string;
@@ -95,12 +102,33 @@ export interface Languages {
 
 export type ProgressCallback = (progress: number, language: string) => void;
 
+export type LanguageResultCallback = (language: string, result: ComparisonResult) => void;
+
+/**
+ * One event of /compare-concepts-progress. While waiting for an admission
+ * slot the stream sends `queued` events; then the first carries
+ * family_colexifications, then one per language (result or failed),
+ * and the last carries only a summary.
+ */
 export interface ComparisonProgress {
   progress: number;
-  current_language: string;
   processed: number;
   total: number;
-  results?: Record<string, ComparisonResult>;
+  queued?: boolean;
+  queue_position?: number;            // 1 = next to start
+  current_language?: string;
+  language?: string;
+  family_colexifications?: Record<string, FamilyColexifications>;
+  result?: CompactComparisonResult;   // family colexifications: see has_family
+  has_family?: boolean;
+  failed?: boolean;
+  summary?: {
+    completed: number;
+    failed: string[];
+    cached: number;                   // languages served from the result cache
+    elapsed_seconds: number;
+  };
+  error?: string;
 }
 
 // ---------------------------------------------------------------------------
@@ -169,6 +197,8 @@ export interface StudyResult {
   }>;
   colexification_embeddings: Record<string, number[]>;  // 128-dim Node2Vec per concept
   translations: Record<string, string[]> | null;
+  // 'omw' (Open Multilingual Wordnet) or 'llm' per translation; null where none was found
+  translation_sources?: Record<string, Array<'omw' | 'llm' | null>> | null;
   dataset_versions: Record<string, string>;
 }
 
@@ -186,6 +216,7 @@ export interface FamilyInfo {
 export interface StudyProgress {
   progress: number;
   step: string;
+  queue_position?: number;      // set while waiting for an admission slot
   result?: StudyResult;
   error?: string;
 }